@@ -64,7 +64,8 @@ class HomePage(QWidget):
 # 2) VIDEO PAGE (YOLO)
 #################################
 # Supondo que o VideoPage já exista em src/yolo_method/people_counter.py.
-from src.yolo_method.people_counter import VideoPage
+from src.yolo_method.people_counter import ModelLoader, VideoPage
+from src.utils.metrics import start_from_env
 
 #################################
 # 3) PÁGINAS DE RECONHECIMENTO FACIAL (ESTRUTURA SEMELHANTE AO SITE)
@@ -358,25 +359,44 @@ class SuccessPage(QWidget):
 # Criaremos um worker para rodar a classe cam_face_recognition em uma thread separada
 from PyQt5.QtCore import QThread
 
+def load_face_models():
+    """
+    Imports the face recognition module (dlib and DeepFace/TensorFlow) and
+    warms up its models. Runs in a ModelLoader thread when the app starts.
+    """
+    from src.face_recognition.face_recognition_ import warm_up_models
+    warm_up_models()
+
 class FaceRecWorker(QThread):
     recognized_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str)
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        # Importa a classe cam_face_recognition do módulo face_recognition_
-        from src.face_recognition.face_recognition_ import cam_face_recognition, known_people_loader
-        # Carrega pessoas conhecidas (ajuste conforme sua implementação)
-        # Se o construtor de known_people_loader não precisar de parâmetros, ou passe o diretório correto
-        self.known_people = known_people_loader(os.path.join(os.path.dirname(__file__), 'src', 'local_database', 'users'))
-        self.recognizer = cam_face_recognition(self.known_people, wait_time=5)
+        self.recognizer = None
     
     def run(self):
         try:
-            # Aqui chamamos o método run() que executa o loop de reconhecimento.
-            # Para integração, vamos supor que esse método retorna o nome reconhecido quando encontrar um rosto,
-            # ou retorna uma string indicando "Não reconhecido" após um tempo.
-            result = self.recognizer.run()  # OBS: O método run() do seu código original pode precisar ser adaptado para retornar algo.
+            # Known people (face encodings) and the camera are loaded here,
+            # in the worker thread, so the GUI does not freeze
+            from src.face_recognition.face_recognition_ import (
+                cam_face_recognition, known_people_loader,
+            )
+            # Carrega pessoas conhecidas (ajuste conforme sua implementação)
+            # Se o construtor de known_people_loader não precisar de
+            # parâmetros, ou passe o diretório correto
+            self.known_people = known_people_loader(os.path.join(
+                os.path.dirname(__file__), 'src', 'local_database', 'users'
+            ))
+            self.recognizer = cam_face_recognition(self.known_people,
+                                                   wait_time=5)
+            # Aqui chamamos o método run() que executa o loop de
+            # reconhecimento. Para integração, vamos supor que esse método
+            # retorna o nome reconhecido quando encontrar um rosto, ou
+            # retorna uma string indicando "Não reconhecido" após um tempo.
+            # OBS: O método run() do seu código original pode precisar ser
+            # adaptado para retornar algo.
+            result = self.recognizer.run()
             if result:
                 self.recognized_signal.emit(result)
             else:
@@ -391,18 +411,37 @@ class FaceRecRunPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QVBoxLayout()
-        self.label_info = QLabel("Clique em 'Iniciar' para realizar reconhecimento facial.")
+        self.label_info = QLabel(
+            "Carregando modelos de reconhecimento facial..."
+        )
         layout.addWidget(self.label_info)
         self.video_label = QLabel("Video Feed")
         layout.addWidget(self.video_label)
-        btn_start = QPushButton("Iniciar Reconhecimento Facial")
-        btn_start.clicked.connect(self.start_recognition)
-        layout.addWidget(btn_start)
+        self.btn_start = QPushButton("Iniciar Reconhecimento Facial")
+        self.btn_start.clicked.connect(self.start_recognition)
+        # Enabled once the models are loaded (see on_models_loaded)
+        self.btn_start.setEnabled(False)
+        layout.addWidget(self.btn_start)
         btn_back = QPushButton("Voltar")
         btn_back.clicked.connect(lambda: self.back_signal.emit())
         layout.addWidget(btn_back)
         self.setLayout(layout)
         self.worker = None  # Worker do reconhecimento
+        # dlib and DeepFace load in the background from the app start
+        self.model_loader = ModelLoader(load_face_models, self)
+        self.model_loader.loaded.connect(self.on_models_loaded)
+        self.model_loader.failed.connect(self.on_models_failed)
+        self.model_loader.start()
+
+    def on_models_loaded(self, seconds):
+        self.label_info.setText("Clique em 'Iniciar' para realizar reconhecimento facial.")
+        self.btn_start.setEnabled(True)
+
+    def on_models_failed(self, error):
+        self.label_info.setText(
+            "Erro ao carregar os modelos de reconhecimento facial."
+        )
+        QMessageBox.critical(self, "Erro", error)
 
     def start_recognition(self):
         if self.worker is None:
@@ -555,11 +594,18 @@ class MainWindow(QMainWindow):
     def go_to_face_rec(self):
         self.stacked.setCurrentIndex(2)
 
+    def closeEvent(self, event):
+        # Stops the YOLO processing thread before the window is destroyed
+        self.video_page.close_video()
+        event.accept()
+
 #################################
 # 7) FUNÇÃO MAIN
 #################################
 def main():
     app = QApplication(sys.argv)
+    # Metrics endpoint/snapshots when PEOPLE_COUNTER_METRICS_* are set
+    start_from_env()
     window = MainWindow()
     window.show()
     sys.exit(app.exec_())
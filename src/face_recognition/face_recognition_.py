@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 import face_recognition
 import os
 import time
@@ -12,11 +13,27 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')
 
 from src.firebase.history_manager import HistoryManager
 from src.firebase.user_image_manager import UserImageManager
+from src.utils.video_stream import VideoStream
 
 # Path to the "users" folder
 CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
 USERS_DIRECTORY = os.path.join(CURRENT_DIRECTORY, "..", "local_database", "users")
 HISTORY_CSV_DIRECTORY = os.path.join(CURRENT_DIRECTORY, "recognized_people.csv")
+ANALYZE_ACTIONS = ["age", "gender", "race", "emotion"]
+WARM_UP_IMAGE_SIZE = 224
+
+def warm_up_models():
+    """Runs one inference of the dlib models (face_recognition) and of the
+    DeepFace attribute models on a blank image, so the first recognition
+    does not load them."""
+    size = WARM_UP_IMAGE_SIZE
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    face_recognition.face_locations(image)
+    # A known location forces the landmark and encoding networks to run
+    face_recognition.face_encodings(image,
+                                    known_face_locations=[(0, size, size, 0)])
+    DeepFace.analyze(img_path=image, actions=ANALYZE_ACTIONS,
+                     enforce_detection=False)
 
 class Person:
     """Class representing a person with their name, face encoding, image, and user ID."""
@@ -72,9 +89,10 @@ class cam_face_recognition:
         self.known_persons = known_persons
         self.wait_time = wait_time
         self.last_check_time = time.time() - wait_time
-        self.video_capture = cv2.VideoCapture(0)
-        self.frame_width = int(self.video_capture.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.frame_height = int(self.video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # Threaded capture ("latest" policy): the 4 s result pauses below
+        # would otherwise leave the camera lagging behind
+        self.video_stream = VideoStream(0, threaded=True)
+        self.frame_width, self.frame_height = self.video_stream.get_frame_dimensions()
         self.square_size = 500
         self.x_start = self.frame_width // 2 - self.square_size // 2
         self.y_start = self.frame_height // 2 - self.square_size // 2
@@ -104,7 +122,7 @@ class cam_face_recognition:
         temp_roi_path = "temp_roi.jpg"
         cv2.imwrite(temp_roi_path, roi)
         try:
-            analysis = DeepFace.analyze(img_path=temp_roi_path, actions=["age", "gender", "race", "emotion"], enforce_detection=False)
+            analysis = DeepFace.analyze(img_path=temp_roi_path, actions=ANALYZE_ACTIONS, enforce_detection=False)
             if analysis:
                 return analysis[0]
         except Exception as e:
@@ -170,7 +188,7 @@ class cam_face_recognition:
     def run(self):
         """Runs the main loop of face detection and recognition."""
         while True:
-            ret, frame = self.video_capture.read()
+            ret, frame = self.video_stream.read()
             if not ret:
                 break
 
@@ -202,8 +220,7 @@ class cam_face_recognition:
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-        self.video_capture.release()
-        cv2.destroyAllWindows()
+        self.video_stream.release()
 
 
 def main():
@@ -0,0 +1,322 @@
+"""
+Frame readers behind VideoStream.
+
+Both readers return BGR frames through read() -> (ret, frame), like
+cv2.VideoCapture, so ThreadedCapture can run either of them in its
+capture thread. They also support:
+  - stride: only one frame out of 'stride' is returned. The skipped
+    frames are not converted to BGR images: OpenCV grab()s them without
+    retrieve(), PyAV decodes them without to_ndarray(). Inter-frame codecs
+    (H.264) still have to decode every reference frame.
+  - seek(frame_index): jumps to a frame, going through the nearest
+    keyframe before it.
+
+OpenCVReader works everywhere (files, cameras, URLs). PyAVReader needs the
+optional 'av' package and decodes files with several threads.
+
+ReconnectingReader wraps an OpenCVReader for network cameras (RTSP/HTTP):
+when the stream drops, read() reopens it with exponential backoff instead
+of failing, and frames that piled up in the decoder while the consumer was
+busy are flushed, so the frame returned is the newest one.
+"""
+import importlib.util
+import threading
+import time
+
+import cv2
+
+READER_OPENCV = "opencv"
+READER_PYAV = "pyav"
+READERS = [READER_OPENCV, READER_PYAV]
+
+# Network sources
+OPEN_TIMEOUT_MS = 5000
+READ_TIMEOUT_MS = 5000
+RECONNECT_INITIAL_DELAY = 0.5  # seconds, doubled after each failed attempt
+RECONNECT_MAX_DELAY = 30.0
+# A grab() faster than this returned a frame that was already buffered
+BUFFERED_GRAB_SECONDS = 0.005
+MAX_FLUSHED_FRAMES = 100  # per read()
+
+
+def is_available(reader):
+    if reader == READER_PYAV:
+        return importlib.util.find_spec("av") is not None
+    return True
+
+
+def is_network_source(source):
+    return not isinstance(source, int) and "://" in str(source)
+
+
+def open_capture(source):
+    """
+    cv2.VideoCapture of the source; network sources get open/read
+    timeouts so a dead camera does not block for the FFmpeg default.
+    """
+    has_timeouts = hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC")
+    if is_network_source(source) and has_timeouts:
+        return cv2.VideoCapture(source, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, OPEN_TIMEOUT_MS,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, READ_TIMEOUT_MS,
+        ])
+    return cv2.VideoCapture(source)
+
+
+class OpenCVReader:
+    def __init__(self, source=0, stride=1):
+        """
+        :param source: path/URL of the video or camera index.
+        :param stride: return one frame out of 'stride'.
+        """
+        self.cap = open_capture(source)
+        if not self.cap.isOpened():
+            raise ValueError("Não foi possível abrir o vídeo ou a câmera.")
+
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # 0 when unknown (e.g. some cameras)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.stride = stride
+        self.skip = 0  # frames to grab before the next returned one
+
+    def read(self):
+        for _ in range(self.skip):
+            if not self.cap.grab():
+                return False, None
+        ret, frame = self.cap.read()
+        self.skip = self.stride - 1
+        return ret, frame
+
+    def seek(self, frame_index):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        self.skip = 0
+
+    def release(self):
+        self.cap.release()
+
+
+class PyAVReader:
+    def __init__(self, source, stride=1, threads=0):
+        """
+        :param source: path/URL of the video (no camera indexes).
+        :param stride: return one frame out of 'stride'.
+        :param threads: decoding threads (0 = one per core).
+        """
+        import av
+
+        # AVError was removed in PyAV 14, FFmpegError is its base class
+        av_error = getattr(av, "FFmpegError", None) or av.AVError
+        try:
+            self.container = av.open(str(source))
+        except av_error as e:
+            raise ValueError(
+                "Não foi possível abrir o vídeo ou a câmera."
+            ) from e
+        self.stream = self.container.streams.video[0]
+        # Frame and slice threading, as ffmpeg does by default
+        self.stream.thread_type = "AUTO"
+        self.stream.thread_count = threads
+
+        codec_context = self.stream.codec_context
+        self.width = codec_context.width
+        self.height = codec_context.height
+        self.fps = float(self.stream.average_rate or 0)
+        self.frame_count = self.stream.frames
+        self.stride = stride
+        self.skip = 0
+        self.frames = self.container.decode(self.stream)
+        self.pending = None  # first frame after a seek, already decoded
+
+    def next_frame(self):
+        if self.pending is not None:
+            frame, self.pending = self.pending, None
+            return frame
+        return next(self.frames, None)
+
+    def read(self):
+        for _ in range(self.skip):
+            if self.next_frame() is None:
+                return False, None
+        frame = self.next_frame()
+        if frame is None:
+            return False, None
+        self.skip = self.stride - 1
+        return True, frame.to_ndarray(format="bgr24")
+
+    def seek(self, frame_index):
+        """
+        Seeks to the keyframe before the target and decodes up to it.
+        """
+        if not self.fps:
+            raise ValueError("FPS desconhecido: não é possível buscar.")
+        time_base = self.stream.time_base
+        start_pts = self.stream.start_time or 0
+        target_pts = start_pts + int(frame_index / self.fps / time_base)
+        self.container.seek(target_pts, stream=self.stream, backward=True)
+        self.frames = self.container.decode(self.stream)
+        self.skip = 0
+        # Half a frame of tolerance for rounded timestamps
+        tolerance = int(0.5 / self.fps / time_base)
+        for frame in self.frames:
+            if frame.pts is None or frame.pts >= target_pts - tolerance:
+                self.pending = frame
+                break
+
+    def release(self):
+        self.container.close()
+
+
+class ReconnectingReader:
+    def __init__(self, source, stride=1,
+                 initial_delay=RECONNECT_INITIAL_DELAY,
+                 max_delay=RECONNECT_MAX_DELAY, flush_stale=True):
+        """
+        :param source: URL of the network camera.
+        :param initial_delay: seconds before the first reconnection attempt,
+            doubled after each failure up to max_delay.
+        :param flush_stale: skip to the newest frame when read() was not
+            called for more than a frame period.
+        The first connection is made here and raises ValueError on failure.
+        """
+        self.source = source
+        self.stride = stride
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.flush_stale = flush_stale
+        self.stop_event = threading.Event()
+
+        self.reader = OpenCVReader(source, stride)
+        self.width = self.reader.width
+        self.height = self.reader.height
+        self.fps = self.reader.fps
+        self.frame_count = self.reader.frame_count
+        self.frame_period = 1.0 / (self.fps if 0 < self.fps < 1000 else 30.0)
+
+        self.delay = initial_delay
+        self.last_read = None
+        self.disconnected_at = None
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.flushed = 0
+        self.downtime = 0.0
+
+    def read(self):
+        """
+        Returns the newest frame, reconnecting as long as needed.
+        (False, None) only after interrupt() or release().
+        """
+        while not self.stop_event.is_set():
+            if self.reader is None and not self.reconnect():
+                continue
+            ret, frame = self.read_latest()
+            if ret:
+                return ret, frame
+            self.disconnect()
+        return False, None
+
+    def read_latest(self):
+        cap = self.reader.cap
+        grabbed = False
+        if (self.flush_stale and self.last_read is not None
+                and time.monotonic() - self.last_read > self.frame_period):
+            # Frames decoded while nobody was reading are stale: grab until
+            # a grab has to wait for the camera
+            for _ in range(MAX_FLUSHED_FRAMES):
+                start = time.monotonic()
+                if not cap.grab():
+                    return False, None
+                if grabbed:
+                    self.flushed += 1
+                grabbed = True
+                if time.monotonic() - start > BUFFERED_GRAB_SECONDS:
+                    break
+        if grabbed:
+            ret, frame = cap.retrieve()
+        else:
+            ret, frame = self.reader.read()
+        self.last_read = time.monotonic()
+        return ret, frame
+
+    def disconnect(self):
+        self.reader.release()
+        self.reader = None
+        self.disconnected_at = time.monotonic()
+        self.last_read = None
+
+    def reconnect(self):
+        """
+        Waits the backoff delay and tries to reopen the stream once.
+        """
+        if self.stop_event.wait(self.delay):
+            return False
+        try:
+            self.reader = OpenCVReader(self.source, self.stride)
+        except ValueError:
+            self.failed_attempts += 1
+            self.delay = min(self.delay * 2, self.max_delay)
+            return False
+        self.reconnects += 1
+        self.delay = self.initial_delay
+        self.downtime += time.monotonic() - self.disconnected_at
+        self.disconnected_at = None
+        return True
+
+    def seek(self, frame_index):
+        raise ValueError("Não é possível buscar em uma câmera de rede.")
+
+    def interrupt(self):
+        """
+        Makes a read() waiting to reconnect return (False, None).
+        """
+        self.stop_event.set()
+
+    def release(self):
+        self.interrupt()
+        if self.reader is not None:
+            self.reader.release()
+            self.reader = None
+
+    def stats(self):
+        """
+        Connection counters: reconnects, failed attempts, flushed frames
+        and seconds spent disconnected.
+        """
+        downtime = self.downtime
+        if self.disconnected_at is not None:
+            downtime += time.monotonic() - self.disconnected_at
+        return {
+            "connected": self.reader is not None,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "flushed": self.flushed,
+            "downtime_s": round(downtime, 3),
+        }
+
+
+def open_reader(source, reader=READER_OPENCV, stride=1, threads=0,
+                reconnect=None, verbose=True):
+    """
+    Opens 'source' with the requested reader. PyAV falls back to OpenCV
+    when it is not installed or for camera indexes.
+    :param reconnect: use a ReconnectingReader (default: for network
+        sources).
+    :param verbose: print when falling back to OpenCV.
+    """
+    if reader not in READERS:
+        raise ValueError(f"Leitor de vídeo desconhecido: {reader}")
+    if reconnect is None:
+        reconnect = is_network_source(source)
+    if reconnect:
+        return ReconnectingReader(source, stride)
+    if reader == READER_PYAV and isinstance(source, int):
+        reader = READER_OPENCV
+    if reader == READER_PYAV and not is_available(READER_PYAV):
+        if verbose:
+            print("PyAV não instalado, usando OpenCV.")
+        reader = READER_OPENCV
+
+    if reader == READER_PYAV:
+        return PyAVReader(source, stride, threads)
+    return OpenCVReader(source, stride)
@@ -0,0 +1,368 @@
+"""
+Low-overhead runtime metrics for the counting pipeline.
+
+Counters, gauges and fixed-bucket histograms live in a MetricsRegistry
+(REGISTRY by default). The hot loop only touches labeled children fetched
+once (metric.labels(stream="cam1")), so an update is an attribute add or a
+bisect on a short tuple, without locks: each child is expected to be
+updated by a single thread, and readers may see a value one update late.
+Gauges can also be computed from a function when they are read (queue
+depth, dropped frames), which costs nothing per frame.
+
+The registry is exposed by MetricsServer (GET /metrics in Prometheus text
+format, GET /metrics.json) and written periodically by SnapshotWriter.
+start_from_env() starts both from the environment:
+    PEOPLE_COUNTER_METRICS_PORT=9100
+    PEOPLE_COUNTER_METRICS_SNAPSHOT=metrics.json
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT_ENV_VAR = "PEOPLE_COUNTER_METRICS_PORT"
+METRICS_SNAPSHOT_ENV_VAR = "PEOPLE_COUNTER_METRICS_SNAPSHOT"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_SNAPSHOT_INTERVAL = 60.0  # seconds
+# Seconds, from 1 ms (tracking) to a few seconds (slow CPU inference)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0)
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class GaugeChild:
+    def __init__(self):
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set_function(self, function):
+        """
+        The gauge value becomes function(), evaluated on every read.
+        """
+        self.function = function
+
+    def get(self):
+        if self.function is not None:
+            return self.function()
+        return self.value
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf (not cumulative)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        """
+        Context manager observing the duration of its block.
+        """
+        return Timer(self)
+
+
+class Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metric:
+    child_class = None
+    metric_type = None
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, **labels):
+        """
+        Child for these label values, created on first use. Keep the
+        returned object instead of calling labels() for every update.
+        """
+        key = tuple(str(labels[name]) for name in self.label_names)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.children.pop(key, None)
+
+    def items(self):
+        with self.lock:
+            return list(self.children.items())
+
+    def label_text(self, key, extra=()):
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(
+            f'{name}="{escape_label(value)}"' for name, value in pairs
+        ) + "}"
+
+
+class Counter(Metric):
+    child_class = CounterChild
+    metric_type = "counter"
+
+    def samples(self):
+        for key, child in self.items():
+            yield self.name, self.label_text(key), child.value
+
+
+class Gauge(Metric):
+    child_class = GaugeChild
+    metric_type = "gauge"
+
+    def samples(self):
+        for key, child in self.items():
+            yield self.name, self.label_text(key), child.get()
+
+
+class Histogram(Metric):
+    child_class = HistogramChild
+    metric_type = "histogram"
+
+    def __init__(self, name, help_text, label_names=(),
+                 buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def samples(self):
+        for key, child in self.items():
+            cumulative = 0
+            bounds = [format_value(b) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, list(child.counts)):
+                cumulative += count
+                yield (self.name + "_bucket",
+                       self.label_text(key, [("le", bound)]), cumulative)
+            yield self.name + "_sum", self.label_text(key), child.sum
+            yield self.name + "_count", self.label_text(key), child.count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, *args, **kwargs)
+                self.metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(
+                    f"Métrica {name} já registrada com outro tipo"
+                )
+            return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self._register(Counter, name, help_text, label_names)
+
+    def gauge(self, name, help_text, label_names=()):
+        return self._register(Gauge, name, help_text, label_names)
+
+    def histogram(self, name, help_text, label_names=(),
+                  buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, help_text, label_names,
+                              buckets=buckets)
+
+    def render_prometheus(self):
+        """
+        Every metric in the Prometheus text exposition format (0.0.4).
+        """
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """
+        JSON-friendly view: {metric: [{"labels": {...}, ...values}]}.
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        data = {"timestamp": time.time(), "metrics": {}}
+        for metric in metrics:
+            entries = []
+            for key, child in metric.items():
+                entry = {"labels": dict(zip(metric.label_names, key))}
+                if isinstance(child, HistogramChild):
+                    entry["buckets"] = dict(zip(
+                        [format_value(b) for b in metric.buckets] + ["+Inf"],
+                        list(child.counts),
+                    ))
+                    entry["sum"] = child.sum
+                    entry["count"] = child.count
+                elif isinstance(child, GaugeChild):
+                    entry["value"] = child.get()
+                else:
+                    entry["value"] = child.value
+                entries.append(entry)
+            data["metrics"][metric.name] = entries
+        return data
+
+
+def escape_label(value):
+    return (str(value).replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+def format_value(value):
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    def __init__(self, registry=REGISTRY, host=DEFAULT_HOST, port=9100):
+        """
+        Serves the registry over HTTP in a daemon thread:
+        /metrics (Prometheus text) and /metrics.json.
+        :param port: 0 picks a free port (see self.port).
+        """
+        handler = make_handler(registry)
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_handler(registry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body = registry.render_prometheus().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = json.dumps(registry.snapshot()).encode()
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes are periodic: keep them out of the console
+            pass
+
+    return MetricsHandler
+
+
+class SnapshotWriter:
+    def __init__(self, path, registry=REGISTRY,
+                 interval=DEFAULT_SNAPSHOT_INTERVAL):
+        """
+        Writes registry.snapshot() to 'path' every 'interval' seconds
+        (atomically: readers never see a partial file).
+        """
+        self.path = path
+        self.registry = registry
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.write()
+
+    def write(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(temp_path, self.path)
+
+    def stop(self):
+        """
+        Stops the thread after a last snapshot.
+        """
+        self.stop_event.set()
+        self.thread.join()
+        self.write()
+
+
+def start_from_env(registry=REGISTRY):
+    """
+    Starts the HTTP endpoint and/or the snapshot writer configured in
+    PEOPLE_COUNTER_METRICS_PORT / PEOPLE_COUNTER_METRICS_SNAPSHOT.
+    :return: (MetricsServer or None, SnapshotWriter or None)
+    """
+    server = None
+    writer = None
+    port = os.environ.get(METRICS_PORT_ENV_VAR)
+    if port:
+        server = MetricsServer(registry, port=int(port))
+    snapshot_path = os.environ.get(METRICS_SNAPSHOT_ENV_VAR)
+    if snapshot_path:
+        writer = SnapshotWriter(snapshot_path, registry)
+    return server, writer
@@ -0,0 +1,186 @@
+"""
+Background frame capture for the VideoStream classes.
+
+FrameRingBuffer is a fixed-size ring buffer shared by one producer (the
+capture thread) and one consumer (the processing loop). ThreadedCapture
+decodes frames from a cv2.VideoCapture in a daemon thread into the buffer,
+so decoding overlaps with inference instead of adding to it.
+
+Policies when the buffer is full:
+  - "latest": the oldest frame is overwritten, and get() returns the
+    newest frame, dropping the older ones (live cameras: the consumer is
+    never more than one frame behind).
+  - "block": the capture thread waits for the consumer (files, never drops).
+"""
+import threading
+import time
+
+POLICY_LATEST = "latest"
+POLICY_BLOCK = "block"
+DEFAULT_BUFFER_SIZE = 4
+
+
+class FrameRingBuffer:
+    def __init__(self, capacity=DEFAULT_BUFFER_SIZE, policy=POLICY_LATEST):
+        """
+        :param capacity: max number of frames kept in the buffer.
+        :param policy: POLICY_LATEST or POLICY_BLOCK.
+        """
+        if capacity < 1:
+            raise ValueError("O buffer precisa ter pelo menos 1 posição.")
+        if policy not in (POLICY_LATEST, POLICY_BLOCK):
+            raise ValueError(f"Política de buffer desconhecida: {policy}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.slots = [None] * capacity
+        self.head = 0
+        self.count = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+        self.dropped = 0
+        self.consumed = 0
+
+    def put(self, frame):
+        """
+        Adds a frame, applying the policy when the buffer is full.
+        :return: False if the buffer was closed (the producer should stop).
+        """
+        with self.condition:
+            if self.policy == POLICY_BLOCK:
+                while self.count == self.capacity and not self.closed:
+                    self.condition.wait()
+            if self.closed:
+                return False
+
+            if self.count == self.capacity:
+                # "latest" policy: overwrite the oldest frame
+                self.head = (self.head + 1) % self.capacity
+                self.count -= 1
+                self.dropped += 1
+
+            tail = (self.head + self.count) % self.capacity
+            self.slots[tail] = frame
+            self.count += 1
+            self.condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Removes and returns the oldest frame ("block") or the newest one
+        ("latest", the older ones are dropped), waiting for one if needed.
+        :return: the frame, or None if the buffer is closed and empty or
+            the timeout expired.
+        """
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.count > 0 or self.closed, timeout
+            ):
+                return None
+            if self.count == 0:
+                return None
+
+            if self.policy == POLICY_LATEST:
+                # Frames older than the newest one are stale on a live source
+                while self.count > 1:
+                    self.slots[self.head] = None
+                    self.head = (self.head + 1) % self.capacity
+                    self.count -= 1
+                    self.dropped += 1
+
+            frame = self.slots[self.head]
+            self.slots[self.head] = None
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+            self.consumed += 1
+            self.condition.notify_all()
+            return frame
+
+    def close(self):
+        """
+        Wakes up both sides; frames still buffered can be consumed.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        with self.condition:
+            return self.count
+
+
+class ThreadedCapture:
+    def __init__(self, cap, buffer_size=DEFAULT_BUFFER_SIZE,
+                 policy=POLICY_LATEST):
+        """
+        Starts decoding 'cap' (an opened cv2.VideoCapture, or a reader
+        from frame_readers) in a daemon thread.
+        """
+        self.cap = cap
+        self.buffer = FrameRingBuffer(buffer_size, policy)
+        self.decoded = 0
+        # time.monotonic() when the frame returned by read() was decoded
+        self.last_frame_time = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+
+    def _capture_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.decoded += 1
+                if not self.buffer.put((frame, time.monotonic())):
+                    break
+        finally:
+            # End of video (or error): lets the consumer drain and stop
+            self.buffer.close()
+
+    def read(self, timeout=None):
+        """
+        Same contract as cv2.VideoCapture.read(): returns (ret, frame).
+        With a timeout, (False, None) can also mean no frame arrived in
+        time; see finished().
+        """
+        item = self.buffer.get(timeout)
+        if item is None:
+            return False, None
+        frame, self.last_frame_time = item
+        return True, frame
+
+    def finished(self):
+        """
+        True when the capture thread stopped and every frame was read.
+        """
+        return not self.thread.is_alive() and len(self.buffer) == 0
+
+    def stop(self):
+        """
+        Stops the capture thread. The VideoCapture is not released here.
+        """
+        self.stop_event.set()
+        self.buffer.close()
+        self.thread.join()
+
+    def stats(self):
+        """
+        Frame counters: decoded, consumed, dropped and currently buffered.
+        """
+        return {
+            "decoded": self.decoded,
+            "consumed": self.buffer.consumed,
+            "dropped": self.buffer.dropped,
+            "buffered": len(self.buffer),
+        }
+
+
+def default_policy(source):
+    """
+    "latest" for cameras (index) and network URLs, "block" for files.
+    """
+    if isinstance(source, int) or "://" in str(source):
+        return POLICY_LATEST
+    return POLICY_BLOCK
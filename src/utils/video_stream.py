@@ -1,23 +1,42 @@
 import cv2
 
+from .threaded_capture import (
+    DEFAULT_BUFFER_SIZE, ThreadedCapture, default_policy,
+)
+
 class VideoStream:
-    def __init__(self, source=0):
+    def __init__(self, source=0, threaded=False,
+                 buffer_size=DEFAULT_BUFFER_SIZE, policy=None):
         """
         Initializes the video stream.
         :param source: path to the video file or camera index (default is 0 for the default camera).
+        :param threaded: decode frames in a background thread into a ring
+            buffer.
+        :param buffer_size: number of frames kept by the ring buffer.
+        :param policy: "latest" (drop old frames) or "block" (never drop).
+            Defaults to "latest" for cameras and "block" for files.
         """
         self.cap = cv2.VideoCapture(source)
         if not self.cap.isOpened():
             raise ValueError("Não foi possível abrir o vídeo ou a câmera.")
         self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        self.capture = None
+        if threaded:
+            self.capture = ThreadedCapture(
+                self.cap, buffer_size, policy or default_policy(source)
+            )
     
     def read(self):
         """
         Reads the next frame from the video or camera.
         :return: (ret, frame) where ret is True if the reading was successful and frame is the read image.
         """
-        ret, frame = self.cap.read()
+        if self.capture is not None:
+            ret, frame = self.capture.read()
+        else:
+            ret, frame = self.cap.read()
         if not ret:
             return ret, None
         return ret, frame
@@ -26,6 +45,8 @@ class VideoStream:
         """
         Releases the video stream/camera.
         """
+        if self.capture is not None:
+            self.capture.stop()
         self.cap.release()
         cv2.destroyAllWindows()
     
@@ -43,3 +64,12 @@ class VideoStream:
         :return: (width, height)
         """
         return self.width, self.height
+
+    def stats(self):
+        """
+        Returns the decoded/consumed/dropped frame counters of the threaded
+        capture (empty dict when reading synchronously).
+        """
+        if self.capture is None:
+            return {}
+        return self.capture.stats()
@@ -0,0 +1,124 @@
+"""
+Inference backends for the people detector.
+
+The PyTorch weights (yolov8m.pt) can be exported once to ONNX (run with
+ONNX Runtime) or OpenVINO. The exported artifact is cached next to the
+weights in yolo_models/ and loaded back through ultralytics.YOLO, which
+keeps the same letterbox pre-processing and NMS post-processing as the
+PyTorch path, so PeopleCounter does not change.
+
+"onnx_int8" is the ONNX model quantized to int8 with calibration on our
+own frames (see quantization.py), cached as yolov8m_int8.onnx. It cannot
+be exported on the fly: it has to be generated once with
+    python -m src.yolo_method.quantization FRAMES_DIR
+
+The backend is chosen with the 'backend' argument of load_model /
+PeopleCounter, or with the PEOPLE_COUNTER_BACKEND environment variable.
+"""
+import importlib.util
+import os
+import shutil
+
+from ultralytics import YOLO
+
+BACKEND_PYTORCH = "pytorch"
+BACKEND_ONNX = "onnx"
+BACKEND_OPENVINO = "openvino"
+BACKEND_ONNX_INT8 = "onnx_int8"
+BACKENDS = [BACKEND_PYTORCH, BACKEND_ONNX, BACKEND_OPENVINO, BACKEND_ONNX_INT8]
+BACKEND_ENV_VAR = "PEOPLE_COUNTER_BACKEND"
+
+# Python package each exported backend needs at runtime
+BACKEND_PACKAGES = {
+    BACKEND_ONNX: "onnxruntime",
+    BACKEND_OPENVINO: "openvino",
+    BACKEND_ONNX_INT8: "onnxruntime",
+}
+EXPORT_IMAGE_SIZE = 640
+
+
+def default_backend():
+    """
+    Backend from PEOPLE_COUNTER_BACKEND, "pytorch" when not set.
+    """
+    return os.environ.get(BACKEND_ENV_VAR, BACKEND_PYTORCH).lower()
+
+
+def is_available(backend):
+    package = BACKEND_PACKAGES.get(backend)
+    return package is None or importlib.util.find_spec(package) is not None
+
+
+def exported_model_path(model_path, backend):
+    """
+    Where the exported artifact of 'model_path' is cached:
+    yolov8m.onnx, yolov8m_int8.onnx or the yolov8m_openvino_model/
+    directory.
+    """
+    base_path = os.path.splitext(model_path)[0]
+    if backend == BACKEND_ONNX:
+        return base_path + ".onnx"
+    if backend == BACKEND_ONNX_INT8:
+        return base_path + "_int8.onnx"
+    if backend == BACKEND_OPENVINO:
+        return base_path + "_openvino_model"
+    return model_path
+
+
+def export_model(model_path, backend, image_size=EXPORT_IMAGE_SIZE):
+    """
+    Exports the PyTorch weights to the backend format (only once).
+    :return: path of the cached artifact.
+    """
+    target_path = exported_model_path(model_path, backend)
+    if os.path.exists(target_path):
+        return target_path
+    if backend == BACKEND_ONNX_INT8:
+        # Needs calibration frames, see quantization.py
+        raise ValueError(
+            f"Modelo int8 não encontrado: {target_path}. Gere-o com "
+            "python -m src.yolo_method.quantization PASTA_DE_FRAMES"
+        )
+
+    print(f"Exportando {os.path.basename(model_path)} para {backend}...")
+    # dynamic=True keeps batched predict (MultiStreamCounter) working
+    exported_path = YOLO(model_path).export(
+        format=backend, imgsz=image_size, dynamic=True
+    )
+    if os.path.abspath(exported_path) != os.path.abspath(target_path):
+        shutil.move(exported_path, target_path)
+    return target_path
+
+
+def resolve_backend(backend=None):
+    """
+    The backend actually used: OpenVINO falls back to ONNX Runtime, and
+    ONNX Runtime to PyTorch, when their package is not installed.
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend}")
+
+    if backend == BACKEND_OPENVINO and not is_available(BACKEND_OPENVINO):
+        print("OpenVINO não instalado, usando ONNX Runtime.")
+        backend = BACKEND_ONNX
+    if backend == BACKEND_ONNX_INT8 and not is_available(BACKEND_ONNX_INT8):
+        print("ONNX Runtime não instalado, usando PyTorch.")
+        backend = BACKEND_PYTORCH
+    if backend == BACKEND_ONNX and not is_available(BACKEND_ONNX):
+        print("ONNX Runtime não instalado, usando PyTorch.")
+        backend = BACKEND_PYTORCH
+    return backend
+
+
+def load_model(model_path, backend=None, verbose=True):
+    """
+    Loads the detector for the given backend (see resolve_backend),
+    exporting it if needed.
+    """
+    backend = resolve_backend(backend)
+    if backend == BACKEND_PYTORCH:
+        return YOLO(model_path, verbose=verbose)
+    return YOLO(
+        export_model(model_path, backend), task="detect", verbose=verbose
+    )
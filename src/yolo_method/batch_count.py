@@ -0,0 +1,365 @@
+"""
+Headless people counting over recorded video files.
+
+Runs PeopleCounter without Qt or drawing on a video file (or every video
+of a directory), using the zones and tripwires of a JSON zone file (see
+zones.load_layout). Writes one CSV per video with every counted crossing
+and a summary in JSON and CSV.
+
+Usage, from the project root:
+    python -m src.yolo_method.batch_count VIDEO_OR_DIR --zones zones.json
+        [--output-dir OUT] [--stride N] [--start S] [--end S]
+        [--reader pyav] [--tracker assignment]
+        [--backend onnx] [--metrics-port 9100] [--detection-cache [DIR]]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+# Local imports
+from ..utils.frame_readers import READER_OPENCV, READERS
+from ..utils.metrics import MetricsServer, SnapshotWriter
+from .backends import BACKENDS, default_backend, load_model
+from .counter import DEFAULT_MODEL_PATH, PeopleCounter
+from .detection_cache import DEFAULT_CACHE_DIR, DetectionCache
+from .detections import DEFAULT_CONFIDENCE
+from .event_log import EventLog
+from .tracker import TRACKER_TYPES
+from .video_stream import VideoStream
+from .zones import load_layout
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+PROGRESS_INTERVAL = 2.0  # seconds between progress lines
+EVENT_COLUMNS = [
+    "video", "frame_index", "timestamp_s", "track_id", "direction", "line",
+]
+SUMMARY_COLUMNS = [
+    "video", "frames", "processed_frames", "detected_frames",
+    "cached_frames", "motion_skipped_frames", "people_in", "people_out",
+    "seconds", "fps",
+]
+
+
+def find_videos(input_path):
+    """
+    Returns the video file itself, or the videos of a directory (sorted).
+    """
+    if os.path.isdir(input_path):
+        return [
+            os.path.join(input_path, name)
+            for name in sorted(os.listdir(input_path))
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        ]
+    return [input_path]
+
+
+def count_video(video_path, layout, counter_kwargs, stride=1,
+                event_writer=None, detection_cache=None, start_seconds=0.0,
+                end_seconds=None, stream_kwargs=None):
+    """
+    Counts people in one video file with a fresh PeopleCounter.
+    :param layout: ZoneLayout (zones and tripwires).
+    :param counter_kwargs: arguments for PeopleCounter (model, tracker...).
+    :param stride: process one frame out of 'stride' (the skipped frames
+        are not converted to images, see VideoStream).
+    :param event_writer: csv.writer receiving one row per crossing.
+    :param detection_cache: DetectionCache. When every processed frame is
+        cached (and motion gating, which needs the pixels, is off) the
+        video is not even decoded: count_frame runs on the cached boxes
+        with the same detection schedule. Otherwise cached frames skip YOLO
+        and the new detections are saved at the end.
+    :param start_seconds: seek to this time before counting.
+    :param end_seconds: stop at this time (default: end of the video).
+    :param stream_kwargs: extra VideoStream arguments (reader...).
+    :return: summary dict (see SUMMARY_COLUMNS).
+    """
+    video_name = os.path.basename(video_path)
+    cached = None
+    if detection_cache is not None:
+        # ROI boxes depend on the zones, full-frame boxes do not
+        region = (layout.to_dict() if counter_kwargs.get("roi_inference")
+                  else None)
+        cached = detection_cache.open(video_path, region)
+    counter = PeopleCounter(
+        verbose=False, stream_id=video_name, detection_cache=cached,
+        **counter_kwargs
+    )
+
+    video_stream = None
+    replay = False
+    if cached is not None and cached.frame_count > 0:
+        first_frame, last_frame = frame_window(
+            cached.fps, cached.frame_count, start_seconds, end_seconds
+        )
+        replay = (not counter.motion_gating
+                  and cached.covers(last_frame, stride, first_frame))
+    if replay:
+        frame_size, fps = cached.frame_size, cached.fps
+        frame_count = cached.frame_count
+    else:
+        video_stream = VideoStream(video_path, threaded=True, stride=stride,
+                                   **(stream_kwargs or {}))
+        frame_size = video_stream.get_frame_dimensions()
+        fps = video_stream.fps or 30.0
+        frame_count = video_stream.frame_count
+        first_frame, last_frame = frame_window(
+            fps, frame_count, start_seconds, end_seconds
+        )
+        if first_frame > 0:
+            video_stream.seek_frame(first_frame)
+    counter.set_layout(layout, frame_size)
+    if counter.event_log is not None:
+        counter.set_recording_clock(
+            recording_start(video_path, fps, frame_count), fps
+        )
+
+    frame_index = first_frame - 1
+    next_frame = first_frame  # replay only
+    processed_frames = 0
+    end_of_video = False
+    start = time.perf_counter()
+    last_progress = start
+    try:
+        while True:
+            if video_stream is None:
+                # Replay of the cached detections
+                frame = None
+                if next_frame >= last_frame:
+                    break
+                frame_index = next_frame
+                next_frame += stride
+            else:
+                ret, frame = video_stream.read()
+                if not ret:
+                    end_of_video = True
+                    break
+                if video_stream.frame_index >= last_frame:
+                    break
+                frame_index = video_stream.frame_index
+
+            # frame is None on replay: every detection is cached
+            result = counter.count_frame(frame, frame_index=frame_index)
+            processed_frames += 1
+            if event_writer is not None:
+                write_events(event_writer, video_name, frame_index, fps,
+                             result)
+
+            now = time.perf_counter()
+            if now - last_progress >= PROGRESS_INTERVAL:
+                last_progress = now
+                print_progress(video_name, frame_index, frame_count,
+                               processed_frames / (now - start))
+    finally:
+        if video_stream is not None:
+            video_stream.release()
+
+    seconds = time.perf_counter() - start
+    if cached is not None and video_stream is not None:
+        # The real length once the whole file was read (the container
+        # frame count can be wrong), the container one otherwise
+        cached.save(frame_size, fps,
+                    frame_index + 1 if end_of_video else frame_count)
+    people_in, people_out = counter.get_counts()
+    stats = counter.get_stats()
+    print_progress(video_name, frame_index, frame_count,
+                   processed_frames / max(seconds, 1e-9), end="\n")
+    summary = {
+        "video": video_name,
+        "frames": frame_index + 1 - first_frame,
+        "processed_frames": processed_frames,
+        "detected_frames": stats["detected_frames"],
+        "cached_frames": stats["cached_frames"],
+        "motion_skipped_frames": stats["motion_skipped_frames"],
+        "people_in": people_in,
+        "people_out": people_out,
+        "seconds": round(seconds, 3),
+        "fps": round(processed_frames / max(seconds, 1e-9), 2),
+    }
+    if layout.lines:
+        # JSON summary only: {line: [in, out]}
+        summary["lines"] = {
+            name: list(counts)
+            for name, counts in counter.get_line_counts().items()
+        }
+    return summary
+
+
+def write_events(event_writer, video_name, frame_index, fps, result):
+    """
+    One CSV row per crossing of a FrameResult; 'line' is empty for the
+    area1/area2 crossings.
+    """
+    # new_events lists the area crossings first, then the line ones
+    area_events = len(result.new_events) - len(result.line_events)
+    rows = [(obj_id, direction, "")
+            for obj_id, direction in result.new_events[:area_events]]
+    rows += [(obj_id, direction, name)
+             for obj_id, name, direction in result.line_events]
+    for obj_id, direction, name in rows:
+        event_writer.writerow([video_name, frame_index,
+                               round(frame_index / fps, 3), obj_id,
+                               direction, name])
+
+
+def frame_window(fps, frame_count, start_seconds=0.0, end_seconds=None):
+    """
+    Frames [first, last) of a time window of the video.
+    :param frame_count: used when end_seconds is None (<= 0: unknown).
+    """
+    fps = fps or 30.0
+    first_frame = int(round(max(start_seconds, 0.0) * fps))
+    if end_seconds is not None:
+        last_frame = int(round(end_seconds * fps))
+    elif frame_count > 0:
+        last_frame = frame_count
+    else:
+        last_frame = sys.maxsize
+    return first_frame, last_frame
+
+
+def recording_start(video_path, fps, frame_count):
+    """
+    Best guess of when the recording started: the file modification time
+    (end of the recording) minus the video duration.
+    """
+    duration = max(frame_count, 0) / fps
+    return os.path.getmtime(video_path) - duration
+
+
+def print_progress(video_name, frame_index, frame_count, fps, end=""):
+    total = f"/{frame_count}" if frame_count > 0 else ""
+    sys.stderr.write(
+        f"\r{video_name}: frame {frame_index + 1}{total} - {fps:.1f} fps"
+        + end
+    )
+    sys.stderr.flush()
+
+
+def write_summary(output_dir, summaries):
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(summaries, f, indent=2)
+    with open(os.path.join(output_dir, "summary.csv"), "w",
+              newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS,
+                                extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Contagem de pessoas em vídeos gravados (sem interface)."
+    )
+    parser.add_argument("input", help="video file or directory of videos")
+    parser.add_argument("--zones", required=True,
+                        help="JSON zone file (named zones and tripwires, "
+                             "or area1 and area2)")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="process one frame out of N")
+    parser.add_argument("--start", type=float, default=0.0, metavar="SECONDS",
+                        help="seek to this time of each video")
+    parser.add_argument("--end", type=float, default=None, metavar="SECONDS",
+                        help="stop at this time of each video")
+    parser.add_argument("--reader", default=READER_OPENCV, choices=READERS,
+                        help="video decoder (pyav: multithreaded, needs av)")
+    parser.add_argument("--decode-threads", type=int, default=0,
+                        help="PyAV decoding threads (0 = one per core)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--backend", default=default_backend(),
+                        choices=BACKENDS)
+    parser.add_argument("--tracker", default="centroid",
+                        choices=sorted(TRACKER_TYPES))
+    parser.add_argument("--conf", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--max-detection-interval", type=int, default=1,
+                        help="adaptive detection every K frames at most "
+                             "(needs --tracker assignment)")
+    parser.add_argument("--motion-gating", action="store_true",
+                        help="skip detection while the zones are static")
+    parser.add_argument("--roi", action="store_true",
+                        help="detect only on the region around the zones")
+    parser.add_argument("--event-db", default=None,
+                        help="also log every crossing to this SQLite file")
+    parser.add_argument("--image-size", type=int, default=None,
+                        help="YOLO input size (e.g. 960 with --roi)")
+    parser.add_argument("--detection-cache", nargs="?", default=None,
+                        const=DEFAULT_CACHE_DIR, metavar="DIR",
+                        help="reuse/store the YOLO boxes of each frame "
+                             "(zone tuning reruns skip inference)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics on this port")
+    parser.add_argument("--metrics-snapshot", default=None,
+                        help="write a JSON metrics snapshot to this file "
+                             "every minute and at the end")
+    args = parser.parse_args(argv)
+    if args.stride < 1:
+        parser.error("--stride must be >= 1")
+    if args.end is not None and args.end <= args.start:
+        parser.error("--end must be after --start")
+    if (args.max_detection_interval > 1
+            and not hasattr(TRACKER_TYPES[args.tracker], "predict")):
+        parser.error("--max-detection-interval > 1 needs "
+                     "--tracker assignment")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    layout = load_layout(args.zones)
+    videos = find_videos(args.input)
+    if not videos:
+        raise SystemExit(f"Nenhum vídeo encontrado em {args.input}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.metrics_port is not None:
+        MetricsServer(port=args.metrics_port)
+    snapshot_writer = None
+    if args.metrics_snapshot:
+        snapshot_writer = SnapshotWriter(args.metrics_snapshot)
+
+    # One model for all videos; each video gets its own tracker and counts
+    counter_kwargs = {
+        "model": load_model(args.model, args.backend, verbose=False),
+        "tracker_type": args.tracker,
+        "conf": args.conf,
+        "max_detection_interval": args.max_detection_interval,
+        "motion_gating": args.motion_gating,
+        "roi_inference": args.roi,
+        "image_size": args.image_size,
+        "event_log": EventLog(args.event_db) if args.event_db else None,
+    }
+    detection_cache = None
+    if args.detection_cache:
+        detection_cache = DetectionCache(
+            args.detection_cache,
+            model_name=f"{os.path.basename(args.model)}:{args.backend}",
+            conf=args.conf, image_size=args.image_size,
+        )
+    summaries = []
+    for video_path in videos:
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        events_path = os.path.join(args.output_dir, f"{name}_events.csv")
+        with open(events_path, "w", newline="") as f:
+            event_writer = csv.writer(f)
+            event_writer.writerow(EVENT_COLUMNS)
+            summaries.append(count_video(
+                video_path, layout, counter_kwargs,
+                stride=args.stride, event_writer=event_writer,
+                detection_cache=detection_cache, start_seconds=args.start,
+                end_seconds=args.end, stream_kwargs={
+                    "reader": args.reader,
+                    "decode_threads": args.decode_threads,
+                },
+            ))
+        write_summary(args.output_dir, summaries)
+
+    if counter_kwargs["event_log"] is not None:
+        counter_kwargs["event_log"].close()
+    if snapshot_writer is not None:
+        snapshot_writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,727 @@
+"""
+People counting without any GUI dependency.
+
+PeopleCounter runs YOLO person detection, tracking and the counting logic
+on BGR frames: the area1/area2 entrance/exit sequence, and the directional
+tripwires of the zone layout (see zones.ZoneLayout). It is used by the
+PyQt VideoPage in people_counter.py and can share its model with other
+counters.
+
+Counting never touches the frame: count_frame/count_detections return a
+FrameResult, and overlay.draw_overlay draws it only where it is shown.
+"""
+import sys
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# Local imports
+from ..utils.metrics import REGISTRY
+from .backends import default_backend, load_model
+from .detections import (
+    DEFAULT_CONFIDENCE, PERSON_CLASS_ID, filter_person_boxes,
+)
+from .motion_gate import DEFAULT_FORCE_INTERVAL, MotionGate
+from .overlay import draw_overlay
+from .tracker import create_tracker
+from .zones import AREA1_NAME, AREA2_NAME, CROSSING_IN, ZoneLayout
+
+##############################################################################
+# Model path adjustment
+##############################################################################
+model_str = "yolov8m.pt"
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+if hasattr(sys, '_MEIPASS'):
+    model_path = os.path.join(sys._MEIPASS, model_str)
+else:
+    #If the model is located in ÿolo_models" inside "yolo_method" :
+    model_path = os.path.join(current_dir, "yolo_models", model_str)
+
+DEFAULT_MODEL_PATH = model_path
+
+# Adaptive detection interval: largest centroid motion (px) accepted
+# between two detections, and number of tracks considered crowded
+MOTION_BUDGET = 12.0
+CROWDED_TRACKS = 15
+
+# Region of interest inference: margin (px) kept around the zones, so the
+# body above a foot point inside a zone is still in the crop
+DEFAULT_ROI_MARGIN = 120
+
+# Direction of a counted crossing ("Subindo" / "Descendo" on screen)
+DIRECTION_IN = "in"
+DIRECTION_OUT = "out"
+
+# Motion gating: width (px) of the band watched around each tripwire
+TRIPWIRE_MOTION_WIDTH = 60
+
+# Output of the counting stage for one frame:
+#   tracks: (N, 5) array of [x1, y1, x2, y2, id]
+#   in_area1, in_area2: (N,) bool, foot point (x2, y2) inside each area
+#   counted: (N,) bool, tracks counted as entering or exiting
+#   counts: (people in, people out) after this frame
+#   new_events: crossings counted in this frame, [(id, direction)], from
+#       the areas and the tripwires
+#   zone_flags: (N,) bit i set when the foot point is in layout zone i
+#   line_events: tripwire crossings of this frame, [(id, line, direction)]
+FrameResult = namedtuple("FrameResult", [
+    "frame_index", "tracks", "in_area1", "in_area2", "counted", "counts",
+    "new_events", "zone_flags", "line_events",
+])
+
+##############################################################################
+# Metrics (see utils/metrics.py), labeled by stream
+##############################################################################
+MODEL_METRIC = REGISTRY.gauge(
+    "people_counter_model_info", "Detector loaded (1) by path and backend",
+    ["model_path", "backend"]
+)
+MODEL_LOAD_METRIC = REGISTRY.gauge(
+    "people_counter_model_load_seconds",
+    "Time to load the detector and run the warm-up inference",
+    ["model_path", "backend"]
+)
+FRAMES_METRIC = REGISTRY.counter(
+    "people_counter_frames_total",
+    "Frames counted, by path (detected, predicted, motion_skipped)",
+    ["stream", "path"]
+)
+FRAME_SECONDS_METRIC = REGISTRY.histogram(
+    "people_counter_frame_seconds", "count_frame latency", ["stream"]
+)
+INFERENCE_SECONDS_METRIC = REGISTRY.histogram(
+    "people_counter_inference_seconds", "YOLO predict and box filtering",
+    ["stream"]
+)
+ACTIVE_TRACKS_METRIC = REGISTRY.gauge(
+    "people_counter_active_tracks", "Tracks in the last counted frame",
+    ["stream"]
+)
+CROSSINGS_METRIC = REGISTRY.counter(
+    "people_counter_crossings_total", "Counted crossings, by direction",
+    ["stream", "direction"]
+)
+
+
+class StreamMetrics:
+    """
+    Metric children of one stream, fetched once so the per-frame updates
+    are plain attribute operations.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.detected_frames = FRAMES_METRIC.labels(stream=stream,
+                                                    path="detected")
+        self.predicted_frames = FRAMES_METRIC.labels(stream=stream,
+                                                     path="predicted")
+        self.motion_skipped_frames = FRAMES_METRIC.labels(
+            stream=stream, path="motion_skipped"
+        )
+        self.frame_seconds = FRAME_SECONDS_METRIC.labels(stream=stream)
+        self.inference_seconds = INFERENCE_SECONDS_METRIC.labels(
+            stream=stream
+        )
+        self.active_tracks = ACTIVE_TRACKS_METRIC.labels(stream=stream)
+        self.crossings = {
+            DIRECTION_IN: CROSSINGS_METRIC.labels(stream=stream,
+                                                  direction=DIRECTION_IN),
+            DIRECTION_OUT: CROSSINGS_METRIC.labels(stream=stream,
+                                                   direction=DIRECTION_OUT),
+        }
+
+    def remove(self):
+        """
+        Drops the children of this stream from the registry, so a
+        long-running process that opens many sources does not keep them all.
+        """
+        for path in ("detected", "predicted", "motion_skipped"):
+            FRAMES_METRIC.remove(stream=self.stream, path=path)
+        for metric in (FRAME_SECONDS_METRIC, INFERENCE_SECONDS_METRIC,
+                       ACTIVE_TRACKS_METRIC):
+            metric.remove(stream=self.stream)
+        for direction in self.crossings:
+            CROSSINGS_METRIC.remove(stream=self.stream, direction=direction)
+
+
+##############################################################################
+# Class PeopleCounter (YOLO + Tracker + counting)
+##############################################################################
+class PeopleCounter:
+    def __init__(self, model_path=None, tracker_type="centroid", model=None,
+                 conf=DEFAULT_CONFIDENCE, verbose=True,
+                 max_detection_interval=1, backend=None,
+                 motion_gating=False,
+                 force_detection_interval=DEFAULT_FORCE_INTERVAL,
+                 roi_inference=False, roi_margin=DEFAULT_ROI_MARGIN,
+                 image_size=None, event_log=None, stream_id="default",
+                 detection_cache=None, tracker_kwargs=None):
+        """
+        :param model_path: path to the YOLO weights (default yolov8m.pt).
+        :param tracker_type: "centroid" (greedy) or "assignment" (Hungarian).
+        :param model: already loaded YOLO model to share between counters
+            (model_path is then ignored). Otherwise the model is loaded on
+            the first detection.
+        :param conf: detection confidence threshold.
+        :param verbose: ultralytics per-frame logging.
+        :param max_detection_interval: run YOLO at most every K frames
+            (K adapts to the number and speed of tracks); the frames in
+            between use the tracker motion prediction. Needs a tracker with
+            predict() ("assignment"), ValueError otherwise; 1 detects on
+            every frame.
+        :param backend: "pytorch", "onnx", "openvino" or "onnx_int8" (see
+            backends.py); defaults to the PEOPLE_COUNTER_BACKEND environment
+            variable.
+        :param motion_gating: skip YOLO while nothing moves inside the
+            zones (see MotionGate).
+        :param force_detection_interval: with motion gating, max frames
+            between two detections.
+        :param roi_inference: run YOLO only on the bounding region of the
+            zones plus roi_margin px; boxes are mapped back to the frame.
+        :param image_size: YOLO input size (default: the model's, 640).
+            A crop smaller than the frame gets a higher effective resolution.
+        :param event_log: EventLog receiving every counted crossing.
+        :param stream_id: name of this stream in the event log.
+        :param detection_cache: VideoDetections of the video being counted
+            (see detection_cache.py): cached frames skip YOLO, and the
+            boxes of the other frames are added to it.
+        :param tracker_kwargs: tracker options (e.g. max_distance).
+        """
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.backend = backend
+        self._model = model
+        # Loading may run in a background thread (see warm_up): the lock
+        # makes a detection wait for it instead of loading a second copy
+        self.model_lock = threading.Lock()
+        # Set when warm_up finished; model_error holds why it failed
+        self.model_ready = threading.Event()
+        self.model_error = None
+        self.tracker = create_tracker(tracker_type, **(tracker_kwargs or {}))
+        self.conf = conf
+        self.verbose = verbose
+
+        # Detection scheduling (see schedule_next_detection)
+        if max_detection_interval > 1 and not hasattr(self.tracker,
+                                                      "predict"):
+            raise ValueError(
+                f"O rastreador {tracker_type} não prevê movimento: "
+                "max_detection_interval > 1 precisa do rastreador "
+                "\"assignment\"."
+            )
+        self.max_detection_interval = max(1, max_detection_interval)
+        self.detection_interval = 1
+        self.frames_until_detection = 0
+        self.detected_frames = 0
+        self.predicted_frames = 0
+
+        # Detections already computed for this video (by frame index)
+        self.detection_cache = detection_cache
+        self.cached_frames = 0
+
+        # Region of interest (computed with the zones in set_areas)
+        self.roi_inference = roi_inference
+        self.roi_margin = roi_margin
+        self.image_size = image_size
+        self.roi = None
+
+        # Motion gating (built with the zones in set_areas)
+        self.motion_gating = motion_gating
+        self.force_detection_interval = force_detection_interval
+        self.motion_gate = None
+        self.motion_skipped_frames = 0
+        # Tracks of the last frame, shown again while detection is skipped
+        self.last_bbox_ids = []
+
+        # Zone state of the live tracks only: an entry is released when its
+        # track ends (see release_tracks), so memory does not grow with time
+        self.people_entering = {}
+        self.people_exiting = {}
+        self.entering = set()
+        self.exiting = set()
+        # Totals since the start
+        self.people_in = 0
+        self.people_out = 0
+
+        # Zone layout and its compiled geometry (see set_layout)
+        self.layout = None
+        self.zones = None
+        self.tripwires = None
+        self.area1_zone = None
+        self.area2_zone = None
+        # Tripwires: last foot point of every live track (sorted by id),
+        # crossings already counted per track and totals per line
+        self.foot_ids = np.empty(0, dtype=np.int64)
+        self.foot_points = np.empty((0, 2), dtype=np.int64)
+        self.line_crossed = {}
+        self.line_counts = {}
+
+        self.event_log = event_log
+        self.stream_id = stream_id
+        self.frame_index = -1
+        # Recorded videos: event time = start + frame_index / fps
+        self.recording_start = None
+        self.recording_fps = None
+
+        # Metric children, rebuilt when stream_id changes
+        self.metrics = None
+        self.metrics_stream = None
+
+    @property
+    def model(self):
+        with self.model_lock:
+            if self._model is None:
+                self._model = load_model(self.model_path, self.backend)
+                MODEL_METRIC.labels(
+                    model_path=self.model_path,
+                    backend=self.backend or default_backend(),
+                ).set(1)
+            return self._model
+
+    def warm_up(self, frame_size=(640, 480)):
+        """
+        Loads the model and runs one inference on a black frame, so the
+        first real frame does not pay for the lazy initializations of the
+        runtime (kernel selection, memory allocation). Meant to run in a
+        background thread when the application starts; detections wait
+        for it. A failure is kept in model_error (and raised), so the
+        waiting side does not wait forever.
+        :param frame_size: (width, height) of the dummy frame.
+        :return: seconds spent.
+        """
+        start = time.perf_counter()
+        width, height = frame_size
+        predict_kwargs = {}
+        if self.image_size:
+            predict_kwargs["imgsz"] = self.image_size
+        try:
+            self.model.predict(
+                np.zeros((height, width, 3), dtype=np.uint8), conf=self.conf,
+                classes=[PERSON_CLASS_ID], verbose=False, **predict_kwargs
+            )
+        except Exception as e:
+            self.model_error = e
+            self.model_ready.set()
+            raise
+        seconds = time.perf_counter() - start
+        MODEL_LOAD_METRIC.labels(
+            model_path=self.model_path,
+            backend=self.backend or default_backend(),
+        ).set(seconds)
+        self.model_ready.set()
+        return seconds
+
+    def wait_model(self, timeout=None):
+        """
+        Waits for warm_up to finish.
+        :return: True once it finished; check model_error for a failure.
+        """
+        return self.model_ready.wait(timeout)
+
+    def stream_metrics(self):
+        if self.metrics_stream != self.stream_id:
+            # A new source (e.g. the GUI opening another file)
+            self.release_metrics()
+            self.metrics_stream = self.stream_id
+            self.metrics = StreamMetrics(self.stream_id)
+        return self.metrics
+
+    def release_metrics(self):
+        """
+        Removes the metrics of the current stream (when it is closed).
+        """
+        if self.metrics is not None:
+            self.metrics.remove()
+        self.metrics = None
+        self.metrics_stream = None
+
+    def set_areas(self, area1, area2, frame_size):
+        """
+        Uses the two areas drawn in the VideoWidget as the zone layout.
+        :param frame_size: (width, height) of the processed frames.
+        """
+        self.set_layout(ZoneLayout.from_areas(area1, area2), frame_size)
+
+    def set_layout(self, layout, frame_size):
+        """
+        Compiles the zones and tripwires of a ZoneLayout. Called once when
+        the zones are drawn or loaded, since they do not change while the
+        video plays. The area1/area2 entrance/exit logic runs when the
+        layout has zones with those names.
+        :param frame_size: (width, height) of the processed frames.
+        """
+        self.layout = layout
+        self.zones, self.tripwires = layout.compile(frame_size)
+        self.area1_zone = layout.zone_index(AREA1_NAME)
+        self.area2_zone = layout.zone_index(AREA2_NAME)
+        for name in self.tripwires.names:
+            self.line_counts.setdefault(name, [0, 0])
+
+        if self.roi_inference:
+            self.roi = self.zones.bounding_rect(self.roi_margin,
+                                                layout.line_points())
+        if self.motion_gating:
+            gate_mask = self.zones.mask != 0
+            if len(self.tripwires):
+                gate_mask |= self.tripwires.draw_mask(
+                    frame_size, TRIPWIRE_MOTION_WIDTH
+                ) != 0
+            self.motion_gate = MotionGate(
+                gate_mask, force_interval=self.force_detection_interval
+            )
+
+    def process_frame(self, frame, area1=None, area2=None, draw=True,
+                      frame_index=None):
+        """
+        Receives a frame (BGR), areas (area1, area2) and returns processed frame.
+        With draw=False the frame is left untouched (headless runs); see
+        count_frame to get the tracks and counts instead.
+        """
+        result = self.count_frame(frame, area1, area2, frame_index)
+        if draw:
+            draw_overlay(frame, result, self.zones, self.tripwires)
+        return frame
+
+    def count_frame(self, frame, area1=None, area2=None, frame_index=None):
+        """
+        Counting stage only: detection (or prediction), tracking and the
+        in/out logic. The frame is not modified.
+        area1/area2 are compiled when the frame size changes; leave them
+        None to keep the layout given to set_layout.
+        frame_index is the position in the video when frames are skipped
+        (default: one more than the previous frame).
+        frame may be None when the detection cache has every frame
+        (replay): the layout must be set and motion gating off, since it
+        needs the pixels.
+        :return: FrameResult
+        """
+        if frame is None:
+            if self.zones is None:
+                raise ValueError("Defina as zonas antes de contar sem frame.")
+            if self.motion_gate is not None:
+                raise ValueError("O filtro de movimento precisa do frame.")
+        else:
+            frame_size = (frame.shape[1], frame.shape[0])
+            if self.zones is None or self.zones.frame_size != frame_size:
+                layout = self.layout
+                if area1 is not None:
+                    layout = ZoneLayout.from_areas(area1, area2)
+                self.set_layout(layout, frame_size)
+        if frame_index is None:
+            frame_index = self.frame_index + 1
+
+        metrics = self.stream_metrics()
+        start = time.perf_counter()
+        if self.frames_until_detection > 0:
+            self.frames_until_detection -= 1
+            self.predicted_frames += 1
+            metrics.predicted_frames.inc()
+            result = self.count_tracks(self.tracker.predict(), frame_index)
+        elif self.motion_gate and not self.motion_gate.should_detect(frame):
+            # Static scene: nobody moved, the tracks stay where they were
+            self.motion_skipped_frames += 1
+            metrics.motion_skipped_frames.inc()
+            result = self.count_tracks(self.last_bbox_ids, frame_index)
+        else:
+            bboxes = self.detect(frame, frame_index)
+            result = self.count_detections(bboxes, frame_index)
+        metrics.frame_seconds.observe(time.perf_counter() - start)
+        return result
+
+    def detect(self, frame, frame_index=None):
+        """
+        Runs YOLO on the frame (or its region of interest) and returns the
+        (N, 4) person boxes in frame coordinates. With a detection cache,
+        frame_index selects the cached boxes, and frame may be None when
+        they are cached.
+        """
+        cache = self.detection_cache if frame_index is not None else None
+        if cache is not None:
+            bboxes = cache.get(frame_index)
+            if bboxes is not None:
+                self.cached_frames += 1
+                return bboxes
+        if frame is None:
+            raise ValueError(
+                f"Frame {frame_index} ausente do cache de detecções."
+            )
+
+        bboxes = self.run_model(frame)
+        if cache is not None:
+            cache.put(frame_index, bboxes)
+        return bboxes
+
+    def run_model(self, frame):
+        predict_kwargs = {}
+        if self.image_size:
+            predict_kwargs["imgsz"] = self.image_size
+        model = self.model
+        with self.stream_metrics().inference_seconds.time():
+            results = model.predict(
+                self.detection_input(frame), conf=self.conf,
+                classes=[PERSON_CLASS_ID], verbose=self.verbose,
+                **predict_kwargs
+            )
+            if len(results) == 0:
+                return np.empty((0, 4), dtype=np.int32)
+            return self.to_frame_boxes(results[0].boxes.data)
+
+    def detection_input(self, frame):
+        """
+        Image given to YOLO: the frame, or a view of its region of interest.
+        """
+        if self.roi is None:
+            return frame
+        x1, y1, x2, y2 = self.roi
+        return frame[y1:y2, x1:x2]
+
+    def to_frame_boxes(self, boxes_data):
+        """
+        Filters the YOLO output of detection_input() into (N, 4) person
+        boxes in frame coordinates.
+        """
+        bboxes = filter_person_boxes(boxes_data, conf=self.conf)
+        if self.roi is not None:
+            x1, y1 = self.roi[:2]
+            bboxes += np.array([x1, y1, x1, y1], dtype=np.int32)
+        return bboxes
+
+    def count_detections(self, bboxes, frame_index=None):
+        """
+        Tracking and in/out counting for boxes already detected (by
+        detect() or by a batched predict shared between counters).
+        set_areas must have been called before.
+        :return: FrameResult
+        """
+        # Updates tracker
+        bbox_ids = self.tracker.update(bboxes)
+        self.release_tracks(self.tracker.removed_ids)
+        self.detected_frames += 1
+        self.stream_metrics().detected_frames.inc()
+        self.schedule_next_detection()
+        return self.count_tracks(bbox_ids, frame_index)
+
+    def schedule_next_detection(self):
+        """
+        Chooses how many frames to skip before the next detection: fewer
+        when tracks move fast (the prediction would drift more than
+        MOTION_BUDGET px) or when the scene is crowded. New tracks have no
+        velocity yet, so the next frame is detected again.
+        """
+        if self.max_detection_interval == 1:
+            return
+        track_count, max_speed = self.tracker.motion_stats()
+        if track_count == 0:
+            interval = self.max_detection_interval
+        elif max_speed is None:
+            interval = 1
+        else:
+            interval = int(MOTION_BUDGET / max(max_speed, 1e-6))
+            if track_count >= CROWDED_TRACKS:
+                interval //= 2
+        self.detection_interval = int(
+            np.clip(interval, 1, self.max_detection_interval)
+        )
+        self.frames_until_detection = self.detection_interval - 1
+
+    def count_tracks(self, bbox_ids, frame_index=None):
+        """
+        In/out counting for the tracked boxes of this frame (detected or
+        predicted).
+        :return: FrameResult
+        """
+        self.last_bbox_ids = bbox_ids
+        if frame_index is None:
+            frame_index = self.frame_index + 1
+        self.frame_index = frame_index
+
+        # Verifies in/out
+        tracks = np.asarray(bbox_ids, dtype=np.int64).reshape(-1, 5)
+        flags = self.zones.lookup(tracks[:, 2:4])
+        in_area1, in_area2, counted, new_events = (
+            self.handle_entrance_exit(tracks, flags)
+        )
+        line_events = []
+        if len(self.tripwires):
+            line_events = self.handle_tripwires(tracks)
+            new_events += [(obj_id, direction)
+                           for obj_id, _, direction in line_events]
+        if self.event_log is not None:
+            self.log_events(new_events)
+
+        metrics = self.stream_metrics()
+        metrics.active_tracks.set(len(tracks))
+        for _, direction in new_events:
+            metrics.crossings[direction].inc()
+        return FrameResult(frame_index, tracks, in_area1, in_area2, counted,
+                           self.get_counts(), new_events, flags, line_events)
+
+    def release_tracks(self, track_ids):
+        """
+        Drops the zone state of tracks that ended. Their crossings are
+        already in people_in/people_out; a track that ended in the middle
+        of a crossing is not counted, as before.
+        """
+        for obj_id in track_ids:
+            self.people_entering.pop(obj_id, None)
+            self.people_exiting.pop(obj_id, None)
+            self.entering.discard(obj_id)
+            self.exiting.discard(obj_id)
+            self.line_crossed.pop(obj_id, None)
+        if len(track_ids) and len(self.foot_ids):
+            alive = ~np.isin(self.foot_ids, np.asarray(track_ids, np.int64))
+            self.foot_ids = self.foot_ids[alive]
+            self.foot_points = self.foot_points[alive]
+
+    def set_recording_clock(self, start_timestamp, fps):
+        """
+        Timestamps events from the video time instead of the wall clock.
+        :param start_timestamp: epoch seconds of the first frame.
+        """
+        self.recording_start = start_timestamp
+        self.recording_fps = fps
+
+    def log_events(self, new_events):
+        """
+        Sends the crossings of this frame to the event log (queued only).
+        """
+        if not new_events:
+            return
+        timestamp = None
+        if self.recording_start is not None:
+            timestamp = (self.recording_start
+                         + self.frame_index / self.recording_fps)
+        for obj_id, direction in new_events:
+            self.event_log.record(self.stream_id, obj_id, direction,
+                                  self.frame_index, timestamp)
+
+    def handle_entrance_exit(self, tracks, flags):
+        """
+        Updates the entering/exiting state of every tracked object, using
+        the foot point (x2, y2) of each box and one mask lookup per frame.
+        :param tracks: (N, 5) array of [x1, y1, x2, y2, id].
+        :param flags: zone flags of the foot points (ZoneMask.lookup).
+        :return: (in_area1, in_area2, counted, new crossings)
+        """
+        new_events = []
+        counted = np.zeros(len(tracks), dtype=bool)
+        if self.area1_zone is None or self.area2_zone is None:
+            # Layout without the two areas: only tripwires count
+            outside = np.zeros(len(tracks), dtype=bool)
+            return outside, outside, counted, new_events
+        in_area1 = self.zones.contains(flags, self.area1_zone)
+        in_area2 = self.zones.contains(flags, self.area2_zone)
+
+        # Only objects inside a zone can change the counting state
+        for index in np.flatnonzero(in_area1 | in_area2):
+            x3, y3, x4, y4, obj_id = tracks[index].tolist()
+
+            # Verifies area2 → people_entering
+            if in_area2[index]:
+                self.people_entering[obj_id] = (x4, y4)
+
+            # If it is in people_entering, check if reaches area1
+            if obj_id in self.people_entering and in_area1[index]:
+                if obj_id not in self.entering:
+                    new_events.append((obj_id, DIRECTION_IN))
+                    self.people_in += 1
+                self.entering.add(obj_id)
+                counted[index] = True
+
+            # Verifies area1 → people_exiting
+            if in_area1[index]:
+                self.people_exiting[obj_id] = (x4, y4)
+
+            # If it is in people_exiting, check if reaches área2
+            if obj_id in self.people_exiting and in_area2[index]:
+                if obj_id not in self.exiting:
+                    new_events.append((obj_id, DIRECTION_OUT))
+                    self.people_out += 1
+                self.exiting.add(obj_id)
+                counted[index] = True
+
+        return in_area1, in_area2, counted, new_events
+
+    def handle_tripwires(self, tracks):
+        """
+        Tests the foot point motion of every track since its last frame
+        against every tripwire at once. Each track is counted at most once
+        per line and direction.
+        :param tracks: (N, 5) array of [x1, y1, x2, y2, id].
+        :return: new crossings, [(id, line name, direction)]
+        """
+        ids = tracks[:, 4]
+        points = tracks[:, 2:4]
+        # Last foot point of the tracks already seen
+        positions = np.searchsorted(self.foot_ids, ids)
+        positions = np.minimum(positions, max(len(self.foot_ids) - 1, 0))
+        known = np.zeros(len(ids), dtype=bool)
+        if len(self.foot_ids):
+            known = self.foot_ids[positions] == ids
+
+        line_events = []
+        if known.any():
+            crossings = self.tripwires.crossings(
+                self.foot_points[positions[known]], points[known]
+            )
+            known_ids = ids[known].tolist()
+            for row, line_index in zip(*np.nonzero(crossings)):
+                obj_id = known_ids[row]
+                direction = (DIRECTION_IN
+                             if crossings[row, line_index] == CROSSING_IN
+                             else DIRECTION_OUT)
+                crossed = self.line_crossed.setdefault(obj_id, set())
+                if (line_index, direction) in crossed:
+                    continue
+                crossed.add((line_index, direction))
+                name = self.tripwires.names[line_index]
+                if direction == DIRECTION_IN:
+                    self.people_in += 1
+                    self.line_counts[name][0] += 1
+                else:
+                    self.people_out += 1
+                    self.line_counts[name][1] += 1
+                line_events.append((obj_id, name, direction))
+
+        # New foot points replace the old ones (ids stay sorted)
+        others = ~np.isin(self.foot_ids, ids)
+        foot_ids = np.concatenate([self.foot_ids[others], ids])
+        foot_points = np.concatenate([self.foot_points[others], points])
+        order = np.argsort(foot_ids, kind="stable")
+        self.foot_ids = foot_ids[order]
+        self.foot_points = foot_points[order]
+        return line_events
+
+    def get_stats(self):
+        """
+        Frame counters: how many frames were detected (cached_frames of
+        them from the detection cache), were predicted by the tracker or
+        skipped by the motion gate.
+        """
+        processed = (self.detected_frames + self.predicted_frames
+                     + self.motion_skipped_frames)
+        return {
+            "processed_frames": processed,
+            "detected_frames": self.detected_frames,
+            "predicted_frames": self.predicted_frames,
+            "motion_skipped_frames": self.motion_skipped_frames,
+            "cached_frames": self.cached_frames,
+            "motion_skipped_ratio": (
+                self.motion_skipped_frames / max(processed, 1)
+            ),
+        }
+
+    def get_counts(self):
+        """
+        Returns (people in, people out).
+        """
+        return self.people_in, self.people_out
+
+    def get_line_counts(self):
+        """
+        Returns {line name: (people in, people out)} of the tripwires.
+        """
+        return {name: tuple(counts)
+                for name, counts in self.line_counts.items()}
@@ -0,0 +1,181 @@
+"""
+On-disk cache of per-frame person detections.
+
+Tuning the zones of a recorded video only changes the tracker/zone stage,
+so the YOLO boxes of each frame can be computed once and replayed. A
+DetectionCache is bound to a model, confidence threshold and input size;
+open(video_path) returns the VideoDetections of one video, keyed by a
+fingerprint of the file contents (size plus hashed head and tail chunks),
+so a renamed copy still hits and a re-encoded file does not.
+
+Each entry is a directory with three .npy arrays, loaded memory-mapped:
+  frame_indices (K,) int64, sorted frames that have detections
+  offsets (K + 1,) int64, rows of each frame in boxes
+  boxes (M, 4) int32, person boxes (x1, y1, x2, y2) in frame coordinates
+and a meta.json with the frame size, fps and frame count of the video.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "local_database", "detection_cache"
+)
+FINGERPRINT_CHUNK = 4 * 1024 * 1024  # bytes hashed at each end of the file
+ARRAY_NAMES = ["frame_indices", "offsets", "boxes"]
+
+
+def file_fingerprint(file_path, chunk_size=FINGERPRINT_CHUNK):
+    """
+    SHA-1 of the file size and of its first and last chunk_size bytes:
+    cheap on multi-GB recordings and enough to tell videos apart.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(file_path, "rb") as f:
+        digest.update(f.read(chunk_size))
+        if size > chunk_size:
+            f.seek(max(chunk_size, size - chunk_size))
+            digest.update(f.read(chunk_size))
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, model_name="yolov8m.pt",
+                 conf=0.5, image_size=None):
+        """
+        :param model_name: identifies the detector (weights and backend).
+        :param conf: confidence threshold the boxes were filtered with.
+        :param image_size: YOLO input size (None = model default).
+        """
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.conf = conf
+        self.image_size = image_size
+
+    def key(self, video_path, region=None):
+        """
+        :param region: anything else the boxes depend on (e.g. the zones
+            when detection only runs on their region of interest).
+        """
+        parts = [file_fingerprint(video_path), self.model_name,
+                 f"{self.conf:.4f}", str(self.image_size)]
+        if region is not None:
+            parts.append(json.dumps(region, sort_keys=True))
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def open(self, video_path, region=None):
+        """
+        :return: VideoDetections of the video (empty on a cache miss).
+        """
+        entry_dir = os.path.join(self.cache_dir,
+                                 self.key(video_path, region))
+        return VideoDetections(entry_dir)
+
+
+class VideoDetections:
+    def __init__(self, entry_dir):
+        self.entry_dir = entry_dir
+        self.frame_size = None
+        self.fps = None
+        self.frame_count = 0
+
+        # Stored entries (memory-mapped) and the ones added by this run
+        self.frame_indices = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.boxes = np.empty((0, 4), dtype=np.int32)
+        self.added = {}
+
+        meta_path = os.path.join(entry_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.frame_size = tuple(meta["frame_size"])
+            self.fps = meta["fps"]
+            self.frame_count = meta["frame_count"]
+            self.frame_indices, self.offsets, self.boxes = [
+                np.load(os.path.join(entry_dir, name + ".npy"),
+                        mmap_mode="r")
+                for name in ARRAY_NAMES
+            ]
+
+    def __len__(self):
+        return len(self.frame_indices) + len(self.added)
+
+    def get(self, frame_index):
+        """
+        :return: (N, 4) int32 boxes of the frame, or None on a miss.
+        """
+        position = np.searchsorted(self.frame_indices, frame_index)
+        if (position < len(self.frame_indices)
+                and self.frame_indices[position] == frame_index):
+            start, end = self.offsets[position], self.offsets[position + 1]
+            return np.array(self.boxes[start:end])
+        return self.added.get(frame_index)
+
+    def put(self, frame_index, boxes):
+        self.added[int(frame_index)] = np.asarray(boxes, dtype=np.int32)
+
+    def covers(self, frame_count, stride=1, first_frame=0):
+        """
+        True when every frame range(first_frame, frame_count, stride) is
+        cached, so the video does not need to be decoded at all.
+        """
+        if frame_count <= first_frame:
+            return False
+        wanted = np.arange(first_frame, frame_count, stride)
+        cached = np.union1d(self.frame_indices,
+                            np.fromiter(self.added, dtype=np.int64))
+        return bool(np.isin(wanted, cached, assume_unique=True).all())
+
+    def save(self, frame_size, fps, frame_count):
+        """
+        Merges the new detections into the entry and writes it.
+        """
+        if not self.added and self.frame_count >= frame_count:
+            return
+        frames = {
+            int(frame_index): np.array(
+                self.boxes[self.offsets[position]:self.offsets[position + 1]]
+            )
+            for position, frame_index in enumerate(self.frame_indices)
+        }
+        frames.update(self.added)
+        frame_indices = np.array(sorted(frames), dtype=np.int64)
+        counts = [len(frames[frame_index]) for frame_index in frame_indices]
+        arrays = {
+            "frame_indices": frame_indices,
+            "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(
+                np.int64
+            ),
+            "boxes": (
+                np.concatenate([frames[i] for i in frame_indices])
+                if len(frame_indices) else np.empty((0, 4), dtype=np.int32)
+            ).astype(np.int32).reshape(-1, 4),
+        }
+
+        # Arrays first, meta.json last: an entry without it is ignored
+        os.makedirs(self.entry_dir, exist_ok=True)
+        meta_path = os.path.join(self.entry_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        self.frame_indices = self.offsets = self.boxes = None
+        for name, array in arrays.items():
+            np.save(os.path.join(self.entry_dir, name + ".npy"), array)
+        with open(meta_path, "w") as f:
+            json.dump({
+                "frame_size": list(frame_size),
+                "fps": fps,
+                "frame_count": max(frame_count, self.frame_count),
+            }, f)
+
+        self.frame_indices = arrays["frame_indices"]
+        self.offsets = arrays["offsets"]
+        self.boxes = arrays["boxes"]
+        self.added = {}
+        self.frame_size = tuple(frame_size)
+        self.fps = fps
+        self.frame_count = max(frame_count, self.frame_count)
@@ -0,0 +1,37 @@
+"""
+Detection post-processing for the people counter.
+
+Converts the raw YOLO output (rows of x1, y1, x2, y2, confidence, class)
+into the integer bounding boxes consumed by the trackers, using a single
+NumPy operation per frame instead of a per-box Python loop.
+"""
+import numpy as np
+
+PERSON_CLASS_ID = 0
+DEFAULT_CONFIDENCE = 0.5
+
+
+def boxes_to_array(boxes_data):
+    """
+    Returns the YOLO boxes data as a float32 NumPy array of shape (N, 6).
+    :param boxes_data: torch tensor, NumPy array or nested list of rows.
+    """
+    if hasattr(boxes_data, "cpu"):
+        boxes_data = boxes_data.cpu().numpy()
+    boxes = np.asarray(boxes_data, dtype=np.float32)
+    if boxes.size == 0:
+        return np.empty((0, 6), dtype=np.float32)
+    return boxes.reshape(-1, boxes.shape[-1])
+
+
+def filter_person_boxes(boxes_data, conf=DEFAULT_CONFIDENCE,
+                        class_id=PERSON_CLASS_ID):
+    """
+    Keeps the boxes of the given class above the confidence threshold.
+    :param boxes_data: rows of (x1, y1, x2, y2, confidence, class).
+    :return: (N, 4) int32 array of (x1, y1, x2, y2).
+    """
+    boxes = boxes_to_array(boxes_data)
+    keep = (boxes[:, 5] == class_id) & (boxes[:, 4] >= conf)
+    # astype truncates toward zero, matching the previous int() per box
+    return boxes[keep, :4].astype(np.int32)
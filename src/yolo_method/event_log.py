@@ -0,0 +1,256 @@
+"""
+Append-only log of counted crossings.
+
+EventLog stores every crossing (timestamp, stream, track id, direction,
+frame index) in a local SQLite database in WAL mode. record() only puts
+the event in a queue; a background thread writes the events in batched
+transactions, so the per-frame path never waits for the disk.
+count_events/count_by_interval answer count queries over any time range
+without reprocessing video.
+
+Query from the command line:
+    python -m src.yolo_method.event_log [DB] [--start ISO] [--end ISO]
+        [--stream NAME]
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_EVENT_DB = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "local_database", "crossings.db"
+)
+FLUSH_INTERVAL = 1.0  # seconds
+FLUSH_TIMEOUT = 5.0  # seconds flush() waits for the writer
+MAX_BATCH_SIZE = 500
+
+INSERT_CROSSING = (
+    "INSERT INTO crossings (timestamp, stream, track_id, direction, "
+    "frame_index) VALUES (?, ?, ?, ?, ?)"
+)
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS crossings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        stream TEXT NOT NULL,
+        track_id INTEGER NOT NULL,
+        direction TEXT NOT NULL,
+        frame_index INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS crossings_time ON crossings (timestamp)",
+    """CREATE INDEX IF NOT EXISTS crossings_stream_time
+        ON crossings (stream, timestamp)""",
+]
+
+
+class EventLog:
+    def __init__(self, db_path=DEFAULT_EVENT_DB,
+                 flush_interval=FLUSH_INTERVAL,
+                 max_batch_size=MAX_BATCH_SIZE):
+        """
+        Opens (or creates) the database and starts the writer thread.
+        :param flush_interval: max time (s) an event waits before commit.
+        :param max_batch_size: max events per transaction.
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                connection.execute(statement)
+        connection.close()
+
+        self.events = queue.Queue()
+        self.closed = False
+        # Events lost to write errors (disk full, database locked...)
+        self.failed_events = 0
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(self, stream, track_id, direction, frame_index,
+               timestamp=None):
+        """
+        Queues one crossing; never blocks on disk I/O.
+        :param timestamp: epoch seconds (default: now).
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.events.put_nowait(
+            (timestamp, stream, int(track_id), direction, int(frame_index))
+        )
+
+    def _write_loop(self):
+        connection = self._connect()
+        try:
+            running = True
+            while running:
+                batch, running = self._next_batch()
+                try:
+                    if batch:
+                        with connection:
+                            connection.executemany(INSERT_CROSSING, batch)
+                except sqlite3.Error as e:
+                    # The writer keeps running: a dead thread would make
+                    # flush() wait for events nobody writes
+                    self.failed_events += len(batch)
+                    print(f"Erro ao gravar {len(batch)} passagens: {e}")
+                finally:
+                    for _ in batch:
+                        self.events.task_done()
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        """
+        Collects events until max_batch_size or flush_interval.
+        :return: (rows, False once the close marker was reached).
+        """
+        batch = []
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.events.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.events.task_done()
+                return batch, False
+            batch.append(item)
+        return batch, True
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """
+        Waits until every queued event is committed (or failed).
+        :param timeout: max seconds to wait (None: no limit).
+        :return: False when events are still pending (timeout, or the
+            writer thread stopped).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.events.all_tasks_done:
+            while self.events.unfinished_tasks:
+                if not self.writer.is_alive():
+                    break
+                wait = FLUSH_INTERVAL
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        break
+                self.events.all_tasks_done.wait(wait)
+            pending = self.events.unfinished_tasks
+        if pending:
+            print(f"Aviso: {pending} passagens ainda não gravadas.")
+        return pending == 0
+
+    def close(self):
+        """
+        Writes the pending events and stops the writer thread.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.events.put(None)
+        self.writer.join()
+
+    def _where(self, start, end, stream):
+        clauses = []
+        params = []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(to_epoch(end))
+        if stream is not None:
+            clauses.append("stream = ?")
+            params.append(stream)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def count_events(self, start=None, end=None, stream=None):
+        """
+        Counts crossings per direction in [start, end).
+        :param start/end: epoch seconds or datetime (None = unbounded).
+        :return: {"in": n, "out": m}
+        """
+        where, params = self._where(start, end, stream)
+        counts = {"in": 0, "out": 0}
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT direction, COUNT(*) FROM crossings{where} "
+                "GROUP BY direction",
+                params,
+            ).fetchall()
+        finally:
+            connection.close()
+        counts.update(dict(rows))
+        return counts
+
+    def count_by_interval(self, start, end, interval_seconds, stream=None):
+        """
+        Counts crossings per direction in consecutive buckets.
+        :return: list of (bucket start epoch, {"in": n, "out": m}).
+        """
+        start = to_epoch(start)
+        where, params = self._where(start, end, stream)
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT CAST((timestamp - ?) / ? AS INTEGER) AS bucket, "
+                f"direction, COUNT(*) FROM crossings{where} "
+                "GROUP BY bucket, direction ORDER BY bucket",
+                [start, interval_seconds] + params,
+            ).fetchall()
+        finally:
+            connection.close()
+
+        buckets = {}
+        for bucket, direction, count in rows:
+            counts = buckets.setdefault(bucket, {"in": 0, "out": 0})
+            counts[direction] = count
+        return [
+            (start + bucket * interval_seconds, counts)
+            for bucket, counts in sorted(buckets.items())
+        ]
+
+
+def to_epoch(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Contagem de passagens registradas no banco de eventos."
+    )
+    parser.add_argument("db", nargs="?", default=DEFAULT_EVENT_DB)
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--stream")
+    args = parser.parse_args()
+
+    event_log = EventLog(args.db)
+    counts = event_log.count_events(args.start, args.end, args.stream)
+    event_log.close()
+    print(f"Entradas: {counts['in']}  Saídas: {counts['out']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Cheap motion pre-stage to skip YOLO on static scenes.
+
+MotionGate compares a small grayscale copy of each frame with the previous
+one, only inside the drawn zones. When the share of changed pixels stays
+under a threshold the frame is considered static and detection can be
+skipped; a detection is still forced every force_interval frames so a
+person standing still is not lost for good.
+"""
+import cv2
+import numpy as np
+
+DEFAULT_SCALE = 0.25
+DEFAULT_FORCE_INTERVAL = 30  # frames
+PIXEL_THRESHOLD = 15  # gray level change counted as motion
+CHANGED_RATIO = 0.002  # share of zone pixels that must change
+ZONE_MARGIN = 15  # px (full resolution) added around the zones
+
+
+class MotionGate:
+    def __init__(self, zone_mask, scale=DEFAULT_SCALE,
+                 force_interval=DEFAULT_FORCE_INTERVAL):
+        """
+        :param zone_mask: (height, width) array, non-zero inside the zones.
+        :param scale: downscale factor applied before differencing.
+        :param force_interval: max frames between two detections.
+        """
+        self.scale = scale
+        self.force_interval = force_interval
+
+        height, width = zone_mask.shape
+        self.size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        region = (zone_mask != 0).astype(np.uint8)
+        margin = max(1, int(ZONE_MARGIN * scale))
+        region = cv2.resize(region, self.size, interpolation=cv2.INTER_NEAREST)
+        region = cv2.dilate(region, np.ones((2 * margin + 1,) * 2, np.uint8))
+        self.region = region.astype(bool)
+        self.region_pixels = max(1, int(self.region.sum()))
+
+        self.previous = None
+        self.frames_since_detection = 0
+
+    def should_detect(self, frame):
+        """
+        Returns True when the zones changed since the previous frame, or
+        when no detection ran for force_interval frames.
+        """
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        previous = self.previous
+        self.previous = small
+
+        forced = self.frames_since_detection + 1 >= self.force_interval
+        if previous is None or forced:
+            self.frames_since_detection = 0
+            return True
+
+        changed = cv2.absdiff(small, previous)[self.region] > PIXEL_THRESHOLD
+        if changed.sum() >= CHANGED_RATIO * self.region_pixels:
+            self.frames_since_detection = 0
+            return True
+
+        self.frames_since_detection += 1
+        return False
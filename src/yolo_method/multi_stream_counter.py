@@ -0,0 +1,238 @@
+"""
+Batched people counting over several camera streams.
+
+MultiStreamCounter keeps a single YOLO model and one PeopleCounter per
+registered stream (its own tracker, zones and counts). Frames submitted by
+the streams are grouped into batches: a batch is closed when every stream
+has a frame waiting, when max_batch_size is reached, or when batch_window
+seconds have passed since its oldest frame. One predict call then runs on
+the whole batch.
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Local imports
+from ..utils.metrics import REGISTRY
+from .backends import load_model
+from .counter import DEFAULT_MODEL_PATH, PeopleCounter
+from .detections import DEFAULT_CONFIDENCE, PERSON_CLASS_ID
+
+DEFAULT_BATCH_WINDOW = 0.03  # seconds
+DEFAULT_MAX_BATCH_SIZE = 8
+MAX_PENDING_PER_STREAM = 2
+LATENCY_HISTORY = 1000
+
+BATCH_SECONDS_METRIC = REGISTRY.histogram(
+    "multi_stream_batch_seconds", "Batched predict latency"
+).labels()
+BATCH_SIZE_METRIC = REGISTRY.histogram(
+    "multi_stream_batch_size", "Frames per predict call",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16)
+).labels()
+PENDING_METRIC = REGISTRY.gauge(
+    "multi_stream_pending_frames", "Frames waiting for the next batch",
+    ["stream"]
+)
+
+
+class MultiStreamCounter:
+    def __init__(self, model_path=DEFAULT_MODEL_PATH,
+                 batch_window=DEFAULT_BATCH_WINDOW,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 tracker_type="centroid", conf=DEFAULT_CONFIDENCE,
+                 backend=None, roi_inference=False, model=None):
+        """
+        :param model_path: path to the YOLO weights shared by all streams.
+        :param batch_window: max time (s) the oldest frame waits for the
+            batch to fill. Larger values favour throughput, smaller latency.
+        :param max_batch_size: max number of frames per predict call.
+        :param tracker_type: tracker used by every stream.
+        :param conf: detection confidence threshold.
+        :param backend: inference backend (see backends.py).
+        :param roi_inference: detect only around each stream's zones.
+        :param model: already loaded model (model_path and backend are then
+            ignored).
+        """
+        if model is None:
+            model = load_model(model_path, backend, verbose=False)
+        self.model = model
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.tracker_type = tracker_type
+        self.conf = conf
+        self.roi_inference = roi_inference
+
+        self.counters = {}
+        self.latencies = {}
+
+        # Frames waiting for inference: (stream_id, frame, submit time)
+        self.pending = []
+        self.condition = threading.Condition()
+
+    def add_stream(self, stream_id, area1, area2, frame_size):
+        """
+        Registers a stream with its own tracker and zones.
+        :param frame_size: (width, height) of the stream frames.
+        """
+        counter = PeopleCounter(
+            model=self.model, tracker_type=self.tracker_type, conf=self.conf,
+            roi_inference=self.roi_inference, stream_id=stream_id,
+        )
+        counter.set_areas(area1, area2, frame_size)
+        with self.condition:
+            self.counters[stream_id] = counter
+            self.latencies[stream_id] = deque(maxlen=LATENCY_HISTORY)
+        PENDING_METRIC.labels(stream=stream_id).set_function(
+            lambda: self._pending_count(stream_id)
+        )
+
+    def remove_stream(self, stream_id):
+        with self.condition:
+            counter = self.counters.pop(stream_id, None)
+            if counter is not None:
+                counter.release_metrics()
+                PENDING_METRIC.remove(stream=stream_id)
+            self.latencies.pop(stream_id, None)
+            self.pending = [
+                item for item in self.pending if item[0] != stream_id
+            ]
+            self.condition.notify_all()
+
+    def submit(self, stream_id, frame):
+        """
+        Queues a frame of a registered stream for the next batch. Blocks
+        while the stream already has MAX_PENDING_PER_STREAM frames waiting,
+        so a fast file source cannot run ahead of inference.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self._pending_count(stream_id) < MAX_PENDING_PER_STREAM
+                or stream_id not in self.counters
+            )
+            if stream_id not in self.counters:
+                return
+            self.pending.append((stream_id, frame, time.perf_counter()))
+            self.condition.notify_all()
+
+    def _pending_count(self, stream_id):
+        return sum(1 for item in self.pending if item[0] == stream_id)
+
+    def _batch_target(self):
+        return max(1, min(self.max_batch_size, len(self.counters)))
+
+    def next_batch(self, timeout=None):
+        """
+        Waits for the next batch of pending frames.
+        :return: list of (stream_id, frame, submit time); empty on timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.pending, timeout):
+                return []
+
+            deadline = self.pending[0][2] + self.batch_window
+            while len(self.pending) < self._batch_target():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            batch = self.pending[:self.max_batch_size]
+            del self.pending[:self.max_batch_size]
+            self.condition.notify_all()
+            return batch
+
+    def process_batch(self, batch):
+        """
+        Runs one predict call on the batch and feeds each stream's counter.
+        Frames are not drawn on (see overlay.draw_overlay).
+        :return: list of (stream_id, frame, FrameResult).
+        """
+        if not batch:
+            return []
+
+        # Each stream may crop its own region of interest
+        images = [
+            self.counters[stream_id].detection_input(frame)
+            if stream_id in self.counters else frame
+            for stream_id, frame, _ in batch
+        ]
+        with BATCH_SECONDS_METRIC.time():
+            detections = self.model.predict(
+                images, conf=self.conf, classes=[PERSON_CLASS_ID],
+                verbose=False
+            )
+        BATCH_SIZE_METRIC.observe(len(images))
+
+        outputs = []
+        # Frames of the same stream stay in submit order within the batch
+        for (stream_id, frame, submitted), detection in zip(batch,
+                                                            detections):
+            counter = self.counters.get(stream_id)
+            if counter is None:
+                continue
+            bboxes = counter.to_frame_boxes(detection.boxes.data)
+            frame_result = counter.count_detections(bboxes)
+            self.latencies[stream_id].append(time.perf_counter() - submitted)
+            outputs.append((stream_id, frame, frame_result))
+        return outputs
+
+    def run(self, video_streams, on_result=None):
+        """
+        Processes registered streams until all of them end.
+        :param video_streams: dict stream_id -> VideoStream.
+        :param on_result: optional callback(stream_id, frame, FrameResult);
+            result.counts has (people in, people out).
+        """
+        readers = [
+            threading.Thread(
+                target=self._read_stream, args=(stream_id, video_stream),
+                daemon=True,
+            )
+            for stream_id, video_stream in video_streams.items()
+        ]
+        for reader in readers:
+            reader.start()
+
+        while any(reader.is_alive() for reader in readers) or self.pending:
+            batch = self.next_batch(timeout=0.5)
+            for stream_id, frame, frame_result in self.process_batch(batch):
+                if on_result is not None:
+                    on_result(stream_id, frame, frame_result)
+
+    def _read_stream(self, stream_id, video_stream):
+        while stream_id in self.counters:
+            ret, frame = video_stream.read()
+            if not ret:
+                break
+            self.submit(stream_id, frame)
+
+    def get_counts(self):
+        """
+        Returns {stream_id: (people in, people out)}.
+        """
+        return {
+            stream_id: counter.get_counts()
+            for stream_id, counter in self.counters.items()
+        }
+
+    def latency_stats(self):
+        """
+        Submit-to-result latency per stream, in milliseconds.
+        :return: {stream_id: {"mean", "p50", "p95", "max", "frames"}}
+        """
+        stats = {}
+        for stream_id, history in self.latencies.items():
+            if not history:
+                continue
+            values = np.array(history) * 1000
+            stats[stream_id] = {
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max()),
+                "frames": len(values),
+            }
+        return stats
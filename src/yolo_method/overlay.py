@@ -0,0 +1,101 @@
+"""
+Overlay renderer for the people counter.
+
+Draws a FrameResult of PeopleCounter (see counter.py) on its BGR frame:
+the zones and tripwires, the tracked boxes inside a zone with their IDs,
+the counted foot points and the totals. Counting never calls it, so
+headless, batch and multi-camera runs do not draw, and the GUI only draws
+the frames it shows.
+"""
+import cv2
+import numpy as np
+
+# BGR colors of the zones (area1 and area2 first), reused cyclically
+ZONE_COLORS = [(255, 0, 0), (0, 255, 0), (0, 165, 255), (255, 255, 0),
+               (0, 255, 255), (255, 0, 255)]
+LINE_COLOR = (0, 0, 255)
+ARROW_LENGTH = 25  # px, arrow pointing to the "in" side of a tripwire
+BOX_COLOR = (0, 255, 0)
+COUNTED_COLOR = (255, 0, 255)
+ID_COLOR = (255, 255, 255)
+
+
+def draw_overlay(frame, result, zones, tripwires=None):
+    """
+    Draws zones, tripwires, tracks and counts on the frame (in place).
+    :param result: FrameResult of the same frame.
+    :param zones: ZoneMask used by the counter.
+    :param tripwires: Tripwires used by the counter, if any.
+    :return: the frame.
+    """
+    has_tripwires = tripwires is not None and len(tripwires) > 0
+    draw_zones(frame, zones)
+    if has_tripwires:
+        draw_tripwires(frame, tripwires)
+    # Tripwires count tracks outside the zones too
+    draw_tracks(frame, result, show_all=has_tripwires)
+    draw_counts(frame, result.counts)
+    return frame
+
+
+def draw_zones(frame, zones):
+    for index, polygons in enumerate(zones.polygons):
+        color = ZONE_COLORS[index % len(ZONE_COLORS)]
+        cv2.polylines(frame, polygons, True, color, 2)
+        # Names only when the layout has more than the two drawn areas
+        if len(zones.polygons) > 2 and polygons:
+            x, y = polygons[0][0].tolist()
+            cv2.putText(frame, zones.names[index], (x, y - 5),
+                        cv2.FONT_HERSHEY_COMPLEX, 0.5, color, 1)
+
+
+def draw_tripwires(frame, tripwires):
+    """
+    Each line with its name and an arrow from its middle to the "in" side.
+    """
+    for name, start, end in zip(tripwires.names, tripwires.starts,
+                                tripwires.ends):
+        cv2.line(frame, tuple(start.astype(int).tolist()),
+                 tuple(end.astype(int).tolist()), LINE_COLOR, 2)
+        direction = end - start
+        length = np.hypot(*direction)
+        if length == 0:
+            continue
+        middle = (start + end) / 2
+        # Left normal in image coordinates (y down)
+        normal = np.array([direction[1], -direction[0]]) / length
+        tip = middle + ARROW_LENGTH * normal
+        cv2.arrowedLine(frame, tuple(middle.astype(int).tolist()),
+                        tuple(tip.astype(int).tolist()), LINE_COLOR, 2)
+        cv2.putText(frame, name, tuple(start.astype(int).tolist()),
+                    cv2.FONT_HERSHEY_COMPLEX, 0.5, LINE_COLOR, 1)
+
+
+def draw_tracks(frame, result, show_all=False):
+    """
+    Boxes and IDs of the tracks inside a zone (every track with show_all);
+    a dot on the foot point of the counted ones.
+    """
+    shown = result.zone_flags != 0
+    if show_all:
+        shown = np.ones(len(result.tracks), dtype=bool)
+    for index in np.flatnonzero(shown):
+        x3, y3, x4, y4, obj_id = result.tracks[index].tolist()
+        cv2.rectangle(frame, (x3, y3), (x4, y4), BOX_COLOR, 2)
+        if result.counted[index]:
+            cv2.circle(frame, (x4, y4), 5, COUNTED_COLOR, -1)
+        cv2.putText(frame, str(obj_id), (x3, y3),
+                    cv2.FONT_HERSHEY_COMPLEX, 0.5, ID_COLOR, 1)
+
+
+def draw_counts(frame, counts):
+    people_in, people_out = counts
+    cv2.putText(frame, "Subindo:", (10,80),
+                cv2.FONT_HERSHEY_COMPLEX, 0.7, (0,0,255),2)
+    cv2.putText(frame, str(people_in),(160,80),
+                cv2.FONT_HERSHEY_COMPLEX,0.7,(0,0,255),2)
+
+    cv2.putText(frame, "Descendo:", (10,140),
+                cv2.FONT_HERSHEY_COMPLEX, 0.7, (255,0,255),2)
+    cv2.putText(frame, str(people_out),(160,140),
+                cv2.FONT_HERSHEY_COMPLEX,0.7,(255,0,255),2)
@@ -1,150 +1,171 @@
 import sys
 import os
+import threading
+import time
 import cv2
-import pandas as pd
 import numpy as np
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QHBoxLayout, QPushButton, QFileDialog, QMessageBox, QLabel, QStackedWidget
+    QHBoxLayout, QPushButton, QFileDialog, QMessageBox, QLabel, QStackedWidget,
+    QInputDialog
 )
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QPoint
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen
+from PyQt5.QtCore import (
+    QObject, QThread, QTimer, Qt, pyqtSignal, QPointF, QSize
+)
+from PyQt5.QtGui import QImage, QPainter, QPen
 
 # Local imports
-from .tracker import Tracker
-from .video_stream import VideoStream
-from ultralytics import YOLO
+from ..utils.metrics import start_from_env
+from .counter import PeopleCounter, model_path
+from .event_log import EventLog
+from .overlay import draw_overlay
+from .video_stream import VideoStream, source_name
+from .zones import ZoneLayout, load_layout, save_layout
+
+# Presentation: used when the screen does not report its refresh rate
+DEFAULT_REFRESH_RATE = 60.0
+# FrameProcessor: max wait for a frame, so a camera reconnecting does not
+# block stopping the thread
+READ_TIMEOUT = 0.5  # seconds
+# Closing a video waits at most this for the event log; the writer thread
+# commits the rest in the background
+CLOSE_FLUSH_TIMEOUT = 0.25  # seconds
+# QImage can wrap OpenCV BGR buffers directly since Qt 5.14
+HAS_BGR888 = hasattr(QImage, "Format_BGR888")
 
 ##############################################################################
-# Model path adjustment
+# ModelLoader - loads and warms up models off the GUI thread
 ##############################################################################
-model_str = "yolov8m.pt"
-current_dir = os.path.dirname(os.path.abspath(__file__))
+class ModelLoader(QObject):
+    """
+    Runs a loading function (e.g. PeopleCounter.warm_up) in a background
+    thread started with the application, so the window shows up and
+    cameras open while the models load. The signals reach the GUI thread
+    queued. The thread is a daemon: closing the window does not wait for
+    a load in progress.
+    """
+    loaded = pyqtSignal(float)  # seconds spent
+    failed = pyqtSignal(str)
 
-if hasattr(sys, '_MEIPASS'):
-    model_path = os.path.join(sys._MEIPASS, model_str)
-else:
-    #If the model is located in ÿolo_models" inside "yolo_method" :
-    model_path = os.path.join(current_dir, "yolo_models", model_str)
+    def __init__(self, load, parent=None):
+        super().__init__(parent)
+        self.load = load
+        self.ready = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
 
-print("DEBUG: model_path =", model_path)
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.load()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.ready = True
+        self.loaded.emit(time.perf_counter() - start)
 
 
 ##############################################################################
-# Class PeopleCounter (YOLO + Tracker + counting)
+# FrameProcessor - runs the counting pipeline off the GUI thread
 ##############################################################################
-class PeopleCounter:
-    def __init__(self, model_path):
-        self.model = YOLO(model_path, verbose=True)
-        self.tracker = Tracker()
-
-        # Dictionaries for counting
-        self.people_entering = {}
-        self.people_exiting = {}
-        self.entering = set()
-        self.exiting = set()
-
-    def process_frame(self, frame, area1, area2):
-        """
-        Receives a frame (BGR), areas (area1, area2) and returns processed frame.
-        """
-        results = self.model.predict(frame, conf=0.5, classes=[0])
-        if len(results) == 0:
-            return frame
-        boxes_data = results[0].boxes.data
-
-        bbox_list = []
-        bbox_df = pd.DataFrame(boxes_data).astype("float")
-        for _, row in bbox_df.iterrows():
-            x1, y1, x2, y2, _, label = map(int, row)
-            if label == 0:
-                bbox_list.append([x1, y1, x2, y2])
-
-        # Updates tracker
-        bbox_ids = self.tracker.update(bbox_list)
-
-        # Draws polygons for ilustration
-        for quad in area1:
-            cv2.polylines(frame, [np.array(quad, np.int32)], True, (255, 0, 0), 2)
-        for quad in area2:
-            cv2.polylines(frame, [np.array(quad, np.int32)], True, (0, 255, 0), 2)
-
-        # Verifies in/out 
-        for bbox in bbox_ids:
-            x3, y3, x4, y4, obj_id = bbox
-            self.handle_entrance_exit(frame, x3, y3, x4, y4, obj_id, area1, area2)
-
-        # Draws counting 
-        self.display_count(frame)
-        return frame
+class FrameProcessor(QThread):
+    """
+    Reads frames from the VideoStream and runs PeopleCounter.count_frame
+    in a worker thread, as fast as the source delivers them.
+    Only the latest frame and its result are kept: frame_ready is emitted
+    once per frame the GUI has not collected yet, so a slow GUI skips frames
+    instead of queueing them. The overlay is drawn only on the frames the
+    GUI collects.
+    """
+    frame_ready = pyqtSignal()
+    counts_changed = pyqtSignal(int, int)  # (people in, people out)
+    stream_ended = pyqtSignal()
+    model_failed = pyqtSignal(str)
 
-    def handle_entrance_exit(self, frame, x3, y3, x4, y4, obj_id, area1, area2):
-        # Verifies area2 → people_entering
-        for quad in area2:
-            if cv2.pointPolygonTest(np.array(quad, np.int32), (x4, y4), False) >= 0:
-                self.people_entering[obj_id] = (x4, y4)
-                cv2.rectangle(frame, (x3, y3), (x4, y4), (0, 255, 0), 2)
-                cv2.putText(frame, str(obj_id), (x3, y3),
-                            cv2.FONT_HERSHEY_COMPLEX, 0.5, (255, 255, 255), 1)
-                break
-
-        # If it is in people_entering, check if reaches area1
-        if obj_id in self.people_entering:
-            for quad in area1:
-                if cv2.pointPolygonTest(np.array(quad, np.int32), (x4, y4), False) >= 0:
-                    cv2.rectangle(frame, (x3, y3), (x4, y4), (0, 255, 0), 2)
-                    cv2.circle(frame, (x4, y4), 5, (255, 0, 255), -1)
-                    cv2.putText(frame, str(obj_id), (x3, y3),
-                                cv2.FONT_HERSHEY_COMPLEX, 0.5, (255, 255, 255), 1)
-                    self.entering.add(obj_id)
-                    break
-
-        # Verifies area1 → people_exiting
-        for quad in area1:
-            if cv2.pointPolygonTest(np.array(quad, np.int32), (x4, y4), False) >= 0:
-                self.people_exiting[obj_id] = (x4, y4)
-                cv2.rectangle(frame, (x3, y3), (x4, y4), (0, 255, 0), 2)
-                cv2.putText(frame, str(obj_id), (x3, y3),
-                            cv2.FONT_HERSHEY_COMPLEX, 0.5, (255, 255, 255), 1)
-                break
-
-        # If it is in people_exiting, check if reaches área2
-        if obj_id in self.people_exiting:
-            for quad in area2:
-                if cv2.pointPolygonTest(np.array(quad, np.int32), (x4, y4), False) >= 0:
-                    cv2.rectangle(frame, (x3, y3), (x4, y4), (0, 255, 0), 2)
-                    cv2.circle(frame, (x4, y4), 5, (255, 0, 255), -1)
-                    cv2.putText(frame, str(obj_id), (x3, y3),
-                                cv2.FONT_HERSHEY_COMPLEX, 0.5, (255, 255, 255), 1)
-                    self.exiting.add(obj_id)
-                    break
-
-    def display_count(self, frame):
-        people_in = len(self.entering)
-        people_out = len(self.exiting)
-        cv2.putText(frame, "Subindo:", (10,80),
-                    cv2.FONT_HERSHEY_COMPLEX, 0.7, (0,0,255),2)
-        cv2.putText(frame, str(people_in),(160,80),
-                    cv2.FONT_HERSHEY_COMPLEX,0.7,(0,0,255),2)
-
-        cv2.putText(frame, "Descendo:", (10,140),
-                    cv2.FONT_HERSHEY_COMPLEX, 0.7, (255,0,255),2)
-        cv2.putText(frame, str(people_out),(160,140),
-                    cv2.FONT_HERSHEY_COMPLEX,0.7,(255,0,255),2)
+    def __init__(self, people_counter, video_stream, parent=None):
+        """
+        The zone layout must already be set on people_counter.
+        """
+        super().__init__(parent)
+        self.people_counter = people_counter
+        self.video_stream = video_stream
+
+        self.lock = threading.Lock()
+        self.latest_frame = None
+        self.latest_result = None
+        self.frame_pending = False
+
+    def run(self):
+        # The model may still be loading (see ModelLoader): frames wait in
+        # the stream (files) or are dropped (cameras) meanwhile
+        while not self.people_counter.wait_model(READ_TIMEOUT):
+            if self.isInterruptionRequested():
+                return
+        if self.people_counter.model_error is not None:
+            self.model_failed.emit(str(self.people_counter.model_error))
+            return
+
+        last_counts = None
+        while not self.isInterruptionRequested():
+            ret, frame = self.video_stream.read(timeout=READ_TIMEOUT)
+            if not ret:
+                if not self.video_stream.ended():
+                    # Network camera reconnecting: keep waiting
+                    continue
+                # End of video: its crossings are committed here, off the
+                # GUI thread
+                if self.people_counter.event_log is not None:
+                    self.people_counter.event_log.flush()
+                self.stream_ended.emit()
+                return
+
+            result = self.people_counter.count_frame(frame)
+
+            with self.lock:
+                self.latest_frame = frame
+                self.latest_result = result
+                notify = not self.frame_pending
+                self.frame_pending = True
+            if notify:
+                self.frame_ready.emit()
+
+            if result.counts != last_counts:
+                last_counts = result.counts
+                self.counts_changed.emit(*result.counts)
+
+    def take_latest_frame(self):
+        """
+        Returns the latest frame with its overlay drawn (None if already
+        taken). Called from the GUI thread.
+        """
+        with self.lock:
+            frame = self.latest_frame
+            result = self.latest_result
+            self.latest_frame = None
+            self.latest_result = None
+            self.frame_pending = False
+        if frame is not None:
+            draw_overlay(frame, result, self.people_counter.zones,
+                         self.people_counter.tripwires)
+        return frame
 
 
 ##############################################################################
 # VideoWidget - drawing the static frame 
 ##############################################################################
 class VideoWidget(QLabel):
-    areas_done_signal = pyqtSignal()  # Emits when both areas (area1, area2) are defined
+    # Emits when both areas (area1, area2) are defined
+    areas_done_signal = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAlignment(Qt.AlignCenter)
 
-        # Stores polygons
+        # Stores polygons (frame coordinates)
         self.area1 = []
         self.area2 = []
 
@@ -153,22 +174,120 @@ class VideoWidget(QLabel):
         self.current_point = None
         self.areas_defined = False
 
+        # Displayed frame: a QImage wrapping the frame buffer (no copy).
+        # The array is kept alive while the QImage uses it.
+        self.frame = None
+        self.image = None
+        self.frame_size = None
+        self.rgb_buffer = None  # only without Format_BGR888
+
+        # Frame -> widget mapping, recomputed only when the size changes
+        self.scale = 1.0
+        self.offset = QPointF(0, 0)
+
+        # Frames arriving faster than the screen refresh are not presented
+        self.frame_period = 1.0 / DEFAULT_REFRESH_RATE
+        self.last_present = 0.0
+        self.pending_frame = None
+        self.present_timer = QTimer(self)
+        self.present_timer.setSingleShot(True)
+        self.present_timer.timeout.connect(self.present_pending_frame)
+
     def set_frame(self, frame):
+        """
+        Shows a BGR frame. Only the newest frame of each screen refresh
+        interval is presented; the others are dropped.
+        """
         if frame is None:
             return
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        qimg = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg)
-        self.setFixedSize(w, h)
-        self.setPixmap(pixmap)
+        self.pending_frame = frame
+        wait = self.last_present + self.frame_period - time.perf_counter()
+        if wait > 0:
+            if not self.present_timer.isActive():
+                self.present_timer.start(int(wait * 1000) + 1)
+            return
+        self.present_pending_frame()
+
+    def present_pending_frame(self):
+        frame = self.pending_frame
+        self.pending_frame = None
+        if frame is None:
+            return
+        self.last_present = time.perf_counter()
+        self.image = self.wrap_frame(frame)
+
+        frame_size = (frame.shape[1], frame.shape[0])
+        if frame_size != self.frame_size:
+            self.frame_size = frame_size
+            self.update_refresh_rate()
+            self.updateGeometry()
+            self.update_display_rect()
+        self.update()
+
+    def wrap_frame(self, frame):
+        """
+        QImage over the frame pixels. With Format_BGR888 the BGR array is
+        used as is; otherwise it is converted into a reused RGB buffer.
+        """
+        frame = np.ascontiguousarray(frame)
+        h, w = frame.shape[:2]
+        if HAS_BGR888:
+            self.frame = frame
+            return QImage(frame.data, w, h, frame.strides[0],
+                          QImage.Format_BGR888)
+
+        if self.rgb_buffer is None or self.rgb_buffer.shape != frame.shape:
+            self.rgb_buffer = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_buffer)
+        self.frame = self.rgb_buffer
+        return QImage(self.rgb_buffer.data, w, h, self.rgb_buffer.strides[0],
+                      QImage.Format_RGB888)
+
+    def update_refresh_rate(self):
+        screen = self.screen() if hasattr(self, "screen") else None
+        rate = screen.refreshRate() if screen else 0
+        self.frame_period = 1.0 / (rate if rate > 0 else DEFAULT_REFRESH_RATE)
+
+    def update_display_rect(self):
+        """
+        Fits the frame in the widget (never enlarged), centered. At scale 1
+        the frame is blitted without any resampling.
+        """
+        if self.frame_size is None:
+            return
+        w, h = self.frame_size
+        self.scale = min(1.0, self.width() / w, self.height() / h)
+        self.offset = QPointF((self.width() - w * self.scale) / 2,
+                              (self.height() - h * self.scale) / 2)
+
+    def to_frame_point(self, pos):
+        """
+        Widget position -> (x, y) in frame coordinates.
+        """
+        return (int((pos.x() - self.offset.x()) / self.scale),
+                int((pos.y() - self.offset.y()) / self.scale))
+
+    def sizeHint(self):
+        if self.frame_size is None:
+            return super().sizeHint()
+        return QSize(*self.frame_size)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_display_rect()
+
+    def lock_areas(self):
+        """
+        Stops drawing: the zones come from a loaded zone file.
+        """
+        self.current_points.clear()
+        self.drawing = False
+        self.areas_defined = True
+        self.update()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton and not self.areas_defined:
-            x = event.pos().x()
-            y = event.pos().y()
-            self.current_points.append((x, y))
+            self.current_points.append(self.to_frame_point(event.pos()))
 
             if len(self.current_points) == 4:
                 if len(self.area1) < 1:
@@ -183,7 +302,8 @@ class VideoWidget(QLabel):
                     self.areas_defined = True
                     QMessageBox.information(
                         self, "Áreas Definidas",
-                        "As duas áreas foram definidas. Agora o vídeo irá iniciar."
+                        "As duas áreas foram definidas. "
+                        "Agora o vídeo irá iniciar."
                     )
                     self.areas_done_signal.emit()
 
@@ -192,15 +312,17 @@ class VideoWidget(QLabel):
     def mouseMoveEvent(self, event):
         if len(self.current_points) > 0 and not self.areas_defined:
             self.drawing = True
-            self.current_point = (event.pos().x(), event.pos().y())
+            self.current_point = self.to_frame_point(event.pos())
             self.update()
 
     def paintEvent(self, event):
-        super().paintEvent(event)
+        # The frame is drawn once, here (no QLabel pixmap)
         painter = QPainter(self)
+        painter.translate(self.offset)
+        painter.scale(self.scale, self.scale)
 
-        if self.pixmap():
-            painter.drawPixmap(0, 0, self.pixmap())
+        if self.image is not None:
+            painter.drawImage(0, 0, self.image)
 
         # Draws area1 in red
         pen_area1 = QPen(Qt.red, 2, Qt.SolidLine)
@@ -226,7 +348,8 @@ class VideoWidget(QLabel):
 
             if self.drawing and self.current_point:
                 last_pt = self.current_points[-1]
-                painter.drawLine(last_pt[0], last_pt[1], self.current_point[0], self.current_point[1])
+                painter.drawLine(last_pt[0], last_pt[1],
+                                 self.current_point[0], self.current_point[1])
 
     def draw_polygon(self, painter, points):
         if len(points) == 4:
@@ -246,6 +369,7 @@ class StartWidget(QWidget):
     """
     open_video_signal = pyqtSignal()
     open_camera_signal = pyqtSignal()
+    open_ip_camera_signal = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -260,12 +384,19 @@ class StartWidget(QWidget):
         self.btn_open_camera.clicked.connect(self.open_camera_clicked)
         layout.addWidget(self.btn_open_camera)
 
+        self.btn_open_ip_camera = QPushButton("Abrir Câmera IP")
+        self.btn_open_ip_camera.clicked.connect(self.open_ip_camera_clicked)
+        layout.addWidget(self.btn_open_ip_camera)
+
     def open_video_clicked(self):
         self.open_video_signal.emit()
 
     def open_camera_clicked(self):
         self.open_camera_signal.emit()
 
+    def open_ip_camera_clicked(self):
+        self.open_ip_camera_signal.emit()
+
 
 ##############################################################################
 # Page 1: VideoPage (processing video/cam)
@@ -275,8 +406,10 @@ class VideoPage(QWidget):
     Contains the VideoWidget and a "Back" button to return to the home screen.
     Logic:
       - When opening video/camera, it only reads 1 frame and displays static.
-      - Defines areas (VideoWidget).
-      - When areas completed, start QTimer to play the entire video.
+      - Defines areas (VideoWidget), or loads a zone file with named zones
+        and tripwires ("Carregar Zonas"); "Salvar Zonas" saves them.
+      - When areas completed, start a FrameProcessor thread to play the
+        entire video.
       - When closing or clicking "Back", we stop the video and release it.
     """
     back_to_start_signal = pyqtSignal()  # emited by clicking "Voltar"
@@ -286,35 +419,129 @@ class VideoPage(QWidget):
         main_layout = QVBoxLayout()
         self.setLayout(main_layout)
 
+        buttons_layout = QHBoxLayout()
+        main_layout.addLayout(buttons_layout)
+
         # Back Button
         btn_back = QPushButton("Voltar")
         btn_back.clicked.connect(self.on_back_clicked)
-        main_layout.addWidget(btn_back)
+        buttons_layout.addWidget(btn_back)
+
+        # Zone file buttons
+        btn_load_zones = QPushButton("Carregar Zonas")
+        btn_load_zones.clicked.connect(self.on_load_zones_clicked)
+        buttons_layout.addWidget(btn_load_zones)
+        btn_save_zones = QPushButton("Salvar Zonas")
+        btn_save_zones.clicked.connect(self.on_save_zones_clicked)
+        buttons_layout.addWidget(btn_save_zones)
+
+        # Detector loading status
+        self.model_status = QLabel("Carregando modelo de detecção...")
+        buttons_layout.addWidget(self.model_status)
+
+        # Live totals (FrameProcessor.counts_changed)
+        self.counts_label = QLabel()
+        main_layout.addWidget(self.counts_label)
 
         # VideoWidget
         self.video_widget = VideoWidget()
         main_layout.addWidget(self.video_widget)
 
-        # Timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
+        # Processing thread (created when the areas are defined)
+        self.frame_processor = None
 
-        # PeopleCounter instance
-        self.people_counter = PeopleCounter(model_path)
+        # Every crossing is kept in the local event database
+        self.event_log = EventLog()
+
+        # PeopleCounter instance (skips YOLO while the zones are static)
+        self.people_counter = PeopleCounter(
+            model_path, motion_gating=True, event_log=self.event_log
+        )
+        # Loaded and warmed up in the background from now on: counting
+        # starts when it is ready, opening a video never waits for it
+        self.model_loader = ModelLoader(self.people_counter.warm_up, self)
+        self.model_loader.loaded.connect(self.on_model_loaded)
+        self.model_loader.failed.connect(self.on_model_failed)
+        self.model_loader.start()
 
         # Video/camera stream variable
         self.video_stream = None
 
+        # Zone layout loaded from a file (None: the areas drawn by the user)
+        self.zone_layout = None
+
         # Connects signal from defined areas
-        self.video_widget.areas_done_signal.connect(self.start_video_processing)
+        self.video_widget.areas_done_signal.connect(
+            self.start_video_processing
+        )
+
+    def on_model_loaded(self, seconds):
+        self.model_status.setText(f"Modelo pronto ({seconds:.1f} s)")
+
+    def on_model_failed(self, error):
+        self.model_status.setText("Erro ao carregar o modelo")
+        QMessageBox.critical(self, "Erro ao carregar o modelo", error)
+
+    def on_processing_failed(self, error):
+        QMessageBox.critical(
+            self, "Erro",
+            f"Não foi possível iniciar a contagem sem o modelo: {error}"
+        )
 
     def on_back_clicked(self):
         """
-        User clicked "Back" → we stopped the timer, released the video and output the signal.
+        User clicked "Back" → we stopped the processing, released the video
+        and output the signal.
         """
         self.close_video()
         self.back_to_start_signal.emit()
 
+    def on_load_zones_clicked(self):
+        """
+        Loads a zone file and (re)starts the processing with it.
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Selecione o arquivo de zonas", "",
+            "Zonas (*.json);;Todos (*)"
+        )
+        if not file_path:
+            return
+        try:
+            self.zone_layout = load_layout(file_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            QMessageBox.critical(self, "Erro ao carregar zonas", str(e))
+            return
+        self.video_widget.lock_areas()
+        if self.video_stream:
+            self.stop_video_processing()
+            self.start_video_processing()
+
+    def on_save_zones_clicked(self):
+        layout = self.current_layout()
+        if layout is None:
+            QMessageBox.information(
+                self, "Salvar Zonas", "Defina as duas áreas antes de salvar."
+            )
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Salvar arquivo de zonas", "zonas.json",
+            "Zonas (*.json)"
+        )
+        if file_path:
+            save_layout(file_path, layout)
+
+    def current_layout(self):
+        """
+        The loaded zone layout, or the two areas drawn in the VideoWidget
+        (None while they are not drawn).
+        """
+        if self.zone_layout is not None:
+            return self.zone_layout
+        if self.video_widget.area1 and self.video_widget.area2:
+            return ZoneLayout.from_areas(self.video_widget.area1,
+                                         self.video_widget.area2)
+        return None
+
     def open_video_file(self, file_path=None):
         """
        Opens a video file (if 'file_path' is given).
@@ -324,21 +551,24 @@ class VideoPage(QWidget):
             # Example if you want to open a dialogue here
             pass
         try:
-            self.video_stream = VideoStream(file_path)
+            self.video_stream = VideoStream(file_path, threaded=True)
         except ValueError as e:
             QMessageBox.critical(self, "Erro ao abrir vídeo", str(e))
             return
+        self.people_counter.stream_id = os.path.basename(file_path)
         self.show_first_frame()
 
-    def open_camera(self):
+    def open_camera(self, source=0):
         """
-        Open camera (index 0).
+        Open camera (index 0, or the RTSP/HTTP URL of a network camera,
+        which reconnects by itself when the stream drops).
         """
         try:
-            self.video_stream = VideoStream(0)
+            self.video_stream = VideoStream(source, threaded=True)
         except ValueError as e:
             QMessageBox.critical(self, "Erro ao abrir câmera", str(e))
             return
+        self.people_counter.stream_id = source_name(source)
         self.show_first_frame()
 
     def show_first_frame(self):
@@ -350,41 +580,82 @@ class VideoPage(QWidget):
             return
         ret, frame = self.video_stream.read()
         if not ret:
-            QMessageBox.critical(self, "Erro", "Não foi possível ler o primeiro frame.")
+            QMessageBox.critical(
+                self, "Erro", "Não foi possível ler o primeiro frame."
+            )
             self.close_video()
             return
         self.video_widget.set_frame(frame)
 
     def start_video_processing(self):
         """
-        Called when areas are defined. Starts the loop (timer) to process frames.
+        Called when areas are defined or loaded. Starts the thread that
+        processes frames.
         """
-        if self.video_stream:
-            self.timer.start(30)  # ~33 FPS
+        layout = self.current_layout()
+        if self.video_stream and layout is not None:
+            self.people_counter.set_layout(
+                layout, self.video_stream.get_frame_dimensions()
+            )
+            self.frame_processor = FrameProcessor(
+                self.people_counter, self.video_stream
+            )
+            self.frame_processor.frame_ready.connect(self.update_frame)
+            self.frame_processor.counts_changed.connect(
+                self.on_counts_changed
+            )
+            self.frame_processor.stream_ended.connect(self.on_stream_ended)
+            self.frame_processor.model_failed.connect(
+                self.on_processing_failed
+            )
+            self.on_counts_changed(*self.people_counter.get_counts())
+            self.frame_processor.start()
 
     def update_frame(self):
         """
-        Lê frames continuamente e faz a detecção. 
+        Displays the latest frame processed by the FrameProcessor.
         """
-        if not self.video_stream:
-            return
-        ret, frame = self.video_stream.read()
-        if not ret:
-            # End of video
-            self.timer.stop()
+        if not self.frame_processor:
             return
+        frame_processed = self.frame_processor.take_latest_frame()
+        if frame_processed is not None:
+            self.video_widget.set_frame(frame_processed)
 
-        area1 = self.video_widget.area1
-        area2 = self.video_widget.area2
+    def on_counts_changed(self, people_in, people_out):
+        self.counts_label.setText(
+            f"Subindo: {people_in}  Descendo: {people_out}"
+        )
+
+    def on_stream_ended(self):
+        """
+        End of the video file: shows its last frame and stops the thread.
+        """
+        if self.sender() is not self.frame_processor:
+            # Queued from a thread that was already replaced
+            return
+        self.update_frame()
+        self.stop_video_processing()
+        people_in, people_out = self.people_counter.get_counts()
+        self.counts_label.setText(
+            f"Fim do vídeo - Subindo: {people_in}  Descendo: {people_out}"
+        )
 
-        frame_processed = self.people_counter.process_frame(frame, area1, area2)
-        self.video_widget.set_frame(frame_processed)
+    def stop_video_processing(self):
+        """
+        Stops the processing thread, waiting for the current frame to finish.
+        """
+        if self.frame_processor:
+            self.frame_processor.requestInterruption()
+            self.frame_processor.wait()
+            self.frame_processor = None
 
     def close_video(self):
         """
-        Stops the timer and frees up video/camera resources.
+        Stops the processing and frees up video/camera resources.
         """
-        self.timer.stop()
+        self.stop_video_processing()
+        self.event_log.flush(timeout=CLOSE_FLUSH_TIMEOUT)
+        self.people_counter.release_metrics()
         if self.video_stream:
             self.video_stream.release()
             self.video_stream = None
@@ -396,9 +667,12 @@ class VideoPage(QWidget):
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Contador de Pessoas (PyQt) - Fullscreen + Retorno")
+        self.setWindowTitle(
+            "Contador de Pessoas (PyQt) - Fullscreen + Retorno"
+        )
 
-        # StackedWidget with 2 pages: start_widget (page 0) and video_page (page 1)
+        # StackedWidget with 2 pages: start_widget (page 0) and video_page
+        # (page 1)
         self.stacked = QStackedWidget()
         self.setCentralWidget(self.stacked)
 
@@ -412,7 +686,12 @@ class MainWindow(QMainWindow):
 
         # Home page signals
         self.start_widget.open_video_signal.connect(self.on_open_video_clicked)
-        self.start_widget.open_camera_signal.connect(self.on_open_camera_clicked)
+        self.start_widget.open_camera_signal.connect(
+            self.on_open_camera_clicked
+        )
+        self.start_widget.open_ip_camera_signal.connect(
+            self.on_open_ip_camera_clicked
+        )
 
         # "Back" sign on video page
         self.video_page.back_to_start_signal.connect(self.on_back_to_start)
@@ -443,6 +722,18 @@ class MainWindow(QMainWindow):
         self.stacked.setCurrentIndex(1)
         self.video_page.open_camera()
 
+    def on_open_ip_camera_clicked(self):
+        """
+        "Open IP Camera" button on the home page: asks for the stream URL.
+        """
+        url, ok = QInputDialog.getText(
+            self, "Câmera IP", "URL do stream (rtsp:// ou http://):"
+        )
+        url = url.strip()
+        if ok and url:
+            self.stacked.setCurrentIndex(1)
+            self.video_page.open_camera(url)
+
     def on_back_to_start(self):
         """
         Called when the user clicks "Back" on the video page.
@@ -458,6 +749,8 @@ class MainWindow(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    # Metrics endpoint/snapshots when PEOPLE_COUNTER_METRICS_* are set
+    start_from_env()
     window = MainWindow()
     # Show full screen
     window.showFullScreen()
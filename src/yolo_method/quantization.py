@@ -0,0 +1,228 @@
+"""
+Int8 post-training quantization of the people detector.
+
+Quantizes the ONNX export of yolov8m.pt with ONNX Runtime static
+quantization (QDQ format: per-channel int8 weights, uint8 activations).
+The activation ranges are calibrated on a directory of our own frames
+(JPEG/PNG, e.g. frames dumped from the cameras being deployed), letterboxed
+exactly like ultralytics does before inference. The box decoding at the
+end of the Detect head (DFL, anchors, concatenations) stays in float: it
+is cheap, and int8 there shifts the box coordinates.
+
+The result is saved beside the weights as yolov8m_int8.onnx and is used
+with PeopleCounter(backend="onnx_int8"), batch_count --backend onnx_int8
+or PEOPLE_COUNTER_BACKEND=onnx_int8. testing/evaluate_quantization.py
+measures its speedup and person recall against the float model.
+
+Usage, from the project root (needs onnxruntime and onnx):
+    python -m src.yolo_method.quantization FRAMES_DIR [--model yolov8m.pt]
+        [--max-images 300] [--method minmax] [--reduce-range] [--force]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+# Local imports
+from .backends import (
+    BACKEND_ONNX, BACKEND_ONNX_INT8, EXPORT_IMAGE_SIZE, export_model,
+    exported_model_path,
+)
+from .counter import DEFAULT_MODEL_PATH
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_CALIBRATION_IMAGES = 300
+LETTERBOX_COLOR = 114  # padding gray of the ultralytics LetterBox
+CALIBRATION_METHODS = ["minmax", "entropy", "percentile"]
+
+
+def list_images(frames_dir, max_images=DEFAULT_CALIBRATION_IMAGES):
+    """
+    Image files of the directory (recursively), evenly sampled down to
+    max_images so that a long capture is covered from start to end.
+    """
+    image_paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(frames_dir)
+        for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if max_images and len(image_paths) > max_images:
+        keep = np.linspace(0, len(image_paths) - 1, max_images).astype(int)
+        image_paths = [image_paths[i] for i in keep]
+    return image_paths
+
+
+def letterbox(image, size=EXPORT_IMAGE_SIZE):
+    """
+    Resizes keeping the aspect ratio and pads to a size x size square,
+    centered, like the ultralytics pre-processing.
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    resized = cv2.resize(image, (new_width, new_height),
+                         interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    top = (size - new_height) // 2
+    left = (size - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = resized
+    return canvas
+
+
+def to_model_input(image, size=EXPORT_IMAGE_SIZE):
+    """
+    BGR image -> (1, 3, size, size) float32 RGB tensor in [0, 1].
+    """
+    rgb = letterbox(image, size)[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(rgb, dtype=np.float32)[None] / 255.0
+
+
+class FrameCalibrationReader:
+    """
+    Calibration data reader of ONNX Runtime: feeds the frames one by one
+    (get_next returns None when they are exhausted).
+    """
+
+    def __init__(self, image_paths, input_name, size=EXPORT_IMAGE_SIZE):
+        self.image_paths = image_paths
+        self.input_name = input_name
+        self.size = size
+        self.position = 0
+
+    def get_next(self):
+        while self.position < len(self.image_paths):
+            image = cv2.imread(self.image_paths[self.position])
+            self.position += 1
+            if image is not None:
+                return {self.input_name: to_model_input(image, self.size)}
+        return None
+
+    def rewind(self):
+        self.position = 0
+
+
+def head_nodes_to_exclude(onnx_model):
+    """
+    Nodes of the Detect head (the last "/model.N/" module of the ultralytics
+    export) that decode the boxes: everything but its convolutions, plus
+    the DFL convolution.
+    """
+    def module_index(node_name):
+        parts = node_name.split("/")
+        if len(parts) > 2 and parts[1].startswith("model."):
+            index = parts[1][len("model."):]
+            if index.isdigit():
+                return int(index)
+        return None
+
+    indices = [module_index(node.name) for node in onnx_model.graph.node]
+    indices = [index for index in indices if index is not None]
+    if not indices:
+        return []
+    head_prefix = f"/model.{max(indices)}/"
+    return [
+        node.name for node in onnx_model.graph.node
+        if node.name.startswith(head_prefix)
+        and (node.op_type != "Conv" or "/dfl/" in node.name)
+    ]
+
+
+def quantize_model(frames_dir, model_path=DEFAULT_MODEL_PATH,
+                   max_images=DEFAULT_CALIBRATION_IMAGES, method="minmax",
+                   reduce_range=False, image_size=EXPORT_IMAGE_SIZE,
+                   overwrite=False):
+    """
+    Exports the float ONNX model if needed, calibrates it on the frames of
+    frames_dir and saves the int8 model beside the weights.
+    :param reduce_range: 7-bit weights, for CPUs without VNNI (pre-Cascade
+        Lake Intel) where 8-bit products can saturate.
+    :return: path of the int8 model.
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationMethod, QuantFormat, QuantType, quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    target_path = exported_model_path(model_path, BACKEND_ONNX_INT8)
+    if os.path.exists(target_path) and not overwrite:
+        print(f"Modelo int8 já existe: {target_path}")
+        return target_path
+    if method not in CALIBRATION_METHODS:
+        raise ValueError(f"Método de calibração desconhecido: {method}")
+
+    image_paths = list_images(frames_dir, max_images)
+    if not image_paths:
+        raise ValueError(f"Nenhuma imagem encontrada em {frames_dir}")
+
+    float_path = export_model(model_path, BACKEND_ONNX, image_size)
+    float_model = onnx.load(float_path)
+    input_name = float_model.graph.input[0].name
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Shape inference and graph optimizations before calibration
+        prepared_path = os.path.join(temp_dir, "prepared.onnx")
+        quant_pre_process(float_path, prepared_path)
+        excluded = head_nodes_to_exclude(onnx.load(prepared_path))
+
+        print(f"Calibrando com {len(image_paths)} imagens ({method})...")
+        quantized_path = os.path.join(temp_dir, "quantized.onnx")
+        quantize_static(
+            prepared_path, quantized_path,
+            FrameCalibrationReader(image_paths, input_name, image_size),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            reduce_range=reduce_range,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            nodes_to_exclude=excluded,
+            calibrate_method={
+                "minmax": CalibrationMethod.MinMax,
+                "entropy": CalibrationMethod.Entropy,
+                "percentile": CalibrationMethod.Percentile,
+            }[method],
+        )
+
+        # ultralytics reads the class names, stride and input size from the
+        # metadata, which the optimized graph does not keep
+        quantized_model = onnx.load(quantized_path)
+        del quantized_model.metadata_props[:]
+        quantized_model.metadata_props.extend(float_model.metadata_props)
+        onnx.save(quantized_model, quantized_path)
+        shutil.move(quantized_path, target_path)
+
+    float_size = os.path.getsize(float_path) / 2**20
+    int8_size = os.path.getsize(target_path) / 2**20
+    print(f"Modelo int8 salvo em {target_path} "
+          f"({float_size:.1f} MB -> {int8_size:.1f} MB)")
+    return target_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Quantiza o detector para int8 calibrando em frames "
+                    "locais."
+    )
+    parser.add_argument("frames_dir", help="directory of calibration frames")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--max-images", type=int,
+                        default=DEFAULT_CALIBRATION_IMAGES)
+    parser.add_argument("--method", default="minmax",
+                        choices=CALIBRATION_METHODS)
+    parser.add_argument("--reduce-range", action="store_true",
+                        help="7-bit weights, for CPUs without VNNI")
+    parser.add_argument("--image-size", type=int, default=EXPORT_IMAGE_SIZE)
+    parser.add_argument("--force", action="store_true",
+                        help="overwrite an existing int8 model")
+    args = parser.parse_args()
+
+    quantize_model(args.frames_dir, args.model, args.max_images, args.method,
+                   args.reduce_range, args.image_size, overwrite=args.force)
+
+
+if __name__ == "__main__":
+    main()
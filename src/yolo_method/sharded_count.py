@@ -0,0 +1,396 @@
+"""
+Parallel people counting of one long recording.
+
+The video is split into time segments processed by a pool of worker
+processes, each with its own model and PeopleCounter. Every segment also
+decodes 'overlap' frames before its start (warm-up), so the tracker and
+the zones already know the people walking in when the segment begins.
+
+Stitching the partial results:
+  - a crossing belongs to the segment whose [start, end) contains its
+    frame; crossings counted during a warm-up are dropped (the previous
+    segment saw those frames for real);
+  - tracks are matched across each boundary by their mean IoU over the
+    overlap window (seen by both segments), so one person keeps one
+    global ID;
+  - a global ID is counted at most once per direction (and tripwire),
+    which removes a crossing counted on both sides of a boundary.
+
+Usage, from the project root:
+    python -m src.yolo_method.sharded_count VIDEO --zones zones.json
+        [--workers 4] [--segments 8] [--overlap-seconds 5]
+        [--output-dir OUT] [--tracker assignment] [--backend onnx]
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Local imports
+from .backends import (
+    BACKEND_PYTORCH, BACKENDS, default_backend, export_model, load_model,
+    resolve_backend,
+)
+from .batch_count import (
+    EVENT_COLUMNS, print_progress, recording_start, write_summary,
+)
+from .counter import (
+    DEFAULT_MODEL_PATH, DIRECTION_IN, DIRECTION_OUT, PeopleCounter,
+)
+from .detections import DEFAULT_CONFIDENCE
+from .event_log import EventLog
+from .tracker import TRACKER_TYPES, box_iou
+from .video_stream import VideoStream
+from .zones import ZoneLayout, load_layout
+
+DEFAULT_OVERLAP_SECONDS = 5.0
+MATCH_IOU = 0.5
+
+# Set in each worker process by init_worker
+worker_state = {}
+
+
+def plan_segments(frame_count, segments, overlap):
+    """
+    Splits [0, frame_count) into 'segments' contiguous ranges.
+    :return: list of (warm-up start, start, end) frame indices.
+    """
+    segments = max(1, min(segments, frame_count))
+    bounds = np.linspace(0, frame_count, segments + 1).astype(int)
+    return [
+        (max(0, int(start) - overlap), int(start), int(end))
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def init_worker(model_path, backend, counter_kwargs, threads):
+    """
+    Loads the model once per worker process. Each process gets a share of
+    the cores instead of every process using all of them.
+    """
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    worker_state["model"] = load_model(model_path, backend, verbose=False)
+    worker_state["counter_kwargs"] = counter_kwargs
+
+
+def count_segment(task):
+    """
+    Counts one segment in a worker process.
+    :param task: (segment index, video path, layout dict, warm-up start,
+        start, end, overlap).
+    :return: dict with the crossings [(frame, local id, direction, line)]
+        (line is "" for the area1/area2 crossings), the
+        tracks of the first and last 'overlap' frames ({frame: rows}) and
+        the frame counters.
+    """
+    index, video_path, layout, warm_start, start, end, overlap = task
+    counter = PeopleCounter(
+        model=worker_state["model"], verbose=False,
+        stream_id=f"{os.path.basename(video_path)}#{index}",
+        **worker_state["counter_kwargs"]
+    )
+    video_stream = VideoStream(video_path)
+    counter.set_layout(ZoneLayout.from_dict(layout),
+                       video_stream.get_frame_dimensions())
+    if warm_start > 0:
+        video_stream.seek_frame(warm_start)
+
+    events = []
+    head_tracks = {}
+    tail_tracks = {}
+    frame_index = warm_start
+    try:
+        while frame_index < end:
+            ret, frame = video_stream.read()
+            if not ret:
+                break
+            result = counter.count_frame(frame, frame_index=frame_index)
+            # new_events lists the area crossings first, then the line ones
+            area_events = len(result.new_events) - len(result.line_events)
+            for obj_id, direction in result.new_events[:area_events]:
+                events.append((frame_index, obj_id, direction, ""))
+            for obj_id, name, direction in result.line_events:
+                events.append((frame_index, obj_id, direction, name))
+            if frame_index < start:
+                head_tracks[frame_index] = result.tracks.tolist()
+            if frame_index >= end - overlap:
+                tail_tracks[frame_index] = result.tracks.tolist()
+            frame_index += 1
+    finally:
+        video_stream.release()
+
+    stats = counter.get_stats()
+    return {
+        "index": index,
+        "start": start,
+        "end": end,
+        "frames_read": frame_index - warm_start,
+        "processed_frames": max(0, frame_index - start),
+        "detected_frames": stats["detected_frames"],
+        "cached_frames": stats["cached_frames"],
+        "motion_skipped_frames": stats["motion_skipped_frames"],
+        "events": events,
+        "head_tracks": head_tracks,
+        "tail_tracks": tail_tracks,
+    }
+
+
+def match_overlap(previous_tracks, tracks):
+    """
+    Matches the tracks of two segments over their common frames.
+    :param previous_tracks: {frame: rows} of the previous segment's tail.
+    :param tracks: {frame: rows} of the next segment's warm-up.
+    :return: {local id in the next segment: local id in the previous}
+    """
+    iou_sums = defaultdict(float)
+    common_frames = defaultdict(int)
+    for frame_index, rows in tracks.items():
+        previous_rows = previous_tracks.get(frame_index)
+        if not rows or not previous_rows:
+            continue
+        rows = np.array(rows, dtype=np.float32)
+        previous_rows = np.array(previous_rows, dtype=np.float32)
+        iou = box_iou(previous_rows[:, :4], rows[:, :4])
+        for i, previous_id in enumerate(previous_rows[:, 4].astype(int)):
+            for j, track_id in enumerate(rows[:, 4].astype(int)):
+                common_frames[(previous_id, track_id)] += 1
+                iou_sums[(previous_id, track_id)] += iou[i, j]
+    if not iou_sums:
+        return {}
+
+    previous_ids = sorted({pair[0] for pair in iou_sums})
+    track_ids = sorted({pair[1] for pair in iou_sums})
+    mean_iou = np.zeros((len(previous_ids), len(track_ids)))
+    for (previous_id, track_id), total in iou_sums.items():
+        mean_iou[previous_ids.index(previous_id),
+                 track_ids.index(track_id)] = (
+            total / common_frames[(previous_id, track_id)]
+        )
+    rows, cols = linear_sum_assignment(-mean_iou)
+    return {
+        track_ids[col]: previous_ids[row]
+        for row, col in zip(rows, cols) if mean_iou[row, col] >= MATCH_IOU
+    }
+
+
+def stitch_segments(results):
+    """
+    Merges the crossings of all segments (see the module docstring).
+    :return: sorted list of (frame, global id, direction, line)
+    """
+    results = sorted(results, key=lambda result: result["index"])
+    global_ids = {}
+    next_id = 0
+    events = []
+    for position, result in enumerate(results):
+        mapping = {}
+        if position > 0:
+            mapping = match_overlap(results[position - 1]["tail_tracks"],
+                                    result["head_tracks"])
+        index = result["index"]
+        previous_index = results[position - 1]["index"] if position else None
+
+        def global_id(local_id):
+            nonlocal next_id
+            key = (index, local_id)
+            if key not in global_ids:
+                previous_key = (previous_index, mapping.get(local_id))
+                if previous_key in global_ids:
+                    global_ids[key] = global_ids[previous_key]
+                else:
+                    global_ids[key] = next_id
+                    next_id += 1
+            return global_ids[key]
+
+        # Warm-up tracks first, so the matched IDs carry over
+        for rows in result["head_tracks"].values():
+            for row in rows:
+                global_id(row[4])
+        for frame_index, local_id, direction, line in result["events"]:
+            if frame_index >= result["start"]:
+                events.append((frame_index, global_id(local_id), direction,
+                               line))
+        for rows in result["tail_tracks"].values():
+            for row in rows:
+                global_id(row[4])
+
+    stitched = []
+    counted = set()
+    for frame_index, obj_id, direction, line in sorted(events):
+        if (obj_id, direction, line) in counted:
+            continue
+        counted.add((obj_id, direction, line))
+        stitched.append((frame_index, obj_id, direction, line))
+    return stitched
+
+
+def count_video_sharded(video_path, layout, counter_kwargs,
+                        model_path=DEFAULT_MODEL_PATH, backend=None,
+                        workers=None, segments=None,
+                        overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """
+    Counts one video with a process pool.
+    :param layout: ZoneLayout (zones and tripwires).
+    :param counter_kwargs: picklable PeopleCounter arguments (no model).
+    :param segments: number of segments (default: one per worker).
+    :return: (summary dict, stitched crossings, fps)
+    """
+    workers = workers or os.cpu_count() or 1
+    segments = segments or workers
+    video_stream = VideoStream(video_path)
+    fps = video_stream.fps or 30.0
+    frame_count = video_stream.frame_count
+    video_stream.release()
+    if frame_count <= 0:
+        raise ValueError(f"Número de frames desconhecido: {video_path}")
+
+    overlap = int(round(overlap_seconds * fps))
+    tasks = [
+        (index, video_path, layout.to_dict(), warm_start, start, end,
+         overlap)
+        for index, (warm_start, start, end) in enumerate(
+            plan_segments(frame_count, segments, overlap)
+        )
+    ]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    video_name = os.path.basename(video_path)
+
+    # Exported once here: workers exporting together would all write the
+    # same artifact
+    backend = resolve_backend(backend)
+    if backend != BACKEND_PYTORCH:
+        export_model(model_path, backend)
+
+    start_time = time.perf_counter()
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=init_worker,
+                      initargs=(model_path, backend, counter_kwargs,
+                                threads)) as pool:
+        for result in pool.imap_unordered(count_segment, tasks):
+            results.append(result)
+            done = sum(item["processed_frames"] for item in results)
+            print_progress(video_name, done - 1, frame_count,
+                           done / (time.perf_counter() - start_time))
+    seconds = time.perf_counter() - start_time
+
+    events = stitch_segments(results)
+    processed_frames = sum(result["processed_frames"] for result in results)
+    print_progress(video_name, processed_frames - 1, frame_count,
+                   processed_frames / max(seconds, 1e-9), end="\n")
+    summary = {
+        "video": video_name,
+        "frames": processed_frames,
+        "processed_frames": processed_frames,
+        "detected_frames": sum(r["detected_frames"] for r in results),
+        "cached_frames": sum(r["cached_frames"] for r in results),
+        "motion_skipped_frames": sum(
+            r["motion_skipped_frames"] for r in results
+        ),
+        "people_in": sum(1 for event in events if event[2] == DIRECTION_IN),
+        "people_out": sum(1 for event in events if event[2] == DIRECTION_OUT),
+        "seconds": round(seconds, 3),
+        "fps": round(processed_frames / max(seconds, 1e-9), 2),
+    }
+    if layout.lines:
+        summary["lines"] = {
+            line.name: [
+                sum(1 for event in events
+                    if event[3] == line.name and event[2] == direction)
+                for direction in (DIRECTION_IN, DIRECTION_OUT)
+            ]
+            for line in layout.lines
+        }
+    return summary, events, fps
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Contagem paralela de um vídeo longo em segmentos."
+    )
+    parser.add_argument("video")
+    parser.add_argument("--zones", required=True,
+                        help="JSON zone file (named zones and tripwires, "
+                             "or area1 and area2)")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--segments", type=int, default=None,
+                        help="number of segments (default: --workers)")
+    parser.add_argument("--overlap-seconds", type=float,
+                        default=DEFAULT_OVERLAP_SECONDS,
+                        help="warm-up decoded before each segment; longer "
+                             "than a crossing takes")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--backend", default=default_backend(),
+                        choices=BACKENDS)
+    parser.add_argument("--tracker", default="centroid",
+                        choices=sorted(TRACKER_TYPES))
+    parser.add_argument("--conf", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--max-detection-interval", type=int, default=1,
+                        help="run YOLO at most every K frames "
+                             "(needs --tracker assignment)")
+    parser.add_argument("--motion-gating", action="store_true")
+    parser.add_argument("--roi", action="store_true")
+    parser.add_argument("--image-size", type=int, default=None)
+    parser.add_argument("--event-db", default=None,
+                        help="also log every crossing to this SQLite file")
+    args = parser.parse_args(argv)
+    if (args.max_detection_interval > 1
+            and not hasattr(TRACKER_TYPES[args.tracker], "predict")):
+        parser.error("--max-detection-interval > 1 needs "
+                     "--tracker assignment")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    layout = load_layout(args.zones)
+    os.makedirs(args.output_dir, exist_ok=True)
+    counter_kwargs = {
+        "tracker_type": args.tracker,
+        "conf": args.conf,
+        "max_detection_interval": args.max_detection_interval,
+        "motion_gating": args.motion_gating,
+        "roi_inference": args.roi,
+        "image_size": args.image_size,
+    }
+    summary, events, fps = count_video_sharded(
+        args.video, layout, counter_kwargs,
+        model_path=args.model, backend=args.backend, workers=args.workers,
+        segments=args.segments, overlap_seconds=args.overlap_seconds,
+    )
+
+    video_name = summary["video"]
+    name = os.path.splitext(video_name)[0]
+    with open(os.path.join(args.output_dir, f"{name}_events.csv"), "w",
+              newline="") as f:
+        event_writer = csv.writer(f)
+        event_writer.writerow(EVENT_COLUMNS)
+        for frame_index, obj_id, direction, line in events:
+            event_writer.writerow([video_name, frame_index,
+                                   round(frame_index / fps, 3), obj_id,
+                                   direction, line])
+    write_summary(args.output_dir, [summary])
+
+    if args.event_db:
+        event_log = EventLog(args.event_db)
+        start = recording_start(args.video, fps, summary["frames"])
+        for frame_index, obj_id, direction, _ in events:
+            event_log.record(video_name, obj_id, direction, frame_index,
+                             start + frame_index / fps)
+        event_log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Parity check between the PyTorch detector and an exported backend.
+
+Runs both models on frames of a video (one frame out of --stride) and
+matches their person boxes by IoU. Fails (exit code 1) when a matched
+pair is below --min-iou or too many frames have a different number of
+boxes (scores right at the threshold may flip between backends).
+Run from the project root:
+    python src/yolo_method/testing/backend_parity.py VIDEO --backend onnx
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.backends import BACKEND_PYTORCH, BACKENDS, load_model
+from src.yolo_method.counter import DEFAULT_MODEL_PATH
+from src.yolo_method.detections import (
+    DEFAULT_CONFIDENCE, PERSON_CLASS_ID, filter_person_boxes,
+)
+from src.yolo_method.tracker import box_iou
+from src.yolo_method.video_stream import VideoStream
+
+
+def detect(model, frame):
+    results = model.predict(
+        frame, conf=DEFAULT_CONFIDENCE, classes=[PERSON_CLASS_ID],
+        verbose=False,
+    )
+    return filter_person_boxes(results[0].boxes.data).astype(np.float32)
+
+
+def compare_boxes(reference, candidate):
+    """
+    Returns the IoU of each optimally matched pair of boxes.
+    """
+    if len(reference) == 0 or len(candidate) == 0:
+        return np.empty(0)
+    iou = box_iou(reference, candidate)
+    rows, cols = linear_sum_assignment(-iou)
+    return iou[rows, cols]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--backend", default="onnx",
+                        choices=[b for b in BACKENDS if b != BACKEND_PYTORCH])
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--stride", type=int, default=10)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--max-mismatch-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    reference_model = load_model(args.model, BACKEND_PYTORCH, verbose=False)
+    exported_model = load_model(args.model, args.backend, verbose=False)
+
+    video_stream = VideoStream(args.video)
+    frame_index = -1
+    compared = 0
+    count_mismatches = 0
+    matched_iou = []
+    while compared < args.frames:
+        ret, frame = video_stream.read()
+        if not ret:
+            break
+        frame_index += 1
+        if frame_index % args.stride:
+            continue
+
+        reference = detect(reference_model, frame)
+        candidate = detect(exported_model, frame)
+        compared += 1
+        if len(reference) != len(candidate):
+            count_mismatches += 1
+            print(f"frame {frame_index}: {len(reference)} boxes (pytorch) "
+                  f"vs {len(candidate)} ({args.backend})")
+        matched_iou.extend(compare_boxes(reference, candidate))
+    video_stream.release()
+
+    matched_iou = np.array(matched_iou)
+    min_iou = matched_iou.min() if len(matched_iou) else 1.0
+    mean_iou = matched_iou.mean() if len(matched_iou) else 1.0
+    print(f"{compared} frames, {len(matched_iou)} matched boxes, "
+          f"mean IoU {mean_iou:.4f}, min IoU {min_iou:.4f}, "
+          f"{count_mismatches} frames with a different box count")
+
+    mismatch_ratio = count_mismatches / max(compared, 1)
+    if mismatch_ratio > args.max_mismatch_ratio or min_iou < args.min_iou:
+        print("FALHOU: backends não equivalentes")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
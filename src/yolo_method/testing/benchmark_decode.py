@@ -0,0 +1,185 @@
+"""
+Decode throughput of the VideoStream reading paths.
+
+For each stride, compares:
+  - read_all: cap.read() of every frame, keeping one out of N (the path
+    batch_count used before strided reading);
+  - grab: VideoStream(stride=N), skipped frames grab()bed only;
+  - grab_threaded: the same in the capture thread;
+  - pyav_1 / pyav_auto: PyAV with one / one per core decoding threads
+    (only when the 'av' package is installed).
+and the mean time of a timestamp seek followed by one read.
+"fps" counts the video frames covered per second (returned frames x N).
+
+Surveillance files are H.264: pass one with --video. Without it a
+synthetic video is encoded with H.264 when the OpenCV build can, MPEG-4
+otherwise (also inter-frame coded).
+Run from the project root:
+    python src/yolo_method/testing/benchmark_decode.py
+        [--video FILE] [--strides 1 2 5 10] [--output decode.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.utils.frame_readers import READER_PYAV, is_available
+from src.yolo_method.testing.synthetic_video import (
+    DEFAULT_FPS, make_scenario,
+)
+from src.yolo_method.video_stream import VideoStream
+
+SEEKS = 20
+
+
+def encode_h264(source_path, output_path):
+    """
+    Re-encodes a video as H.264 (avc1), MPEG-4 (mp4v) when unavailable.
+    :return: the codec used, or None if the file already exists.
+    """
+    if os.path.exists(output_path):
+        return None
+    reader = cv2.VideoCapture(source_path)
+    size = (int(reader.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(reader.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    for codec in ("avc1", "mp4v"):
+        writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*codec),
+                                 DEFAULT_FPS, size)
+        if writer.isOpened():
+            break
+    else:
+        raise ValueError("Nenhum codec disponível para gerar o vídeo.")
+    try:
+        while True:
+            ret, frame = reader.read()
+            if not ret:
+                break
+            writer.write(frame)
+    finally:
+        writer.release()
+        reader.release()
+    return codec
+
+
+def time_read_all(video_path, stride):
+    video_stream = VideoStream(video_path)
+    frame_index = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, frame = video_stream.read()
+            if not ret:
+                break
+            # Every frame decoded to an image, one out of 'stride' kept
+            frame_index += 1
+    finally:
+        video_stream.release()
+    return frame_index, time.perf_counter() - start
+
+
+def time_stream(video_path, stride, **stream_kwargs):
+    video_stream = VideoStream(video_path, stride=stride, **stream_kwargs)
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, _ = video_stream.read()
+            if not ret:
+                break
+    finally:
+        video_stream.release()
+    return video_stream.frame_index + 1, time.perf_counter() - start
+
+
+def time_seeks(video_path, seeks=SEEKS, seed=0, **stream_kwargs):
+    """
+    Mean milliseconds of seek(random time) + read().
+    """
+    video_stream = VideoStream(video_path, **stream_kwargs)
+    duration = video_stream.frame_count / (video_stream.fps or DEFAULT_FPS)
+    targets = np.random.default_rng(seed).uniform(0, duration * 0.95, seeks)
+    start = time.perf_counter()
+    try:
+        for seconds in targets:
+            video_stream.seek(seconds)
+            video_stream.read()
+    finally:
+        video_stream.release()
+    return 1000 * (time.perf_counter() - start) / seeks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", help="video file (default: synthetic)")
+    parser.add_argument("--output-dir",
+                        default=os.path.join(tempfile.gettempdir(),
+                                             "people_counter_benchmark"))
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=900)
+    parser.add_argument("--strides", type=int, nargs="+",
+                        default=[1, 2, 5, 10])
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    video_path = args.video
+    if video_path is None:
+        source_path, _ = make_scenario(args.output_dir, args.width,
+                                       args.height, 10, args.frames)
+        video_path = os.path.splitext(source_path)[0] + ".mp4"
+        codec = encode_h264(source_path, video_path)
+        if codec:
+            print(f"Vídeo sintético codificado com {codec}")
+
+    modes = {
+        "read_all": lambda stride: time_read_all(video_path, stride),
+        "grab": lambda stride: time_stream(video_path, stride),
+        "grab_threaded": lambda stride: time_stream(video_path, stride,
+                                                    threaded=True),
+    }
+    seek_modes = {"opencv": {}}
+    if is_available(READER_PYAV):
+        modes["pyav_1"] = lambda stride: time_stream(
+            video_path, stride, reader=READER_PYAV, decode_threads=1
+        )
+        modes["pyav_auto"] = lambda stride: time_stream(
+            video_path, stride, reader=READER_PYAV
+        )
+        seek_modes["pyav"] = {"reader": READER_PYAV}
+    else:
+        print("PyAV não instalado: modos pyav ignorados")
+
+    print(f"{video_path}\n")
+    print(f"{'mode':>14} {'stride':>7} {'frames':>7} {'seconds':>8} "
+          f"{'fps':>9}")
+    results = []
+    for stride in args.strides:
+        for mode, run in modes.items():
+            frames, seconds = run(stride)
+            fps = frames / max(seconds, 1e-9)
+            results.append({"mode": mode, "stride": stride, "frames": frames,
+                            "seconds": round(seconds, 3),
+                            "fps": round(fps, 1)})
+            print(f"{mode:>14} {stride:>7} {frames:>7} {seconds:>8.3f} "
+                  f"{fps:>9.1f}")
+
+    seeks = {}
+    print()
+    for name, stream_kwargs in seek_modes.items():
+        seeks[name] = round(time_seeks(video_path, **stream_kwargs), 2)
+        print(f"seek + read ({name}): {seeks[name]:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"video": video_path, "results": results,
+                       "seek_ms": seeks}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark of the per-frame detection post-processing.
+
+Compares the NumPy path used by PeopleCounter.process_frame with the
+previous pandas/iterrows loop for 0, 10, 50 and 200 detections.
+Run from the project root:
+    python src/yolo_method/testing/benchmark_postprocess.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.detections import filter_person_boxes
+
+DETECTION_COUNTS = [0, 10, 50, 200]
+REPEATS = 200
+
+
+def make_boxes(count, seed=0):
+    """
+    Builds a fake YOLO output with 'count' rows of
+    (x1, y1, x2, y2, confidence, class).
+    """
+    rng = np.random.default_rng(seed)
+    top_left = rng.uniform(0, 1800, size=(count, 2))
+    size = rng.uniform(40, 200, size=(count, 2))
+    confidence = rng.uniform(0.3, 1.0, size=(count, 1))
+    label = rng.integers(0, 2, size=(count, 1))
+    return np.hstack(
+        [top_left, top_left + size, confidence, label]
+    ).astype(np.float32)
+
+
+def legacy_postprocess(boxes_data):
+    """
+    The pandas loop that process_frame used before.
+    """
+    import pandas as pd
+
+    bbox_list = []
+    bbox_df = pd.DataFrame(boxes_data).astype("float")
+    for _, row in bbox_df.iterrows():
+        x1, y1, x2, y2, _, label = map(int, row)
+        if label == 0:
+            bbox_list.append([x1, y1, x2, y2])
+    return bbox_list
+
+
+def time_per_frame(function, boxes):
+    """
+    Returns the mean cost of one call, in microseconds.
+    """
+    total = timeit.timeit(lambda: function(boxes), number=REPEATS)
+    return total / REPEATS * 1e6
+
+
+def main():
+    try:
+        import pandas  # noqa: F401
+        has_pandas = True
+    except ImportError:
+        has_pandas = False
+
+    print(f"{'detections':>10} {'numpy (us)':>12} {'pandas (us)':>12}")
+    for count in DETECTION_COUNTS:
+        boxes = make_boxes(count)
+        numpy_us = time_per_frame(filter_person_boxes, boxes)
+        if has_pandas:
+            pandas_us = f"{time_per_frame(legacy_postprocess, boxes):12.1f}"
+        else:
+            pandas_us = f"{'n/a':>12}"
+        print(f"{count:>10} {numpy_us:12.1f} {pandas_us}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Per-stage latency of the counting pipeline.
+
+For several resolutions and crowd densities, plays a synthetic video (see
+synthetic_video.py) and times each stage of every frame separately:
+  decode     VideoStream.read
+  inference  replay of the recorded detection fixture + person filter
+             (real YOLO with --model)
+  tracking   tracker update
+  zones      in/out counting (PeopleCounter.count_tracks)
+  drawing    overlay.draw_overlay
+Prints p50/p95/p99 (ms) and frames/sec per stage and writes everything to
+a JSON file, to compare runs across releases. Offline and CPU only unless
+--model is given.
+Run from the project root:
+    python src/yolo_method/testing/benchmark_stages.py
+        [--output benchmark_stages.json] [--tracker assignment]
+        [--resolutions 640x360 1280x720 1920x1080] [--people 1 10 50]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.counter import PeopleCounter
+from src.yolo_method.overlay import draw_overlay
+from src.yolo_method.testing.synthetic_video import (
+    make_scenario, synthetic_areas,
+)
+from src.yolo_method.tracker import TRACKER_TYPES
+from src.yolo_method.video_stream import VideoStream
+
+STAGES = ["decode", "inference", "tracking", "zones", "drawing"]
+DEFAULT_RESOLUTIONS = ["640x360", "1280x720", "1920x1080"]
+DEFAULT_PEOPLE = [1, 10, 50]
+PERCENTILES = [50, 95, 99]
+
+
+def parse_resolution(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def summarize(samples_ns):
+    """
+    Latency percentiles (ms) and frames/sec of one stage.
+    """
+    values = np.array(samples_ns, dtype=np.float64) / 1e6
+    summary = {
+        f"p{percentile}": round(float(np.percentile(values, percentile)), 4)
+        for percentile in PERCENTILES
+    }
+    summary["mean"] = round(float(values.mean()), 4)
+    summary["fps"] = round(1000 / max(float(values.mean()), 1e-9), 1)
+    return summary
+
+
+def run_scenario(video_path, detections, tracker_type, model=None):
+    """
+    Plays the video once, timing each stage of every frame.
+    :return: {stage: [ns per frame]}
+    """
+    video_stream = VideoStream(video_path)
+    frame_size = video_stream.get_frame_dimensions()
+    area1, area2 = synthetic_areas(*frame_size)
+    counter = PeopleCounter(tracker_type=tracker_type, model=model,
+                            verbose=False)
+    counter.set_areas(area1, area2, frame_size)
+
+    samples = {stage: [] for stage in STAGES}
+    clock = time.perf_counter_ns
+    try:
+        for frame_index in range(len(detections)):
+            start = clock()
+            ret, frame = video_stream.read()
+            if not ret:
+                break
+            decoded = clock()
+
+            if model is None:
+                bboxes = counter.to_frame_boxes(detections[frame_index])
+            else:
+                bboxes = counter.detect(frame)
+            inferred = clock()
+
+            bbox_ids = counter.tracker.update(bboxes)
+            counter.release_tracks(counter.tracker.removed_ids)
+            tracked = clock()
+
+            result = counter.count_tracks(bbox_ids, frame_index)
+            counted = clock()
+
+            draw_overlay(frame, result, counter.zones, counter.tripwires)
+            drawn = clock()
+
+            samples["decode"].append(decoded - start)
+            samples["inference"].append(inferred - decoded)
+            samples["tracking"].append(tracked - inferred)
+            samples["zones"].append(counted - tracked)
+            samples["drawing"].append(drawn - counted)
+    finally:
+        video_stream.release()
+    return samples
+
+
+def print_scenario(result):
+    print(f"\n{result['resolution']} - {result['people']} pessoas "
+          f"({result['frames']} frames, pipeline "
+          f"{result['pipeline_fps']:.1f} fps)")
+    print(f"{'stage':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'fps':>10}")
+    for stage in STAGES:
+        stats = result["stages"][stage]
+        print(f"{stage:>10} {stats['p50']:>9.3f} {stats['p95']:>9.3f} "
+              f"{stats['p99']:>9.3f} {stats['fps']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default="benchmark_stages.json")
+    parser.add_argument("--resolutions", nargs="+",
+                        default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--people", type=int, nargs="+",
+                        default=DEFAULT_PEOPLE)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--tracker", default="assignment",
+                        choices=sorted(TRACKER_TYPES))
+    parser.add_argument("--work-dir", default=None,
+                        help="where videos and fixtures are kept "
+                             "(default: a temporary directory)")
+    parser.add_argument("--model", default=None,
+                        help="time real YOLO inference with these weights "
+                             "instead of replaying the fixtures")
+    args = parser.parse_args()
+
+    model = None
+    if args.model:
+        from src.yolo_method.backends import load_model
+        model = load_model(args.model, verbose=False)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="benchmark_stages_")
+    results = []
+    for resolution in args.resolutions:
+        width, height = parse_resolution(resolution)
+        for people in args.people:
+            video_path, detections = make_scenario(
+                work_dir, width, height, people, args.frames
+            )
+            samples = run_scenario(video_path, detections, args.tracker,
+                                   model)
+            frame_ns = np.sum([samples[stage] for stage in STAGES], axis=0)
+            result = {
+                "resolution": resolution,
+                "people": people,
+                "frames": len(frame_ns),
+                "pipeline_fps": round(1e9 / float(frame_ns.mean()), 1),
+                "stages": {
+                    stage: summarize(samples[stage]) for stage in STAGES
+                },
+            }
+            results.append(result)
+            print_scenario(result)
+
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "tracker": args.tracker,
+        "inference": args.model or "fixture",
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Per-stream counting check of MultiStreamCounter.
+
+Feeds --streams synthetic streams to one MultiStreamCounter. Each frame is
+black with the 'people' drawn as white rectangles walking up or down
+across area1/area2, one direction per lane (the lanes of each stream are
+shifted, and each stream has one more person than the previous one, so no
+two streams have the same counts). RectangleDetector stands in for YOLO:
+it finds the rectangles of every image of a batch and returns them as
+YOLO rows, so the check needs no weights and its expected counts are
+exact.
+Every tick submits one frame per stream and runs the batches; the check
+passes when every predict call got a full batch (one frame per stream, up
+to --max-batch-size) and the in/out counts of every stream match the
+people that walked up/down through it.
+Run from the project root:
+    python src/yolo_method/testing/check_multi_stream.py [--streams 4]
+        [--people 12] [--max-batch-size 8] [--tracker centroid]
+"""
+import argparse
+import math
+import os
+import sys
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.multi_stream_counter import MultiStreamCounter
+from src.yolo_method.tracker import TRACKER_TYPES
+
+FRAME_SIZE = (640, 480)
+AREA1 = [[(0, 100), (640, 100), (640, 180), (0, 180)]]
+AREA2 = [[(0, 300), (640, 300), (640, 380), (0, 380)]]
+LANES = 8
+LANE_WIDTH = FRAME_SIZE[0] // LANES
+BOX_SIZE = (40, 80)
+SPEED = 8  # px per frame
+SPAWN_INTERVAL = 20  # frames between two people of a stream
+DETECTION_SCORE = 0.9
+
+Boxes = namedtuple("Boxes", ["data"])
+DetectionResult = namedtuple("DetectionResult", ["boxes"])
+
+
+class RectangleDetector:
+    """
+    Stand-in for the YOLO model: every white rectangle is a person.
+    Keeps the size of each batch it receives.
+    """
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, images, **kwargs):
+        if isinstance(images, np.ndarray):
+            images = [images]
+        self.batch_sizes.append(len(images))
+        return [DetectionResult(Boxes(self.detect(image)))
+                for image in images]
+
+    def detect(self, image):
+        """
+        :return: (N, 6) rows of x1, y1, x2, y2, confidence, class.
+        """
+        _, _, stats, _ = cv2.connectedComponentsWithStats(
+            (image[:, :, 0] > 127).astype(np.uint8)
+        )
+        rows = [
+            [left, top, left + width - 1, top + height - 1,
+             DETECTION_SCORE, 0]
+            for left, top, width, height, _ in stats[1:].tolist()
+        ]
+        return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+
+def walks_up(stream_index, lane):
+    return (lane + stream_index) % 3 != 0
+
+
+def person_box(stream_index, person, age):
+    """
+    Box of a person 'age' frames after it appeared, or None once it left
+    the frame. People walking up are counted in, down are counted out.
+    """
+    height = FRAME_SIZE[1]
+    distance = SPEED * age
+    if distance > height:
+        return None
+    lane = person % LANES
+    if walks_up(stream_index, lane):
+        foot_y = height - 1 - distance
+    else:
+        foot_y = distance
+    x1 = lane * LANE_WIDTH + 10
+    return x1, foot_y - BOX_SIZE[1], x1 + BOX_SIZE[0], foot_y
+
+
+def render_frame(stream_index, people, frame_index):
+    width, height = FRAME_SIZE
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for person in range(people):
+        age = frame_index - person * SPAWN_INTERVAL
+        box = person_box(stream_index, person, age) if age >= 0 else None
+        if box is not None:
+            x1, y1, x2, y2 = box
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 255, 255), -1)
+    return frame
+
+
+def expected_counts(stream_index, people):
+    """
+    (people in, people out) once every person walked across the frame.
+    """
+    people_up = sum(walks_up(stream_index, person % LANES)
+                    for person in range(people))
+    return people_up, people - people_up
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--people", type=int, default=12,
+                        help="people of the first stream (one more each)")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--tracker", default="centroid",
+                        choices=sorted(TRACKER_TYPES))
+    args = parser.parse_args()
+
+    detector = RectangleDetector()
+    multi_counter = MultiStreamCounter(
+        model=detector, max_batch_size=args.max_batch_size,
+        tracker_type=args.tracker,
+    )
+    people = {f"cam{i}": args.people + i for i in range(args.streams)}
+    for stream_id in people:
+        multi_counter.add_stream(stream_id, AREA1, AREA2, FRAME_SIZE)
+
+    # Last person of the busiest stream leaves the frame
+    lifetime = FRAME_SIZE[1] // SPEED + 1
+    frames = (max(people.values()) - 1) * SPAWN_INTERVAL + lifetime + 1
+    batches_per_tick = math.ceil(args.streams / args.max_batch_size)
+    failures = []
+    for frame_index in range(frames):
+        for stream_index, (stream_id, count) in enumerate(people.items()):
+            multi_counter.submit(
+                stream_id, render_frame(stream_index, count, frame_index)
+            )
+        calls = len(detector.batch_sizes)
+        while multi_counter.pending:
+            multi_counter.process_batch(multi_counter.next_batch())
+        if len(detector.batch_sizes) - calls != batches_per_tick:
+            failures.append(f"frame {frame_index}: "
+                            f"{len(detector.batch_sizes) - calls} lotes")
+
+    full_batch = min(args.streams, args.max_batch_size)
+    print(f"{frames} frames x {args.streams} streams, "
+          f"{len(detector.batch_sizes)} chamadas de predict "
+          f"(lote máximo {max(detector.batch_sizes)})\n")
+    if max(detector.batch_sizes) != full_batch:
+        failures.append(f"lotes de {max(detector.batch_sizes)} frames, "
+                        f"esperado {full_batch}")
+
+    counts = multi_counter.get_counts()
+    print(f"{'stream':>8} {'in':>4} {'out':>4} {'esperado':>10}")
+    for stream_index, (stream_id, count) in enumerate(people.items()):
+        expected = expected_counts(stream_index, count)
+        people_in, people_out = counts[stream_id]
+        print(f"{stream_id:>8} {people_in:>4} {people_out:>4} "
+              f"{expected[0]:>5}/{expected[1]}")
+        if (people_in, people_out) != expected:
+            failures.append(f"{stream_id}: contagem ({people_in}, "
+                            f"{people_out}), esperado {expected}")
+
+    for failure in failures[:20]:
+        print("FALHA:", failure)
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
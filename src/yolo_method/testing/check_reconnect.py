@@ -0,0 +1,121 @@
+"""
+Reconnection and latency check of VideoStream on a network camera.
+
+Starts stream_server.py on a looped video (dropping every connection after
+--drop-after seconds and refusing new ones for --down-for seconds), reads
+it with VideoStream for --seconds with a consumer slower than the stream
+(--work-ms per frame, like inference), and reports:
+  - end-to-end latency of the frames read (send time stamped by the
+    server), p50/p95/max, after the first second of each connection;
+  - reconnects, failed attempts, flushed/dropped frames and downtime.
+Passes when every drop was followed by a reconnection and the p95 latency
+stays under --max-latency. Both the threaded capture and the synchronous
+read (stale frame flushing) are checked.
+Run from the project root:
+    python src/yolo_method/testing/check_reconnect.py VIDEO
+        [--seconds 20] [--drop-after 5] [--down-for 2] [--work-ms 80]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.testing.stream_server import read_stamp
+from src.yolo_method.video_stream import VideoStream
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), "stream_server.py")
+WARM_UP = 1.0  # seconds after (re)connecting excluded from the latency
+
+
+def start_server(video_path, drop_after, down_for):
+    """
+    Runs the stand-in camera in its own process.
+    :return: (process, stream URL)
+    """
+    process = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, video_path, "--port", "0",
+         "--drop-after", str(drop_after), "--down-for", str(down_for)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    url = process.stdout.readline().strip()
+    if not url:
+        process.kill()
+        raise RuntimeError("O servidor de teste não iniciou.")
+    return process, url
+
+
+def run_check(url, seconds, work_seconds, threaded):
+    """
+    Reads the stream like the counting loop does.
+    :return: (latencies in seconds, VideoStream.stats())
+    """
+    video_stream = VideoStream(url, threaded=threaded)
+    latencies = []
+    reconnects = 0
+    connected_at = time.monotonic()
+    end = time.monotonic() + seconds
+    try:
+        while time.monotonic() < end:
+            ret, frame = video_stream.read(timeout=1.0)
+            stats = video_stream.stats()
+            if stats["reconnects"] != reconnects:
+                reconnects = stats["reconnects"]
+                connected_at = time.monotonic()
+            if not ret:
+                continue
+            if time.monotonic() - connected_at > WARM_UP:
+                latencies.append(time.time() - read_stamp(frame))
+            time.sleep(work_seconds)
+    finally:
+        stats = video_stream.stats()
+        video_stream.release()
+    return np.array(latencies), stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--drop-after", type=float, default=5)
+    parser.add_argument("--down-for", type=float, default=2)
+    parser.add_argument("--work-ms", type=float, default=80,
+                        help="simulated processing time per frame")
+    parser.add_argument("--max-latency", type=float, default=0.5,
+                        help="p95 end-to-end latency allowed (seconds)")
+    args = parser.parse_args()
+
+    expected_drops = int(args.seconds // (args.drop_after + args.down_for))
+    passed = True
+    for threaded in (True, False):
+        mode = "threaded" if threaded else "sync"
+        process, url = start_server(args.video, args.drop_after,
+                                    args.down_for)
+        try:
+            latencies, stats = run_check(url, args.seconds,
+                                         args.work_ms / 1000, threaded)
+        finally:
+            process.kill()
+            process.wait()
+
+        p50, p95, worst = (np.percentile(latencies, [50, 95, 100])
+                           if len(latencies) else (np.inf,) * 3)
+        ok = (stats["reconnects"] >= max(expected_drops - 1, 1)
+              and p95 <= args.max_latency)
+        passed &= ok
+        print(f"{mode:>8}: {len(latencies)} frames, latency p50 "
+              f"{1000 * p50:.0f} ms p95 {1000 * p95:.0f} ms max "
+              f"{1000 * worst:.0f} ms - reconnects {stats['reconnects']}, "
+              f"failed {stats['failed_attempts']}, flushed "
+              f"{stats['flushed']}, dropped {stats.get('dropped', 0)}, "
+              f"downtime {stats['downtime_s']:.1f} s - "
+              f"{'OK' if ok else 'FALHOU'}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
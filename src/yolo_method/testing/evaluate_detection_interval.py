@@ -0,0 +1,61 @@
+"""
+Accuracy vs. throughput of the adaptive detection interval.
+
+Counts the same video with max_detection_interval = 1 (reference, YOLO on
+every frame) and with larger values, then reports the in/out count error
+against the reference next to the speedup and the share of frames that
+actually ran YOLO.
+Run from the project root:
+    python src/yolo_method/testing/evaluate_detection_interval.py \
+        VIDEO --zones zones.json [--intervals 2 4 8]
+"""
+import argparse
+import os
+import sys
+
+from ultralytics import YOLO
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.batch_count import count_video
+from src.yolo_method.counter import DEFAULT_MODEL_PATH
+from src.yolo_method.zones import load_layout
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video")
+    parser.add_argument("--zones", required=True)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    layout = load_layout(args.zones)
+    model = YOLO(args.model, verbose=False)
+
+    results = []
+    for interval in [1] + args.intervals:
+        summary = count_video(args.video, layout, {
+            "model": model,
+            "tracker_type": "assignment",
+            "max_detection_interval": interval,
+        })
+        results.append((interval, summary))
+
+    reference = results[0][1]
+    print(f"\n{'K max':>6} {'in':>5} {'out':>5} {'error':>6} "
+          f"{'fps':>8} {'speedup':>8} {'detected':>9}")
+    for interval, summary in results:
+        error = (abs(summary["people_in"] - reference["people_in"])
+                 + abs(summary["people_out"] - reference["people_out"]))
+        speedup = summary["fps"] / max(reference["fps"], 1e-9)
+        detected = summary["detected_frames"] / max(
+            summary["processed_frames"], 1
+        )
+        print(f"{interval:>6} {summary['people_in']:>5} "
+              f"{summary['people_out']:>5} {error:>6} {summary['fps']:>8.1f} "
+              f"{speedup:>7.2f}x {detected:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
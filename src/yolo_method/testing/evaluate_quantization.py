@@ -0,0 +1,192 @@
+"""
+Speed and person recall of the int8 detector against the float models.
+
+Runs each backend on a labelled local sample in the YOLO format:
+    SAMPLE/images/NAME.jpg
+    SAMPLE/labels/NAME.txt   one "class cx cy w h" row per object,
+                             normalized to [0, 1] (class 0 = person)
+and reports, per backend:
+  - mean/p95 milliseconds per image (single image predict, after a few
+    warm-up images) and the speedup against the reference (the first
+    --baselines entry);
+  - person recall and precision at --iou (detections matched one to one
+    to the labelled persons);
+  - the recall drop of onnx_int8 against each float backend.
+Fails (exit code 1) when the recall drop against the reference is above
+--max-recall-drop. The int8 model must have been generated first (see
+quantization.py), ideally on frames that are not part of the sample.
+Run from the project root:
+    python src/yolo_method/testing/evaluate_quantization.py SAMPLE
+        [--baselines pytorch onnx] [--output quant.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.backends import (
+    BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_PYTORCH, BACKENDS, is_available,
+    load_model,
+)
+from src.yolo_method.counter import DEFAULT_MODEL_PATH
+from src.yolo_method.detections import (
+    DEFAULT_CONFIDENCE, PERSON_CLASS_ID, filter_person_boxes,
+)
+from src.yolo_method.quantization import IMAGE_EXTENSIONS
+from src.yolo_method.tracker import box_iou
+
+WARM_UP_IMAGES = 3
+MATCH_IOU = 0.5
+
+
+def load_sample(sample_dir):
+    """
+    :return: list of (image path, (G, 4) float32 person boxes in pixels).
+    """
+    images_dir = os.path.join(sample_dir, "images")
+    labels_dir = os.path.join(sample_dir, "labels")
+    sample = []
+    for name in sorted(os.listdir(images_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image_path = os.path.join(images_dir, name)
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        height, width = image.shape[:2]
+        label_path = os.path.join(labels_dir,
+                                  os.path.splitext(name)[0] + ".txt")
+        rows = np.empty((0, 5), dtype=np.float32)
+        if os.path.exists(label_path):
+            rows = np.loadtxt(label_path, dtype=np.float32, ndmin=2)
+            rows = rows.reshape(-1, 5)
+        rows = rows[rows[:, 0] == PERSON_CLASS_ID]
+        cx, cy = rows[:, 1] * width, rows[:, 2] * height
+        w, h = rows[:, 3] * width, rows[:, 4] * height
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2],
+                         axis=1)
+        sample.append((image_path, boxes.astype(np.float32)))
+    return sample
+
+
+def count_matches(ground_truth, detections, min_iou=MATCH_IOU):
+    """
+    Number of one-to-one matches with IoU >= min_iou.
+    """
+    if len(ground_truth) == 0 or len(detections) == 0:
+        return 0
+    iou = box_iou(ground_truth, detections)
+    rows, cols = linear_sum_assignment(-iou)
+    return int((iou[rows, cols] >= min_iou).sum())
+
+
+def evaluate_backend(model, sample, conf, min_iou):
+    """
+    :return: dict with timings (ms), recall and precision.
+    """
+    images = [cv2.imread(image_path) for image_path, _ in sample]
+    for image in images[:WARM_UP_IMAGES]:
+        model.predict(image, conf=conf, classes=[PERSON_CLASS_ID],
+                      verbose=False)
+
+    timings = []
+    labelled = detected = matched = 0
+    for image, (_, ground_truth) in zip(images, sample):
+        start = time.perf_counter()
+        results = model.predict(image, conf=conf, classes=[PERSON_CLASS_ID],
+                                verbose=False)
+        timings.append(time.perf_counter() - start)
+        detections = filter_person_boxes(results[0].boxes.data, conf=conf)
+        detections = detections.astype(np.float32)
+        labelled += len(ground_truth)
+        detected += len(detections)
+        matched += count_matches(ground_truth, detections, min_iou)
+
+    timings = 1000 * np.array(timings)
+    return {
+        "ms_mean": round(float(timings.mean()), 2),
+        "ms_p95": round(float(np.percentile(timings, 95)), 2),
+        "recall": round(matched / max(labelled, 1), 4),
+        "precision": round(matched / max(detected, 1), 4),
+        "labelled": labelled,
+        "detected": detected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sample", help="directory with images/ and labels/")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--baselines", nargs="+",
+                        default=[BACKEND_PYTORCH, BACKEND_ONNX],
+                        choices=[b for b in BACKENDS
+                                 if b != BACKEND_ONNX_INT8],
+                        help="float backends; the first is the reference")
+    parser.add_argument("--conf", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--iou", type=float, default=MATCH_IOU)
+    parser.add_argument("--max-recall-drop", type=float, default=0.02)
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    # load_model would silently fall back to PyTorch
+    for backend in args.baselines + [BACKEND_ONNX_INT8]:
+        if not is_available(backend):
+            print(f"FALHOU: pacote do backend {backend} não instalado")
+            sys.exit(1)
+
+    sample = load_sample(args.sample)
+    if not sample:
+        print(f"FALHOU: nenhuma imagem em {args.sample}/images")
+        sys.exit(1)
+    print(f"{len(sample)} imagens, "
+          f"{sum(len(boxes) for _, boxes in sample)} pessoas rotuladas\n")
+
+    results = {}
+    for backend in args.baselines + [BACKEND_ONNX_INT8]:
+        model = load_model(args.model, backend, verbose=False)
+        results[backend] = evaluate_backend(model, sample, args.conf,
+                                            args.iou)
+
+    reference = results[args.baselines[0]]
+    print(f"{'backend':>10} {'ms mean':>8} {'ms p95':>8} {'speedup':>8} "
+          f"{'recall':>7} {'precision':>9}")
+    for backend, result in results.items():
+        result["speedup"] = round(
+            reference["ms_mean"] / max(result["ms_mean"], 1e-9), 2
+        )
+        print(f"{backend:>10} {result['ms_mean']:>8.1f} "
+              f"{result['ms_p95']:>8.1f} {result['speedup']:>7.2f}x "
+              f"{result['recall']:>7.3f} {result['precision']:>9.3f}")
+
+    quantized = results[BACKEND_ONNX_INT8]
+    recall_drops = {
+        backend: round(results[backend]["recall"] - quantized["recall"], 4)
+        for backend in args.baselines
+    }
+    print()
+    for backend, drop in recall_drops.items():
+        speedup = results[backend]["ms_mean"] / max(quantized["ms_mean"], 1e-9)
+        print(f"int8 vs {backend}: speedup {speedup:.2f}x, queda de recall "
+              f"{100 * drop:.2f} pontos")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"sample": args.sample, "conf": args.conf,
+                       "iou": args.iou, "results": results,
+                       "recall_drop": recall_drops}, f, indent=2)
+
+    if recall_drops[args.baselines[0]] > args.max_recall_drop:
+        print("FALHOU: queda de recall acima do limite")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
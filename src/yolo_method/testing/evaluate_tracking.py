@@ -0,0 +1,268 @@
+"""
+Accuracy and throughput of the tracker + zone counting.
+
+Feeds per-frame detections (YOLO rows: x1, y1, x2, y2, confidence, class)
+through PeopleCounter.count_detections for every combination of tracker,
+matching radius (max_distance) and confidence threshold, and compares the
+result with annotated ground truth:
+  - in/out counts: the ground-truth counts are those of the zone logic run
+    on the ground-truth tracks (or --expected-in/--expected-out);
+  - ID switches: a ground-truth person matched (IoU >= 0.5) to a different
+    track than the last time it was matched;
+  - match ratio: share of ground-truth boxes matched to a track;
+  - throughput of the tracker + zone stage (frames/sec).
+
+Synthetic sequences (default) come from synthetic_video.person_tracks with
+noisy detections: per-person confidence, box jitter and false positives.
+Recorded sequences need a fixture (synthetic_video.save_fixture format), a
+MOT-like ground-truth CSV (frame_index,id,x1,y1,x2,y2), the zones and the
+frame size.
+Run from the project root:
+    python src/yolo_method/testing/evaluate_tracking.py
+        [--radii 25 35 50 75] [--confs 0.3 0.5 0.7] [--output eval.json]
+    python src/yolo_method/testing/evaluate_tracking.py
+        --detections dets.npz --ground-truth gt.csv --zones zones.json
+        --frame-size 1280x720
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.counter import PeopleCounter
+from src.yolo_method.detections import filter_person_boxes
+from src.yolo_method.testing.synthetic_video import (
+    PERSON_CLASS, load_fixture, person_tracks, synthetic_areas,
+)
+from src.yolo_method.tracker import TRACKER_TYPES, box_iou
+from src.yolo_method.zones import load_areas
+
+MATCH_IOU = 0.5
+
+
+def synthetic_sequence(width, height, people, frames, seed=0,
+                       false_positives=0.3):
+    """
+    Ground truth and noisy detections of a synthetic scene.
+    :param false_positives: mean number of spurious boxes per frame.
+    :return: (detections, ground truth): per-frame (K, 6) YOLO rows and
+        per-frame (G, 5) arrays of [x1, y1, x2, y2, person id].
+    """
+    rng = np.random.default_rng(seed)
+    boxes, laps = person_tracks(width, height, people, frames, seed,
+                                with_laps=True)
+    identities = np.arange(people) + people * (laps - laps.min())
+    # Some people are harder to detect than others
+    base_conf = rng.uniform(0.35, 0.95, people)
+    box_h = height / 5
+    limits = [width - 1, height - 1] * 2
+
+    detections = []
+    ground_truth = []
+    for frame_boxes, frame_ids in zip(boxes, identities):
+        visible = (frame_boxes[:, 3] > 0) & (frame_boxes[:, 1] < height)
+        truth = np.clip(frame_boxes[visible], 0, limits)
+        ground_truth.append(np.hstack([truth, frame_ids[visible, None]]))
+
+        jitter = rng.normal(0, 0.02 * box_h, truth.shape)
+        conf = np.clip(base_conf[visible] + rng.normal(0, 0.1, len(truth)),
+                       0.05, 0.99)
+        spurious_count = rng.poisson(false_positives)
+        top_left = rng.uniform(0, [width - box_h / 2.5, height - box_h],
+                               (spurious_count, 2))
+        spurious = np.hstack([top_left, top_left + [box_h / 2.5, box_h]])
+        rows = np.vstack([
+            np.hstack([np.clip(truth + jitter, 0, limits), conf[:, None]]),
+            np.hstack([spurious,
+                       rng.uniform(0.1, 0.55, (spurious_count, 1))]),
+        ])
+        detections.append(np.hstack([
+            rows, np.full((len(rows), 1), PERSON_CLASS)
+        ]).astype(np.float32))
+    return detections, ground_truth
+
+
+def load_ground_truth(csv_path, frames):
+    """
+    Reads frame_index,id,x1,y1,x2,y2 rows (header optional).
+    :return: per-frame (G, 5) arrays of [x1, y1, x2, y2, id].
+    """
+    per_frame = [[] for _ in range(frames)]
+    with open(csv_path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip().lstrip("-").isdigit():
+                continue
+            frame_index, obj_id, x1, y1, x2, y2 = map(float, row[:6])
+            if 0 <= frame_index < frames:
+                per_frame[int(frame_index)].append([x1, y1, x2, y2, obj_id])
+    return [np.array(rows, dtype=np.float64).reshape(-1, 5)
+            for rows in per_frame]
+
+
+def ground_truth_counts(ground_truth, area1, area2, frame_size):
+    """
+    In/out counts of the zone logic on the ground-truth tracks.
+    """
+    counter = PeopleCounter(verbose=False)
+    counter.set_areas(area1, area2, frame_size)
+    for frame_index, truth in enumerate(ground_truth):
+        counter.count_tracks(truth.astype(np.int64).tolist(), frame_index)
+    return counter.get_counts()
+
+
+def match_tracks(truth, tracks):
+    """
+    One-to-one IoU matching of ground-truth boxes and tracks.
+    :return: {ground-truth id: track id}
+    """
+    if len(truth) == 0 or len(tracks) == 0:
+        return {}
+    iou = box_iou(truth[:, :4].astype(np.float32),
+                  tracks[:, :4].astype(np.float32))
+    rows, cols = linear_sum_assignment(-iou)
+    return {
+        int(truth[row, 4]): int(tracks[col, 4])
+        for row, col in zip(rows, cols) if iou[row, col] >= MATCH_IOU
+    }
+
+
+def evaluate(detections, ground_truth, area1, area2, frame_size,
+             expected_counts, tracker_type, max_distance, conf):
+    """
+    Runs one configuration over the sequence.
+    :return: metrics dict
+    """
+    counter = PeopleCounter(
+        tracker_type=tracker_type, conf=conf, verbose=False,
+        tracker_kwargs={"max_distance": max_distance},
+    )
+    counter.set_areas(area1, area2, frame_size)
+
+    results = []
+    start = time.perf_counter()
+    for frame_index, rows in enumerate(detections):
+        bboxes = filter_person_boxes(rows, conf=conf)
+        results.append(counter.count_detections(bboxes, frame_index))
+    seconds = time.perf_counter() - start
+
+    last_track = {}
+    id_switches = 0
+    matched = 0
+    for result, truth in zip(results, ground_truth):
+        matches = match_tracks(truth, result.tracks)
+        matched += len(matches)
+        for truth_id, track_id in matches.items():
+            previous = last_track.get(truth_id)
+            if previous is not None and previous != track_id:
+                id_switches += 1
+            last_track[truth_id] = track_id
+
+    people_in, people_out = counter.get_counts()
+    expected_in, expected_out = expected_counts
+    count_error = abs(people_in - expected_in) + abs(people_out - expected_out)
+    truth_boxes = sum(len(truth) for truth in ground_truth)
+    return {
+        "tracker": tracker_type,
+        "max_distance": max_distance,
+        "conf": conf,
+        "people_in": people_in,
+        "people_out": people_out,
+        "count_error": count_error,
+        "count_accuracy": round(
+            1 - count_error / max(expected_in + expected_out, 1), 4
+        ),
+        "id_switches": id_switches,
+        "match_ratio": round(matched / max(truth_boxes, 1), 4),
+        "fps": round(len(detections) / max(seconds, 1e-9), 1),
+    }
+
+
+def parse_frame_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--detections",
+                        help="recorded fixture (.npz); synthetic if omitted")
+    parser.add_argument("--ground-truth",
+                        help="CSV frame_index,id,x1,y1,x2,y2")
+    parser.add_argument("--zones", help="JSON zone file (recorded input)")
+    parser.add_argument("--frame-size", type=parse_frame_size,
+                        default=(1280, 720))
+    parser.add_argument("--people", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--expected-in", type=int, default=None)
+    parser.add_argument("--expected-out", type=int, default=None)
+    parser.add_argument("--trackers", nargs="+",
+                        default=sorted(TRACKER_TYPES),
+                        choices=sorted(TRACKER_TYPES))
+    parser.add_argument("--radii", type=float, nargs="+",
+                        default=[25, 35, 50, 75])
+    parser.add_argument("--confs", type=float, nargs="+",
+                        default=[0.3, 0.5, 0.7])
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    frame_size = args.frame_size
+    if args.detections:
+        if not (args.ground_truth and args.zones):
+            parser.error("--detections needs --ground-truth and --zones")
+        detections = load_fixture(args.detections)
+        ground_truth = load_ground_truth(args.ground_truth, len(detections))
+        area1, area2 = load_areas(args.zones)
+    else:
+        detections, ground_truth = synthetic_sequence(
+            *frame_size, args.people, args.frames, args.seed
+        )
+        area1, area2 = synthetic_areas(*frame_size)
+
+    expected_counts = ground_truth_counts(ground_truth, area1, area2,
+                                          frame_size)
+    if args.expected_in is not None:
+        expected_counts = (args.expected_in, expected_counts[1])
+    if args.expected_out is not None:
+        expected_counts = (expected_counts[0], args.expected_out)
+    print(f"{len(detections)} frames - esperado: "
+          f"{expected_counts[0]} entradas, {expected_counts[1]} saídas\n")
+
+    print(f"{'tracker':>10} {'radius':>7} {'conf':>5} {'in':>5} {'out':>5} "
+          f"{'error':>6} {'accuracy':>9} {'id sw':>6} {'match':>6} "
+          f"{'fps':>9}")
+    results = []
+    for tracker_type in args.trackers:
+        for max_distance in args.radii:
+            for conf in args.confs:
+                result = evaluate(detections, ground_truth, area1, area2,
+                                  frame_size, expected_counts, tracker_type,
+                                  max_distance, conf)
+                results.append(result)
+                print(f"{tracker_type:>10} {max_distance:>7g} {conf:>5g} "
+                      f"{result['people_in']:>5} {result['people_out']:>5} "
+                      f"{result['count_error']:>6} "
+                      f"{result['count_accuracy']:>9.3f} "
+                      f"{result['id_switches']:>6} "
+                      f"{result['match_ratio']:>6.3f} "
+                      f"{result['fps']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "frames": len(detections),
+                "expected_in": expected_counts[0],
+                "expected_out": expected_counts[1],
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
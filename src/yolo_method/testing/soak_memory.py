@@ -0,0 +1,131 @@
+"""
+Soak test of the counting state over a long session.
+
+Replays a synthetic detection stream (people walking up and down across
+area1/area2, no video and no model) through PeopleCounter.count_detections
+and checks with tracemalloc that the memory used by the tracker and the
+counting state stays flat, while the counts keep growing.
+Run from the project root (24 h at 5 fps takes a few minutes):
+    python src/yolo_method/testing/soak_memory.py [--hours 24] [--fps 5]
+        [--tracker assignment]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+from src.yolo_method.counter import PeopleCounter
+from src.yolo_method.tracker import TRACKER_TYPES
+
+FRAME_SIZE = (640, 480)
+AREA1 = [[(0, 100), (640, 100), (640, 180), (0, 180)]]
+AREA2 = [[(0, 300), (640, 300), (640, 380), (0, 380)]]
+LANES = 8
+LANE_WIDTH = FRAME_SIZE[0] // LANES
+BOX_SIZE = (40, 80)
+SPEED = 8  # px per frame
+SPAWN_INTERVAL = 20  # frames between two people
+MAX_GROWTH = 256 * 1024  # bytes accepted after the warm-up hour
+
+
+def person_box(person, age):
+    """
+    Box of the person 'person' 'age' frames after it appeared, or None once
+    it left the frame. Even people walk up (in), odd people walk down (out).
+    """
+    height = FRAME_SIZE[1]
+    distance = SPEED * age
+    if distance > height:
+        return None
+    foot_y = height - 1 - distance if person % 2 == 0 else distance
+    x1 = (person % LANES) * LANE_WIDTH + 10
+    return [x1, foot_y - BOX_SIZE[1], x1 + BOX_SIZE[0], foot_y]
+
+
+def frame_detections(frame_index):
+    """
+    Boxes of every person visible at 'frame_index'.
+    :return: (boxes, number of people that already left the frame)
+    """
+    lifetime = FRAME_SIZE[1] // SPEED + 1
+    last_person = frame_index // SPAWN_INTERVAL
+    first_person = max(0, (frame_index - lifetime) // SPAWN_INTERVAL)
+    boxes = []
+    for person in range(first_person, last_person + 1):
+        box = person_box(person, frame_index - person * SPAWN_INTERVAL)
+        if box is not None:
+            boxes.append(box)
+    finished = max(0, (frame_index - lifetime) // SPAWN_INTERVAL)
+    return boxes, finished
+
+
+def state_size(counter):
+    return (len(counter.people_entering) + len(counter.people_exiting)
+            + len(counter.entering) + len(counter.exiting))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--fps", type=int, default=5)
+    parser.add_argument("--tracker", default="assignment",
+                        choices=sorted(TRACKER_TYPES))
+    args = parser.parse_args()
+
+    counter = PeopleCounter(tracker_type=args.tracker, verbose=False)
+    counter.set_areas(AREA1, AREA2, FRAME_SIZE)
+
+    frames_per_hour = int(3600 * args.fps)
+    total_frames = int(args.hours * frames_per_hour)
+    baseline = None
+    peak_growth = 0
+    max_state = 0
+    start = time.perf_counter()
+
+    print(f"{'hour':>5} {'in':>8} {'out':>8} {'state':>6} {'memory KiB':>11}")
+    for frame_index in range(total_frames):
+        boxes, finished = frame_detections(frame_index)
+        counter.count_detections(boxes, frame_index=frame_index)
+        max_state = max(max_state, state_size(counter))
+
+        if (frame_index + 1) % frames_per_hour:
+            continue
+        hour = (frame_index + 1) // frames_per_hour
+        if baseline is None:
+            # First hour is the warm-up: start measuring from here
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        current = tracemalloc.get_traced_memory()[0]
+        peak_growth = max(peak_growth, current - baseline)
+        people_in, people_out = counter.get_counts()
+        print(f"{hour:>5} {people_in:>8} {people_out:>8} "
+              f"{state_size(counter):>6} {current / 1024:>11.1f}")
+
+    seconds = time.perf_counter() - start
+    tracemalloc.stop()
+    people_in, people_out = counter.get_counts()
+    print(f"\n{total_frames} frames in {seconds:.1f} s "
+          f"({total_frames / seconds:.0f} fps)")
+    print(f"Pessoas que cruzaram: {finished}  "
+          f"contadas: {people_in + people_out}")
+    print(f"Maior estado: {max_state}  "
+          f"crescimento da memória: {peak_growth / 1024:.1f} KiB")
+
+    failures = []
+    if people_in + people_out < finished:
+        failures.append("contagem menor que o número de passagens")
+    # Live tracks only: at most the people visible at the same time
+    if max_state > 4 * LANES:
+        failures.append("estado de contagem não foi liberado")
+    if peak_growth > MAX_GROWTH:
+        failures.append("memória cresceu durante o teste")
+    for failure in failures:
+        print("FALHA:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
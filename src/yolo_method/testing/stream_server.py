@@ -0,0 +1,161 @@
+"""
+Stand-in network camera: serves a video file in a loop as an HTTP MJPEG
+stream (multipart/x-mixed-replace, as many IP cameras do), in real time.
+
+Every frame carries its send time (epoch ms) as a strip of black/white
+blocks at the top left (see stamp_frame/read_stamp), so a client can
+measure the end-to-end latency of each frame it gets.
+
+To exercise reconnection, --drop-after closes every connection after that
+many seconds, and --down-for refuses new connections for a while after
+each drop.
+Run from the project root (in its own process: cv2.VideoCapture holds the
+GIL while opening, so a server in the same process would stall it):
+    python src/yolo_method/testing/stream_server.py VIDEO [--port 8554]
+        [--fps 25] [--drop-after 10] [--down-for 3]
+Stream URL: http://127.0.0.1:8554/stream.mjpg
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+BOUNDARY = "frame"
+STAMP_BITS = 41  # epoch milliseconds fit in 41 bits until 2039
+STAMP_BLOCK = 6  # px per bit, large enough to survive JPEG compression
+JPEG_QUALITY = 80
+
+
+def stamp_frame(frame, timestamp):
+    """
+    Writes 'timestamp' (epoch seconds) into the top rows of the frame.
+    """
+    value = int(timestamp * 1000)
+    for bit in range(STAMP_BITS):
+        x = bit * STAMP_BLOCK
+        frame[:STAMP_BLOCK, x:x + STAMP_BLOCK] = (
+            255 if (value >> bit) & 1 else 0
+        )
+    return frame
+
+
+def read_stamp(frame):
+    """
+    :return: epoch seconds written by stamp_frame.
+    """
+    strip = frame[:STAMP_BLOCK, :STAMP_BITS * STAMP_BLOCK]
+    if strip.ndim == 3:
+        strip = strip.mean(axis=2)
+    blocks = strip.reshape(STAMP_BLOCK, STAMP_BITS, STAMP_BLOCK).mean(
+        axis=(0, 2)
+    )
+    bits = (blocks > 127).astype(np.int64)
+    return int((bits << np.arange(STAMP_BITS)).sum()) / 1000
+
+
+class StreamState:
+    def __init__(self, video_path, fps, drop_after, down_for):
+        self.video_path = video_path
+        self.fps = fps
+        self.drop_after = drop_after
+        self.down_for = down_for
+        self.down_until = 0.0
+        self.lock = threading.Lock()
+
+    def is_down(self):
+        with self.lock:
+            return time.time() < self.down_until
+
+    def drop(self):
+        with self.lock:
+            self.down_until = time.time() + self.down_for
+
+
+def make_handler(state):
+    class StreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/stream.mjpg":
+                self.send_error(404)
+                return
+            if state.is_down():
+                self.send_error(503)
+                return
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+            )
+            self.end_headers()
+            self.stream()
+
+        def stream(self):
+            cap = cv2.VideoCapture(state.video_path)
+            fps = state.fps or cap.get(cv2.CAP_PROP_FPS) or 25.0
+            start = time.monotonic()
+            sent = 0
+            try:
+                while True:
+                    if (state.drop_after
+                            and time.monotonic() - start > state.drop_after):
+                        state.drop()
+                        return
+                    ret, frame = cap.read()
+                    if not ret:
+                        # Loop the file
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    # Real-time pacing
+                    delay = start + sent / fps - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    stamp_frame(frame, time.time())
+                    data = cv2.imencode(
+                        ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+                    )[1].tobytes()
+                    self.wfile.write(
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(data)}\r\n\r\n".encode()
+                        + data + b"\r\n"
+                    )
+                    sent += 1
+            except OSError:
+                # Client went away
+                pass
+            finally:
+                cap.release()
+
+        def log_message(self, format, *args):
+            pass
+
+    return StreamHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8554)
+    parser.add_argument("--fps", type=float, default=None,
+                        help="send rate (default: the video fps)")
+    parser.add_argument("--drop-after", type=float, default=0,
+                        help="close each connection after N seconds")
+    parser.add_argument("--down-for", type=float, default=0,
+                        help="refuse connections for N seconds after a drop")
+    args = parser.parse_args()
+
+    state = StreamState(args.video, args.fps, args.drop_after, args.down_for)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"http://{args.host}:{server.server_address[1]}/stream.mjpg",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
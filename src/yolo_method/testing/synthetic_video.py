@@ -0,0 +1,176 @@
+"""
+Synthetic test videos: people as moving rectangles.
+
+generate_video writes a video where 'people' rectangles walk up and down
+across two horizontal bands (area1 at the top, area2 at the bottom, see
+synthetic_areas) and returns the ground-truth box of every person in every
+frame. Those boxes are saved as a detection fixture (rows of YOLO output,
+x1, y1, x2, y2, confidence, class), so the tracker and the zones can be run
+offline, without the model.
+Run from the project root to create a video and its fixture:
+    python src/yolo_method/testing/synthetic_video.py OUT_DIR
+        [--width 1280] [--height 720] [--people 10] [--frames 300]
+"""
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+FOURCC = "MJPG"
+DEFAULT_FPS = 30
+PERSON_CLASS = 0
+DISTRACTOR_CLASS = 2  # a parked "car" the person filter must drop
+
+
+def synthetic_areas(width, height):
+    """
+    area1 (top band) and area2 (bottom band) covering the frame width,
+    in the VideoWidget format: list of polygons of (x, y) points.
+    """
+    def band(top, bottom):
+        return [[(0, int(top * height)), (width - 1, int(top * height)),
+                 (width - 1, int(bottom * height)),
+                 (0, int(bottom * height))]]
+    return band(0.25, 0.40), band(0.60, 0.75)
+
+
+def person_tracks(width, height, people, frames, seed=0,
+                  with_laps=False):
+    """
+    Ground-truth boxes of every person in every frame.
+    People walk vertically at a constant speed and re-enter from the
+    opposite edge after leaving the frame.
+    :return: (frames, people, 4) float32 array of (x1, y1, x2, y2), and
+        with_laps the (frames, people) number of re-entries (a new pass
+        of the same person is a new identity).
+    """
+    rng = np.random.default_rng(seed)
+    box_h = height / 5
+    box_w = box_h / 2.5
+    x1 = rng.uniform(0, width - box_w, people)
+    foot_y = rng.uniform(0, height + box_h, people)
+    speed = rng.uniform(height / 150, height / 60, people)
+    speed *= rng.choice([-1, 1], people)
+    drift = rng.uniform(-0.5, 0.5, people)
+
+    t = np.arange(frames)[:, None]
+    span = height + box_h
+    y2 = np.mod(foot_y + speed * t, span)
+    x1 = np.clip(x1 + drift * t, 0, width - box_w)
+    boxes = np.stack([x1, y2 - box_h, x1 + box_w, y2], axis=2)
+    if with_laps:
+        laps = np.floor_divide(foot_y + speed * t, span).astype(np.int64)
+        return boxes.astype(np.float32), laps
+    return boxes.astype(np.float32)
+
+
+def background(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 120, width, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 8, (height, width, 1)).astype(np.float32)
+    image = np.broadcast_to(gradient + noise, (height, width, 3))
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def generate_video(video_path, width, height, people, frames,
+                   fps=DEFAULT_FPS, seed=0):
+    """
+    Writes the video and returns the fixture rows of each frame.
+    :return: list of (K, 6) float32 arrays (one per frame).
+    """
+    boxes = person_tracks(width, height, people, frames, seed)
+    base = background(width, height, seed)
+    colors = np.random.default_rng(seed + 1).integers(
+        150, 256, (people, 3)
+    ).tolist()
+    distractor = np.array([[0.05 * width, 0.05 * height,
+                            0.2 * width, 0.15 * height, 0.8,
+                            DISTRACTOR_CLASS]], dtype=np.float32)
+
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*FOURCC),
+                             fps, (width, height))
+    if not writer.isOpened():
+        raise ValueError(f"Não foi possível criar o vídeo {video_path}")
+    detections = []
+    try:
+        for frame_boxes in boxes:
+            frame = base.copy()
+            x1, y1, x2, y2 = distractor[0, :4].astype(int)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (40, 40, 160), -1)
+
+            visible = (frame_boxes[:, 3] > 0) & (frame_boxes[:, 1] < height)
+            for box, color in zip(frame_boxes[visible].astype(int),
+                                  np.array(colors)[visible].tolist()):
+                cv2.rectangle(frame, tuple(box[:2]), tuple(box[2:]),
+                              color, -1)
+            writer.write(frame)
+
+            clipped = np.clip(frame_boxes[visible], 0,
+                              [width - 1, height - 1] * 2)
+            rows = np.hstack([
+                clipped,
+                np.full((len(clipped), 1), 0.9, dtype=np.float32),
+                np.full((len(clipped), 1), PERSON_CLASS, dtype=np.float32),
+            ])
+            detections.append(np.vstack([rows, distractor]))
+    finally:
+        writer.release()
+    return detections
+
+
+def save_fixture(fixture_path, detections):
+    """
+    Stores the per-frame detections as one array plus frame offsets.
+    """
+    offsets = np.cumsum([0] + [len(rows) for rows in detections])
+    rows = (np.vstack(detections) if detections
+            else np.empty((0, 6), dtype=np.float32))
+    np.savez_compressed(fixture_path, detections=rows, offsets=offsets)
+
+
+def load_fixture(fixture_path):
+    """
+    :return: list of (K, 6) float32 arrays (one per frame).
+    """
+    with np.load(fixture_path) as data:
+        rows, offsets = data["detections"], data["offsets"]
+    return [rows[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def make_scenario(output_dir, width, height, people, frames,
+                  fps=DEFAULT_FPS, seed=0):
+    """
+    Video + fixture for one scenario, generated only once per output_dir.
+    :return: (video path, per-frame detections)
+    """
+    name = f"synthetic_{width}x{height}_{people}p_{frames}f_{seed}"
+    video_path = os.path.join(output_dir, name + ".avi")
+    fixture_path = os.path.join(output_dir, name + "_detections.npz")
+    if os.path.exists(video_path) and os.path.exists(fixture_path):
+        return video_path, load_fixture(fixture_path)
+
+    os.makedirs(output_dir, exist_ok=True)
+    detections = generate_video(video_path, width, height, people, frames,
+                                fps, seed)
+    save_fixture(fixture_path, detections)
+    return video_path, detections
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output_dir")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--people", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    video_path, _ = make_scenario(args.output_dir, args.width, args.height,
+                                  args.people, args.frames, seed=args.seed)
+    print(video_path)
+
+
+if __name__ == "__main__":
+    main()
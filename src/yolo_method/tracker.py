@@ -1,9 +1,37 @@
+"""
+Object trackers for the people counter.
+
+Both trackers share the same contract: update(bboxes) receives the boxes
+(x1, y1, x2, y2) of the current frame and returns [x1, y1, x2, y2, id]
+for each of them, and leaves in removed_ids the IDs of the tracks that
+ended in that update (they will never be returned again).
+  - Tracker: greedy centroid matching (original behaviour).
+  - AssignmentTracker: IoU/centroid cost matrix solved with the Hungarian
+    algorithm, keeping tracks alive for a few missed frames. It also keeps
+    a constant-velocity motion model, so predict() can propagate the tracks
+    on frames where detection is skipped.
+"""
 import math
 
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Cost given to pairs that must never be matched
+INVALID_COST = 1e6
+# Detections a track needs before its velocity is measured
+VELOCITY_OBSERVATIONS = 2
+
+
 class Tracker:
-    def __init__(self):
+    def __init__(self, max_distance=35):
+        """
+        :param max_distance: max centroid distance (px) between frames for
+            a box to keep its ID.
+        """
+        self.max_distance = max_distance
         self.center_points = {}
         self.id_count = 0
+        self.removed_ids = []
 
     def update(self, objects_rect):
         """
@@ -14,7 +42,7 @@ class Tracker:
 
         # For each bounding box, we calculate the center (cx, cy)
         for rect in objects_rect:
-            x, y, w, h = rect
+            x, y, w, h = map(int, rect)
             cx = (x + x + w) // 2
             cy = (y + y + h) // 2
 
@@ -22,7 +50,7 @@ class Tracker:
             same_object_detected = False
             for obj_id, pt in self.center_points.items():
                 dist = math.hypot(cx - pt[0], cy - pt[1])
-                if dist < 35:
+                if dist < self.max_distance:
                     # It's the same object, updates position
                     self.center_points[obj_id] = (cx, cy)
                     objects_bbs_ids.append([x, y, w, h, obj_id])
@@ -42,6 +70,215 @@ class Tracker:
             center = self.center_points[object_id]
             new_center_points[object_id] = center
 
+        self.removed_ids = [
+            obj_id for obj_id in self.center_points
+            if obj_id not in new_center_points
+        ]
         self.center_points = new_center_points.copy()
 
         return objects_bbs_ids
+
+
+class AssignmentTracker:
+    def __init__(self, max_distance=75, max_missed=15, iou_weight=0.5,
+                 velocity_smoothing=0.5):
+        """
+        :param max_distance: max centroid distance (px) for a match when the
+            boxes do not overlap.
+        :param max_missed: number of consecutive frames a track survives
+            without a matching detection.
+        :param iou_weight: weight of (1 - IoU) in the cost, the rest goes
+            to the normalized centroid distance.
+        :param velocity_smoothing: weight of the newest measured velocity in
+            the constant-velocity motion model.
+        """
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.iou_weight = iou_weight
+        self.velocity_smoothing = velocity_smoothing
+
+        self.track_ids = np.empty(0, dtype=np.int64)
+        # Current (measured or propagated) box of each track
+        self.track_boxes = np.empty((0, 4), dtype=np.float32)
+        self.missed = np.empty(0, dtype=np.int64)
+        # Box change per frame, and frames since the last matched detection
+        self.velocities = np.empty((0, 4), dtype=np.float32)
+        self.measured_boxes = np.empty((0, 4), dtype=np.float32)
+        self.frames_since_measured = np.empty(0, dtype=np.int64)
+        # Detections matched to each track since it started
+        self.observations = np.empty(0, dtype=np.int64)
+        self.id_count = 0
+        self.removed_ids = []
+
+    def update(self, objects_rect):
+        """
+        Receives the boxes (x1, y1, x2, y2) of the current frame and returns
+        [x1, y1, x2, y2, id] for each of them, in the same order.
+        """
+        boxes = np.asarray(objects_rect, dtype=np.float32).reshape(-1, 4)
+        detection_ids = np.full(len(boxes), -1, dtype=np.int64)
+        matched_tracks = np.zeros(len(self.track_ids), dtype=bool)
+
+        # Tracks are matched against where they should be in this frame
+        self._advance()
+
+        if len(boxes) and len(self.track_ids):
+            cost = self.cost_matrix(self.track_boxes, boxes)
+            track_rows, detection_cols = linear_sum_assignment(cost)
+            valid = cost[track_rows, detection_cols] < INVALID_COST
+            track_rows = track_rows[valid]
+            detection_cols = detection_cols[valid]
+
+            detection_ids[detection_cols] = self.track_ids[track_rows]
+            self._measure(track_rows, boxes[detection_cols])
+            matched_tracks[track_rows] = True
+
+        # Ages unmatched tracks and drops the ones missing for too long
+        self.missed[matched_tracks] = 0
+        self.missed[~matched_tracks] += 1
+        alive = self.missed <= self.max_missed
+        self.removed_ids = self.track_ids[~alive].tolist()
+        self._keep(alive)
+
+        # Unmatched detections start new tracks
+        new_detections = np.flatnonzero(detection_ids < 0)
+        if len(new_detections):
+            new_ids = np.arange(
+                self.id_count, self.id_count + len(new_detections),
+                dtype=np.int64
+            )
+            self.id_count += len(new_detections)
+            detection_ids[new_detections] = new_ids
+            self._add_tracks(new_ids, boxes[new_detections])
+
+        return [
+            [*map(int, box), int(obj_id)]
+            for box, obj_id in zip(boxes, detection_ids)
+        ]
+
+    def predict(self):
+        """
+        Propagates the tracks one frame with their velocity, for frames where
+        detection is skipped. Returns [x1, y1, x2, y2, id] for the tracks
+        matched at the last detection (coasting tracks are not reported).
+        """
+        self._advance()
+        visible = self.missed == 0
+        return [
+            [*map(int, np.rint(box)), int(obj_id)]
+            for box, obj_id in zip(
+                self.track_boxes[visible], self.track_ids[visible]
+            )
+        ]
+
+    def motion_stats(self):
+        """
+        Returns (number of visible tracks, max centroid speed in px/frame).
+        The speed is None while a visible track has been detected only
+        once: its velocity is still unknown (0), not slow.
+        """
+        visible = self.missed == 0
+        if not visible.any():
+            return 0, 0.0
+        if (self.observations[visible] < VELOCITY_OBSERVATIONS).any():
+            return int(visible.sum()), None
+        velocities = self.velocities[visible]
+        center_speed = np.linalg.norm(
+            (velocities[:, :2] + velocities[:, 2:]) / 2, axis=1
+        )
+        return int(visible.sum()), float(center_speed.max())
+
+    def _advance(self):
+        self.track_boxes += self.velocities
+        self.frames_since_measured += 1
+
+    def _measure(self, rows, boxes):
+        # Velocity measured over the frames since the last detection
+        gap = self.frames_since_measured[rows, None].astype(np.float32)
+        measured = (boxes - self.measured_boxes[rows]) / gap
+        self.velocities[rows] = (
+            self.velocity_smoothing * measured
+            + (1 - self.velocity_smoothing) * self.velocities[rows]
+        )
+        self.track_boxes[rows] = boxes
+        self.measured_boxes[rows] = boxes
+        self.frames_since_measured[rows] = 0
+        self.observations[rows] += 1
+
+    def _keep(self, mask):
+        self.track_ids = self.track_ids[mask]
+        self.track_boxes = self.track_boxes[mask]
+        self.missed = self.missed[mask]
+        self.velocities = self.velocities[mask]
+        self.measured_boxes = self.measured_boxes[mask]
+        self.frames_since_measured = self.frames_since_measured[mask]
+        self.observations = self.observations[mask]
+
+    def _add_tracks(self, ids, boxes):
+        count = len(ids)
+        self.track_ids = np.concatenate([self.track_ids, ids])
+        self.track_boxes = np.concatenate([self.track_boxes, boxes])
+        self.missed = np.concatenate(
+            [self.missed, np.zeros(count, dtype=np.int64)]
+        )
+        self.velocities = np.concatenate(
+            [self.velocities, np.zeros((count, 4), dtype=np.float32)]
+        )
+        self.measured_boxes = np.concatenate([self.measured_boxes, boxes])
+        self.frames_since_measured = np.concatenate(
+            [self.frames_since_measured, np.zeros(count, dtype=np.int64)]
+        )
+        self.observations = np.concatenate(
+            [self.observations, np.ones(count, dtype=np.int64)]
+        )
+
+    def cost_matrix(self, track_boxes, boxes):
+        """
+        Builds the (tracks x detections) cost matrix mixing (1 - IoU) and
+        the centroid distance normalized by max_distance.
+        """
+        iou = box_iou(track_boxes, boxes)
+
+        track_centers = (track_boxes[:, :2] + track_boxes[:, 2:]) / 2
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        distance = np.linalg.norm(
+            track_centers[:, None, :] - centers[None, :, :], axis=2
+        )
+
+        cost = (
+            self.iou_weight * (1 - iou)
+            + (1 - self.iou_weight)
+            * np.minimum(distance / self.max_distance, 1)
+        )
+        cost[(iou <= 0) & (distance > self.max_distance)] = INVALID_COST
+        return cost
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Intersection over union between every box of boxes_a (M, 4) and
+    boxes_b (N, 4). Returns an (M, N) array.
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+TRACKER_TYPES = {
+    "centroid": Tracker,
+    "assignment": AssignmentTracker,
+}
+
+
+def create_tracker(tracker_type="centroid", **kwargs):
+    """
+    Builds a tracker by name ("centroid" or "assignment").
+    """
+    if tracker_type not in TRACKER_TYPES:
+        raise ValueError(f"Tipo de tracker desconhecido: {tracker_type}")
+    return TRACKER_TYPES[tracker_type](**kwargs)
@@ -1,37 +1,226 @@
-import cv2
+import os
+import time
+
+from ..utils.frame_readers import (
+    READER_OPENCV, ReconnectingReader, open_reader,
+)
+from ..utils.metrics import REGISTRY
+from ..utils.threaded_capture import (
+    DEFAULT_BUFFER_SIZE, ThreadedCapture, default_policy,
+)
+
+FRAMES_METRIC = REGISTRY.counter(
+    "video_stream_frames_total", "Frames returned by read()", ["source"]
+)
+READ_METRIC = REGISTRY.histogram(
+    "video_stream_read_seconds", "Time spent waiting in read()", ["source"]
+)
+# Threaded capture only, read from ThreadedCapture.stats() when scraped
+BUFFER_METRICS = {
+    "buffered": REGISTRY.gauge(
+        "video_stream_buffered_frames", "Frames waiting in the ring buffer",
+        ["source"]
+    ),
+    "dropped": REGISTRY.gauge(
+        "video_stream_dropped_frames", "Frames overwritten before being read",
+        ["source"]
+    ),
+    "decoded": REGISTRY.gauge(
+        "video_stream_decoded_frames", "Frames decoded by the capture thread",
+        ["source"]
+    ),
+}
+FRAME_AGE_METRIC = REGISTRY.histogram(
+    "video_stream_frame_age_seconds",
+    "Time between decoding a frame and read() returning it (threaded)",
+    ["source"]
+)
+# Network cameras only, read from ReconnectingReader.stats() when scraped
+CONNECTION_METRICS = {
+    "connected": REGISTRY.gauge(
+        "video_stream_connected", "1 while the network stream is open",
+        ["source"]
+    ),
+    "reconnects": REGISTRY.gauge(
+        "video_stream_reconnects", "Successful reconnections", ["source"]
+    ),
+    "failed_attempts": REGISTRY.gauge(
+        "video_stream_failed_reconnects", "Failed reconnection attempts",
+        ["source"]
+    ),
+    "flushed": REGISTRY.gauge(
+        "video_stream_flushed_frames", "Stale frames skipped to cut latency",
+        ["source"]
+    ),
+    "downtime_s": REGISTRY.gauge(
+        "video_stream_downtime_seconds", "Time spent disconnected",
+        ["source"]
+    ),
+}
+
+
+def source_name(source):
+    """
+    Metrics label of a source: "camera_0" or the file/stream name.
+    """
+    if isinstance(source, int):
+        return f"camera_{source}"
+    return os.path.basename(str(source).rstrip("/")) or str(source)
+
 
 class VideoStream:
-    def __init__(self, source=0):
+    def __init__(self, source=0, threaded=False,
+                 buffer_size=DEFAULT_BUFFER_SIZE, policy=None, stride=1,
+                 reader=READER_OPENCV, decode_threads=0, reconnect=None,
+                 verbose=True):
         """
         Initializes the video stream.
         :param source: Path to video file or camera index (default=0 for webcam).
+        :param threaded: decode frames in a background thread into a ring
+            buffer.
+        :param buffer_size: number of frames kept by the ring buffer.
+        :param policy: "latest" (drop old frames) or "block" (never drop).
+            Defaults to "latest" for cameras and "block" for files.
+        :param stride: read() returns one frame out of 'stride'; the others
+            are skipped without being converted to images.
+        :param reader: "opencv" or "pyav" (multithreaded decoding of files,
+            needs the 'av' package).
+        :param decode_threads: PyAV decoding threads (0 = one per core).
+        :param reconnect: reopen the source with backoff when it drops and
+            skip stale frames (default: for RTSP/HTTP URLs).
+        :param verbose: report reader fallbacks (PyAV not installed).
         """
-        self.cap = cv2.VideoCapture(source)
-        if not self.cap.isOpened():
-            raise ValueError("Não foi possível abrir o vídeo ou a câmera.")
+        if stride < 1:
+            raise ValueError("O passo de leitura precisa ser pelo menos 1.")
+        self.reader = open_reader(source, reader, stride, decode_threads,
+                                  reconnect, verbose)
+        self.width = self.reader.width
+        self.height = self.reader.height
+        # 0 when unknown (e.g. some cameras)
+        self.fps = self.reader.fps
+        self.frame_count = self.reader.frame_count
+        self.stride = stride
+        # Index of the frame returned by the last read() (-1 before)
+        self.frame_index = -1
+        self.next_index = 0
 
-        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.buffer_size = buffer_size
+        self.policy = policy or default_policy(source)
+        self.capture = None
+        if threaded:
+            self.capture = ThreadedCapture(
+                self.reader, buffer_size, self.policy
+            )
 
-    def read(self):
+        self.source_name = source_name(source)
+        self.frames_metric = FRAMES_METRIC.labels(source=self.source_name)
+        self.read_metric = READ_METRIC.labels(source=self.source_name)
+        self.frame_age_metric = FRAME_AGE_METRIC.labels(
+            source=self.source_name
+        )
+        self.frame_age = 0.0
+        if self.capture is not None:
+            for key, metric in BUFFER_METRICS.items():
+                metric.labels(source=self.source_name).set_function(
+                    lambda key=key: self.capture.stats()[key]
+                )
+        if isinstance(self.reader, ReconnectingReader):
+            for key, metric in CONNECTION_METRICS.items():
+                metric.labels(source=self.source_name).set_function(
+                    lambda key=key: float(self.reader.stats()[key])
+                )
+
+    def read(self, timeout=None):
         """ 
         Reads the next frame from the video or camera.
+        :param timeout: max seconds to wait for a frame (threaded only).
+            (False, None) then does not mean the end; see ended().
         :return: (ret, frame) where ret is True if successful, and frame is the image read.
         """
-        ret, frame = self.cap.read()
+        start = time.perf_counter()
+        if self.capture is not None:
+            ret, frame = self.capture.read(timeout)
+        else:
+            ret, frame = self.reader.read()
         if not ret:
             return ret, None
+        self.read_metric.observe(time.perf_counter() - start)
+        self.frames_metric.inc()
+        if self.capture is not None:
+            # Time the frame waited in the ring buffer
+            self.frame_age = time.monotonic() - self.capture.last_frame_time
+            self.frame_age_metric.observe(self.frame_age)
+        # Exact for files; cameras with the "latest" policy drop frames
+        self.frame_index = self.next_index
+        self.next_index += self.stride
         return ret, frame
 
+    def seek_frame(self, frame_index):
+        """
+        Makes the next read() return frame 'frame_index' (video files).
+        Frames buffered by the capture thread are discarded.
+        """
+        if self.capture is not None:
+            self.capture.stop()
+        self.reader.seek(frame_index)
+        self.frame_index = frame_index - 1
+        self.next_index = frame_index
+        if self.capture is not None:
+            self.capture = ThreadedCapture(
+                self.reader, self.buffer_size, self.policy
+            )
+
+    def seek(self, seconds):
+        """
+        Makes the next read() return the frame at 'seconds' from the start.
+        """
+        if not self.fps:
+            raise ValueError("FPS desconhecido: não é possível buscar.")
+        self.seek_frame(int(round(seconds * self.fps)))
+
+    def ended(self):
+        """
+        True when no frame will come anymore (end of file or read error).
+        Network cameras only end when released.
+        """
+        if self.capture is not None:
+            return self.capture.finished()
+        return False
+
     def release(self):
         """
         Releases the video/camera feature.
         """
-        self.cap.release()
-        cv2.destroyAllWindows()
+        for metric in (FRAMES_METRIC, READ_METRIC, FRAME_AGE_METRIC):
+            metric.remove(source=self.source_name)
+        if isinstance(self.reader, ReconnectingReader):
+            # Wakes up the capture thread if it is waiting to reconnect
+            self.reader.interrupt()
+            for metric in CONNECTION_METRICS.values():
+                metric.remove(source=self.source_name)
+        if self.capture is not None:
+            self.capture.stop()
+            for metric in BUFFER_METRICS.values():
+                metric.remove(source=self.source_name)
+        self.reader.release()
 
     def get_frame_dimensions(self):
         """
         Returns the dimensions of the frame (width, height).
         """
         return self.width, self.height
+
+    def stats(self):
+        """
+        Returns the decoded/consumed/dropped frame counters of the threaded
+        capture and the age of the last frame read, plus the connection
+        counters of network cameras (empty dict for a synchronous file or
+        local camera).
+        """
+        stats = {}
+        if self.capture is not None:
+            stats.update(self.capture.stats())
+            stats["frame_age_ms"] = round(1000 * self.frame_age, 1)
+        if isinstance(self.reader, ReconnectingReader):
+            stats.update(self.reader.stats())
+        return stats
@@ -0,0 +1,309 @@
+"""
+Precompiled zone geometry for the people counter.
+
+A ZoneLayout holds named polygon zones and directional tripwire lines. It
+is saved as a JSON zone file, so headless runs and the GUI can reuse it
+without drawing it again:
+    {"zones": [{"name": "area1", "polygons": [[[x, y], ...]]}, ...],
+     "lines": [{"name": "door1", "start": [x, y], "end": [x, y]}, ...]}
+Files with only "area1" and "area2" (the two areas drawn in the
+VideoWidget) are read as zones with those names.
+
+ZoneMask rasterizes the zones once into a label mask where bit i of each
+pixel is set when the pixel belongs to zone i. Zone membership of every
+tracked foot point is then a single array lookup per frame instead of one
+cv2.pointPolygonTest per object and polygon.
+
+Tripwires tests the foot point motion of every track against every line
+with one vectorized segment intersection per frame. Looking from 'start'
+to 'end', crossing from the right side to the left side is "in", the
+opposite is "out" (swap the ends to invert a line).
+"""
+import json
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+AREA1_NAME = "area1"
+AREA2_NAME = "area2"
+
+# Tripwire crossing signs (see Tripwires.crossings)
+CROSSING_IN = 1
+CROSSING_OUT = -1
+
+# polygons: list of polygons of (x, y) points
+Zone = namedtuple("Zone", ["name", "polygons"])
+# start, end: (x, y) ends of the line
+Tripwire = namedtuple("Tripwire", ["name", "start", "end"])
+
+# Smallest unsigned dtype able to hold one bit per zone
+MASK_DTYPES = [
+    (8, np.uint8),
+    (16, np.uint16),
+    (32, np.uint32),
+    (64, np.uint64),
+]
+
+
+class ZoneMask:
+    def __init__(self, zones, frame_size, names=None):
+        """
+        Compiles the zones into a label mask.
+        :param zones: list of zones, each one a list of polygons
+            (a polygon is a list of (x, y) points).
+        :param frame_size: (width, height) of the frames to be tested.
+        :param names: zone names (default: "zone0", "zone1"...).
+        """
+        self.frame_size = tuple(frame_size)
+        self.names = list(names or [f"zone{i}" for i in range(len(zones))])
+        self.polygons = [
+            [np.array(polygon, np.int32) for polygon in polygons]
+            for polygons in zones
+        ]
+
+        dtype = next(
+            (dtype for bits, dtype in MASK_DTYPES if len(zones) <= bits),
+            None,
+        )
+        if dtype is None:
+            raise ValueError(
+                f"No máximo {MASK_DTYPES[-1][0]} zonas são suportadas."
+            )
+
+        width, height = self.frame_size
+        self.mask = np.zeros((height, width), dtype=dtype)
+        layer = np.zeros((height, width), dtype=np.uint8)
+        for zone_index, polygons in enumerate(self.polygons):
+            if not polygons:
+                continue
+            layer[:] = 0
+            cv2.fillPoly(layer, polygons, 1)
+            self.mask[layer > 0] |= dtype(1 << zone_index)
+
+    @classmethod
+    def from_areas(cls, area1, area2, frame_size):
+        """
+        Builds the mask for the two areas drawn in the VideoWidget
+        (zone 0 = area1, zone 1 = area2).
+        """
+        return cls([area1, area2], frame_size, [AREA1_NAME, AREA2_NAME])
+
+    def bounding_rect(self, margin=0, extra_points=None):
+        """
+        Smallest rectangle holding every zone (and the extra points, e.g.
+        the tripwire ends), grown by 'margin' px and clipped to the frame.
+        The whole frame when there is nothing to hold.
+        :return: (x1, y1, x2, y2) with x2/y2 exclusive.
+        """
+        width, height = self.frame_size
+        points = [
+            polygon for polygons in self.polygons for polygon in polygons
+        ]
+        if extra_points is not None and len(extra_points):
+            points.append(np.asarray(extra_points, np.int32).reshape(-1, 2))
+        if not points:
+            return 0, 0, width, height
+        x, y, w, h = cv2.boundingRect(np.concatenate(points))
+        return (
+            max(0, x - margin), max(0, y - margin),
+            min(width, x + w + margin), min(height, y + h + margin),
+        )
+
+    def lookup(self, points):
+        """
+        Returns the zone flags of each point; points outside the frame
+        belong to no zone.
+        :param points: (N, 2) array of (x, y) pixel coordinates.
+        :return: (N,) array with bit i set when the point is in zone i.
+        """
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        width, height = self.frame_size
+        xs = points[:, 0]
+        ys = points[:, 1]
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+
+        flags = np.zeros(len(points), dtype=self.mask.dtype)
+        flags[inside] = self.mask[ys[inside], xs[inside]]
+        return flags
+
+    def contains(self, flags, zone_index):
+        """
+        Boolean array telling which of the looked-up flags are in the zone.
+        """
+        return (flags & self.mask.dtype.type(1 << zone_index)) != 0
+
+
+class Tripwires:
+    def __init__(self, lines):
+        """
+        :param lines: list of Tripwire.
+        """
+        self.names = [line.name for line in lines]
+        self.starts = np.array([line.start for line in lines],
+                               dtype=np.float64).reshape(-1, 2)
+        self.ends = np.array([line.end for line in lines],
+                             dtype=np.float64).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.names)
+
+    def crossings(self, previous_points, points):
+        """
+        Which line each point crossed since its previous position.
+        A point exactly on a line counts as being on its left side, so a
+        person stopping on the line is not counted twice.
+        :param previous_points: (N, 2) foot points in the previous frame.
+        :param points: (N, 2) foot points in this frame.
+        :return: (N, lines) int8 array: CROSSING_IN, CROSSING_OUT or 0.
+        """
+        previous = np.asarray(previous_points, np.float64).reshape(-1, 1, 2)
+        current = np.asarray(points, np.float64).reshape(-1, 1, 2)
+        line_starts = self.starts[None]
+        line_ends = self.ends[None]
+        # (N, lines) cross products, broadcast over points and lines
+        line = line_ends - line_starts
+        motion = current - previous
+        side_previous = cross(line, previous - line_starts) > 0
+        side_current = cross(line, current - line_starts) > 0
+        straddles = (cross(motion, line_starts - previous)
+                     * cross(motion, line_ends - previous)) <= 0
+        hits = (side_previous != side_current) & straddles
+        return np.where(
+            hits, np.where(side_previous, CROSSING_IN, CROSSING_OUT), 0
+        ).astype(np.int8)
+
+    def draw_mask(self, frame_size, thickness):
+        """
+        (height, width) uint8 mask, non-zero within thickness/2 px of a line.
+        """
+        width, height = frame_size
+        mask = np.zeros((height, width), dtype=np.uint8)
+        for start, end in zip(self.starts.astype(int).tolist(),
+                              self.ends.astype(int).tolist()):
+            cv2.line(mask, tuple(start), tuple(end), 1, thickness)
+        return mask
+
+
+def cross(vector, other):
+    """
+    z component of the cross product of (..., 2) vectors. In image
+    coordinates (y down) it is positive when 'other' points to the right
+    of 'vector'.
+    """
+    return vector[..., 0] * other[..., 1] - vector[..., 1] * other[..., 0]
+
+
+class ZoneLayout:
+    def __init__(self, zones=(), lines=()):
+        """
+        :param zones: list of Zone (at most 64).
+        :param lines: list of Tripwire.
+        """
+        self.zones = list(zones)
+        self.lines = list(lines)
+        names = [zone.name for zone in self.zones]
+        if len(set(names)) != len(names):
+            raise ValueError("Nomes de zona repetidos.")
+        line_names = [line.name for line in self.lines]
+        if len(set(line_names)) != len(line_names):
+            raise ValueError("Nomes de linha repetidos.")
+
+    @classmethod
+    def from_areas(cls, area1, area2):
+        """
+        Layout of the two areas drawn in the VideoWidget.
+        """
+        return cls([Zone(AREA1_NAME, area1), Zone(AREA2_NAME, area2)])
+
+    def zone_index(self, name):
+        """
+        Position of the zone (its bit in the ZoneMask), None if missing.
+        """
+        for index, zone in enumerate(self.zones):
+            if zone.name == name:
+                return index
+        return None
+
+    def compile(self, frame_size):
+        """
+        :return: (ZoneMask, Tripwires) for frames of 'frame_size'.
+        """
+        zone_mask = ZoneMask([zone.polygons for zone in self.zones],
+                             frame_size, [zone.name for zone in self.zones])
+        return zone_mask, Tripwires(self.lines)
+
+    def line_points(self):
+        """
+        (2 * lines, 2) array of the line ends.
+        """
+        return np.array([point for line in self.lines
+                         for point in (line.start, line.end)],
+                        dtype=np.int32).reshape(-1, 2)
+
+    def to_dict(self):
+        return {
+            "zones": [
+                {"name": zone.name,
+                 "polygons": [[list(point) for point in polygon]
+                              for polygon in zone.polygons]}
+                for zone in self.zones
+            ],
+            "lines": [
+                {"name": line.name, "start": list(line.start),
+                 "end": list(line.end)}
+                for line in self.lines
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if "zones" not in data and "lines" not in data:
+            # Zone file with only the two drawn areas
+            return cls.from_areas(*[
+                [[(int(x), int(y)) for x, y in polygon]
+                 for polygon in data.get(name) or []]
+                for name in (AREA1_NAME, AREA2_NAME)
+            ])
+        zones = [
+            Zone(str(zone["name"]), [
+                [(int(x), int(y)) for x, y in polygon]
+                for polygon in zone["polygons"]
+            ])
+            for zone in data.get("zones", [])
+        ]
+        lines = [
+            Tripwire(str(line["name"]), tuple(map(int, line["start"])),
+                     tuple(map(int, line["end"])))
+            for line in data.get("lines", [])
+        ]
+        return cls(zones, lines)
+
+
+def load_layout(file_path):
+    """
+    Reads a JSON zone file (named zones and lines, or area1/area2).
+    :return: ZoneLayout
+    """
+    with open(file_path, "r") as f:
+        return ZoneLayout.from_dict(json.load(f))
+
+
+def save_layout(file_path, layout):
+    with open(file_path, "w") as f:
+        json.dump(layout.to_dict(), f, indent=2)
+
+
+def load_areas(file_path):
+    """
+    Reads area1/area2 from a JSON zone file (either format).
+    :return: (area1, area2), each a list of polygons of (x, y) points.
+    """
+    layout = load_layout(file_path)
+    areas = []
+    for name in (AREA1_NAME, AREA2_NAME):
+        index = layout.zone_index(name)
+        if index is None or not layout.zones[index].polygons:
+            raise ValueError(f"Arquivo de zonas sem '{name}': {file_path}")
+        areas.append(layout.zones[index].polygons)
+    return areas[0], areas[1]